@@ -4,9 +4,8 @@ import os
 import asyncio
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
 from threading import RLock
-from collections import deque
 import logging
 from aiogram.fsm.state import State
 from config import CONFIG
@@ -15,6 +14,26 @@ logger = logging.getLogger(__name__)
 STATE_FILE = "data/state.json"
 os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
 
+# Необязательные поля событий, которые переносятся в файл состояния как есть
+ALARM_EXTRA_FIELDS = (
+    "service", "channel_message_id", "scm_chat_id", "scm_thread_id", "scm_message_id", "jira_pending",
+    "jira_updated", "jira_status"
+)
+# Сколько завершённых сбоев помнить, чтобы их можно было переоткрыть из JIRA
+CLOSED_ALARMS_LIMIT = 100
+MAINTENANCE_EXTRA_FIELDS = ("channel_message_id",)
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _copy_extra(source: dict, target: dict, fields) -> dict:
+    for field in fields:
+        if source.get(field) is not None:
+            target[field] = source[field]
+    return target
+
 
 def safe_parse_time(time_str: str) -> Optional[datetime]:
     """
@@ -40,9 +59,70 @@ class BotState:
         self.active_alarms: Dict[str, Dict] = {}
         self.user_states: Dict[int, Dict] = {}
         self._lock = RLock()
-        self.extension_queue: Dict[int, deque] = {}  # {user_id: deque(alarm_ids)}
-        self.user_processing: set = set()
         self.active_maintenances: Dict[str, Dict] = {}
+        # Монотонный счётчик изменений: растёт при каждом изменении сбоев/работ
+        self.version: int = 0
+        self._listeners: List[Callable[[int], None]] = []
+        # Закреплённое сообщение-сводка в канале: {"chat_id": ..., "message_id": ...}
+        self.status_board: Dict[str, Any] = {}
+        # Недавно завершённые сбои (для переоткрытия задачи в JIRA)
+        self.closed_alarms: Dict[str, Dict] = {}
+        # Временный id сбоя → ключ JIRA: в FSM пользователей может остаться старый id
+        self.alarm_aliases: Dict[str, str] = {}
+
+    def touch(self) -> int:
+        """Отмечает изменение активных событий и возвращает новую версию состояния"""
+        with self._lock:
+            self.version += 1
+            version = self.version
+        for listener in list(self._listeners):
+            try:
+                listener(version)
+            except Exception as e:
+                logger.error(f"❌ Ошибка подписчика изменений состояния: {e}", exc_info=True)
+        return version
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """Подписывает функцию на изменения активных событий (вызывается с новой версией)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def close_alarm(self, alarm_id: str) -> Optional[Dict]:
+        """Переносит сбой из активных в недавно завершённые и возвращает его"""
+        with self._lock:
+            alarm = self.active_alarms.pop(alarm_id, None)
+            if alarm is None:
+                return None
+            alarm["closed_at"] = datetime.now()
+            self.closed_alarms[alarm_id] = alarm
+            while len(self.closed_alarms) > CLOSED_ALARMS_LIMIT:
+                self.closed_alarms.pop(next(iter(self.closed_alarms)))
+            return alarm
+
+    def reopen_alarm(self, alarm_id: str) -> Optional[Dict]:
+        """Возвращает недавно завершённый сбой в активные"""
+        with self._lock:
+            alarm = self.closed_alarms.pop(alarm_id, None)
+            if alarm is None:
+                return None
+            alarm.pop("closed_at", None)
+            alarm["reminded"] = False
+            self.active_alarms[alarm_id] = alarm
+            return alarm
+
+    def add_alarm_alias(self, old_id: str, new_id: str):
+        """Запоминает, что сбой old_id теперь называется new_id"""
+        with self._lock:
+            self.alarm_aliases[old_id] = new_id
+            while len(self.alarm_aliases) > CLOSED_ALARMS_LIMIT:
+                self.alarm_aliases.pop(next(iter(self.alarm_aliases)))
+
+    def resolve_alarm_id(self, alarm_id: str) -> str:
+        """Текущий id сбоя: временный id заменяется ключом JIRA, если он уже получен"""
+        return self.alarm_aliases.get(alarm_id, alarm_id)
 
     def get_user_active_alarms(self, user_id: int) -> dict:
         return {
@@ -67,8 +147,10 @@ class BotState:
 
         state = {
             'active_alarms': {},
+            'closed_alarms': {},
             'active_maintenances': {},
-            'user_states': {}
+            'user_states': {},
+            'status_board': {}
         }
 
         with self._lock:
@@ -85,6 +167,17 @@ class BotState:
                     'user_id': alarm['user_id'],
                     'created_at': created_at.isoformat() if isinstance(created_at, datetime) else created_at
                 }
+                _copy_extra(alarm, state['active_alarms'][alarm_id], ALARM_EXTRA_FIELDS)
+
+            # --- Сохранение недавно завершённых сбоев ---
+            for alarm_id, alarm in self.closed_alarms.items():
+                state['closed_alarms'][alarm_id] = _copy_extra(alarm, {
+                    'issue': alarm['issue'],
+                    'fix_time': _isoformat(alarm.get('fix_time')),
+                    'user_id': alarm['user_id'],
+                    'created_at': _isoformat(alarm.get('created_at')),
+                    'closed_at': _isoformat(alarm.get('closed_at'))
+                }, ALARM_EXTRA_FIELDS)
 
             # --- Сохранение регламентных работ ---
             for work_id, work in self.active_maintenances.items():
@@ -101,6 +194,7 @@ class BotState:
                     'user_id': work.get('user_id'),
                     'created_at': created_at.isoformat() if isinstance(created_at, datetime) else created_at
                 }
+                _copy_extra(work, state['active_maintenances'][work_id], MAINTENANCE_EXTRA_FIELDS)
 
             # --- Сохранение пользовательских состояний ---
             for user_id, user_state in self.user_states.items():
@@ -111,6 +205,8 @@ class BotState:
                     'issue': user_state.get('issue')
                 }
 
+            state['status_board'] = dict(self.status_board)
+
         try:
             await asyncio.to_thread(self._save_to_file, state)
             logger.info("✅ Состояние успешно сохранено")
@@ -125,8 +221,10 @@ class BotState:
             logger.info("✅ Файл состояния загружен")
             with self._lock:
                 self.active_alarms.clear()
+                self.closed_alarms.clear()
                 self.active_maintenances.clear()
                 self.user_states.clear()
+                self.status_board = dict(data.get("status_board") or {})
 
             # --- Загрузка аварий ---
             for alarm_id, alarm_data in data.get("active_alarms", {}).items():
@@ -142,8 +240,19 @@ class BotState:
                     "user_id": alarm_data["user_id"],
                     "created_at": created_at
                 }
+                _copy_extra(alarm_data, self.active_alarms[alarm_id], ALARM_EXTRA_FIELDS)
                 logger.debug(f"📥 Восстановлена авария: {alarm_id}")
 
+            # --- Загрузка недавно завершённых сбоев ---
+            for alarm_id, alarm_data in data.get("closed_alarms", {}).items():
+                self.closed_alarms[alarm_id] = _copy_extra(alarm_data, {
+                    "issue": alarm_data["issue"],
+                    "fix_time": safe_parse_time(alarm_data.get("fix_time")),
+                    "user_id": alarm_data["user_id"],
+                    "created_at": safe_parse_time(alarm_data.get("created_at")),
+                    "closed_at": safe_parse_time(alarm_data.get("closed_at"))
+                }, ALARM_EXTRA_FIELDS)
+
             # --- Загрузка регламентных работ ---
             for work_id, work_data in data.get("active_maintenances", {}).items():
                 start_time = safe_parse_time(work_data.get("start_time"))
@@ -161,8 +270,11 @@ class BotState:
                     "created_at": created_at,
                     "unavailable_services": work_data.get("unavailable_services", "не указано")
                 }
+                _copy_extra(work_data, self.active_maintenances[work_id], MAINTENANCE_EXTRA_FIELDS)
                 logger.debug(f"📥 Восстановлена работа: {work_id}")
 
+            self.touch()
+
             # --- Загрузка пользовательских состояний ---
             for user_id_str, user_state in data.get("user_states", {}).items():
                 try:
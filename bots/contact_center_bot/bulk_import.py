@@ -0,0 +1,351 @@
+"""
+Массовый импорт заявок контакт-центра из CSV/XLSX.
+
+Руководитель присылает таблицу, строки проверяются по мере чтения и сразу
+уходят в JIRA с ограниченной параллельностью и частотой запросов.
+Ход импорта показывается в одном сообщении, которое редактируется.
+"""
+import asyncio
+import csv
+import io
+import logging
+import os
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+
+from common.auth import admin_required
+from bots.contact_center_bot.config import AUTH_ENABLED as BOT_AUTH_ENABLED
+from bots.contact_center_bot.outbox import HANDLERS, TECHNICAL_ISSUE, SICK_LEAVE
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+MAX_FILE_SIZE = 5 * 1024 * 1024
+MAX_ERRORS_SHOWN = 15
+PROGRESS_INTERVAL = 2.0
+MAX_ATTEMPTS = 3
+
+KIND_ALIASES = {
+    "больничный": SICK_LEAVE,
+    "sick_leave": SICK_LEAVE,
+    "неполадка": TECHNICAL_ISSUE,
+    "тех. неполадка": TECHNICAL_ISSUE,
+    "техническая неполадка": TECHNICAL_ISSUE,
+    "technical_issue": TECHNICAL_ISSUE,
+}
+
+# Колонка → допустимые заголовки в файле
+COLUMNS = {
+    "kind": ("тип", "тип заявки", "type"),
+    "employee_name": ("сотрудник", "фио", "фио сотрудника", "employee"),
+    "manager_name": ("руководитель", "manager"),
+    "date": ("дата", "дата открытия", "date"),
+    "start_time": ("время", "время начала", "time"),
+    "option": ("сторона", "сторона проблемы", "на кого", "на кого открыт", "option"),
+    "description": ("описание", "комментарий", "description"),
+}
+
+# Значения в том же виде, что выбираются кнопками в диалоге
+PROBLEM_SIDES = {"оператора": "👤 Проблема на стороне оператора", "компании": "🏢 Проблема со стороны компании"}
+FOR_WHO = {"уход": "👤 По уходу за больным", "себя": "🏥 На себя"}
+
+
+@dataclass
+class ImportRow:
+    line: int
+    kind: str
+    payload: Dict[str, Any]
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportProgress:
+    read: int = 0
+    created: int = 0
+    invalid: List[RowError] = field(default_factory=list)
+    failed: List[RowError] = field(default_factory=list)
+    keys: List[str] = field(default_factory=list)
+    finished: bool = False
+
+    def render(self) -> str:
+        title = "✅ Импорт завершён" if self.finished else "⏳ Импорт заявок…"
+        lines = [
+            f"<b>{title}</b>",
+            f"• Прочитано строк: {self.read}",
+            f"• Создано заявок: {self.created}",
+            f"• Ошибки в строках: {len(self.invalid)}",
+            f"• Не создано в JIRA: {len(self.failed)}",
+        ]
+        errors = sorted(self.invalid + self.failed, key=lambda e: e.line)
+        if self.finished and errors:
+            lines.append("")
+            lines += [f"Строка {e.line}: {e.message}" for e in errors[:MAX_ERRORS_SHOWN]]
+            if len(errors) > MAX_ERRORS_SHOWN:
+                lines.append(f"… и ещё {len(errors) - MAX_ERRORS_SHOWN}")
+        return "\n".join(lines)
+
+
+class RateLimiter:
+    """Не больше rate запусков в секунду (равномерно)"""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+def _parse_date(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    try:
+        return datetime.strptime(_norm(value), "%d.%m.%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _parse_time(value: Any) -> Optional[str]:
+    if isinstance(value, (datetime, dt_time)):
+        return value.strftime("%H:%M")
+    try:
+        return datetime.strptime(_norm(value), "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return None
+
+
+def _choice(value: Any, options: Dict[str, str]) -> Optional[str]:
+    text = _norm(value).lower()
+    for marker, label in options.items():
+        if marker in text:
+            return label
+    return None
+
+
+def map_header(header: Iterable[Any]) -> Dict[str, int]:
+    """Номера колонок по заголовку; неизвестные колонки пропускаются"""
+    aliases = {alias: name for name, names in COLUMNS.items() for alias in names}
+    mapping = {}
+    for index, title in enumerate(header):
+        name = aliases.get(_norm(title).lower())
+        if name and name not in mapping:
+            mapping[name] = index
+    return mapping
+
+
+def validate_row(line: int, values: Dict[str, Any]) -> Union[ImportRow, RowError]:
+    """Проверяет строку и собирает данные задания в формате очереди заявок"""
+    kind = KIND_ALIASES.get(_norm(values.get("kind")).lower())
+    if kind is None:
+        return RowError(line, f"неизвестный тип заявки «{_norm(values.get('kind'))}»")
+    employee, manager = _norm(values.get("employee_name")), _norm(values.get("manager_name"))
+    if not employee or not manager:
+        return RowError(line, "не указан сотрудник или руководитель")
+    jira_date = _parse_date(values.get("date"))
+    if jira_date is None:
+        return RowError(line, "дата должна быть в формате dd.mm.yyyy")
+    payload = {
+        "employee_name": employee,
+        "manager_name": manager,
+        "description": _norm(values.get("description")),
+    }
+
+    if kind == TECHNICAL_ISSUE:
+        start_time = _parse_time(values.get("start_time"))
+        if start_time is None:
+            return RowError(line, "время начала должно быть в формате HH:MM")
+        problem_side = _choice(values.get("option"), PROBLEM_SIDES)
+        if problem_side is None:
+            return RowError(line, "сторона проблемы: «оператора» или «компании»")
+        payload.update(date=jira_date, start_time=start_time, problem_side=problem_side)
+    else:
+        for_who = _choice(values.get("option"), FOR_WHO)
+        if for_who is None:
+            return RowError(line, "на кого открыт: «по уходу» или «на себя»")
+        payload.update(open_date=jira_date, for_who=for_who)
+    return ImportRow(line, kind, payload)
+
+
+def iter_csv(data: bytes) -> Iterator[List[Any]]:
+    """Строки CSV по одной; разделитель (; или ,) определяется по заголовку"""
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+    first = text.readline()
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    text.seek(0)
+    yield from csv.reader(text, delimiter=delimiter)
+
+
+def iter_xlsx(data: bytes) -> Iterator[List[Any]]:
+    """Строки первого листа XLSX в режиме только чтения (без загрузки всей книги)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def iter_rows(rows: Iterable[List[Any]]) -> Iterator[Union[ImportRow, RowError]]:
+    """Проверяет строки таблицы по мере чтения; первая строка — заголовок"""
+    rows = iter(rows)
+    header = map_header(next(rows, []))
+    missing = [name for name in ("kind", "employee_name", "manager_name", "date") if name not in header]
+    if missing:
+        titles = ", ".join(COLUMNS[name][0] for name in missing)
+        raise ValueError(f"В файле нет колонок: {titles}")
+    for line, row in enumerate(rows, start=2):
+        if not any(_norm(cell) for cell in row):
+            continue
+        values = {name: row[index] if index < len(row) else None for name, index in header.items()}
+        yield validate_row(line, values)
+
+
+async def run_import(
+    rows: Iterable[Union[ImportRow, RowError]],
+    create: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    progress: ImportProgress,
+    on_progress: Optional[Callable[[], Awaitable[None]]] = None,
+    concurrency: int = 4,
+    rate: float = 5.0
+) -> ImportProgress:
+    """
+    Создаёт заявки из проверенных строк.
+    Чтение файла и отправка идут одновременно: очередь между ними ограничена,
+    так что в памяти не бывает больше нескольких строк.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    limiter = RateLimiter(rate)
+
+    async def worker():
+        while True:
+            row = await queue.get()
+            if row is None:
+                return
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                await limiter.acquire()
+                try:
+                    result = await create(row.kind, row.payload)
+                except Exception as e:
+                    retry_after = getattr(e, "retry_after", None)
+                    if retry_after is not None and attempt < MAX_ATTEMPTS:
+                        await asyncio.sleep(retry_after)
+                        continue
+                    logger.warning(f"⚠️ Импорт: строка {row.line} не создана: {e}")
+                    progress.failed.append(RowError(row.line, f"JIRA: {e}"))
+                else:
+                    progress.created += 1
+                    progress.keys.append(result.get("key"))
+                break
+            if on_progress:
+                await on_progress()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for row in rows:
+            progress.read += 1
+            if isinstance(row, RowError):
+                progress.invalid.append(row)
+            else:
+                await queue.put(row)
+            # Даём работать воркерам, пока читается большой файл
+            await asyncio.sleep(0)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+    progress.finished = True
+    return progress
+
+
+class ProgressMessage:
+    """Редактирует одно сообщение не чаще раза в PROGRESS_INTERVAL секунд"""
+
+    def __init__(self, message: Message, progress: ImportProgress, interval: float = PROGRESS_INTERVAL):
+        self._message = message
+        self._progress = progress
+        self._interval = interval
+        self._last = 0.0
+
+    async def update(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last < self._interval:
+            return
+        self._last = now
+        try:
+            await self._message.edit_text(self._progress.render())
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                logger.warning(f"⚠️ Не удалось обновить ход импорта: {e}")
+
+
+async def _create_ticket(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await HANDLERS[kind](payload)
+
+
+@router.message(F.document)
+@admin_required(auth_enabled_for_bot=BOT_AUTH_ENABLED)
+async def import_document(message: Message):
+    """Принимает CSV/XLSX со списком заявок"""
+    document = message.document
+    name = (document.file_name or "").lower()
+    if not name.endswith((".csv", ".xlsx")):
+        await message.answer("❌ Для массового импорта пришлите файл CSV или XLSX")
+        return
+    if document.file_size and document.file_size > MAX_FILE_SIZE:
+        await message.answer("❌ Файл слишком большой (до 5 МБ)")
+        return
+
+    status = await message.answer("⏳ Загружаю файл…")
+    data = (await message.bot.download(document)).read()
+    try:
+        if name.endswith(".xlsx"):
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                await status.edit_text("❌ Импорт XLSX недоступен (не установлен openpyxl), пришлите CSV")
+                return
+            rows = iter_rows(iter_xlsx(data))
+        else:
+            rows = iter_rows(iter_csv(data))
+        progress = ImportProgress()
+        reporter = ProgressMessage(status, progress)
+        logger.info(f"📥 [{message.from_user.id}] Массовый импорт из {document.file_name}")
+        await run_import(
+            rows, _create_ticket, progress, on_progress=reporter.update,
+            concurrency=int(os.getenv("CC_IMPORT_CONCURRENCY", "4")),
+            rate=float(os.getenv("CC_IMPORT_RATE", "5"))
+        )
+    except (ValueError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as e:
+        await status.edit_text(f"❌ Не удалось прочитать файл: {e}")
+        return
+    await reporter.update(force=True)
+    logger.info(f"✅ Импорт завершён: создано {progress.created}, ошибок {len(progress.invalid) + len(progress.failed)}")
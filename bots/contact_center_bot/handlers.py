@@ -2,7 +2,6 @@
 Обработчики команд для бота контакт-центра.
 """
 import logging
-import os
 from datetime import datetime
 
 from aiogram import Router, F
@@ -11,9 +10,7 @@ from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 
 from common.auth import admin_required
-from common.jira.client import JiraApiClient
-from common.jira.config import JiraConfig
-from common.jira.ticket_creator import create_technical_issue, create_sick_leave
+from bots.contact_center_bot.outbox import get_outbox, TECHNICAL_ISSUE, SICK_LEAVE
 
 from bots.contact_center_bot.keyboards import (
     create_main_keyboard, 
@@ -34,7 +31,8 @@ async def start_command(message: Message):
     """Обработчик команд /start и /help."""
     await message.answer(
         "👋 Привет! Я бот для создания заявок в контакт-центре.\n"
-        "Выберите тип заявки:",
+        "Выберите тип заявки или пришлите таблицу CSV/XLSX для массового импорта "
+        "(колонки: тип, сотрудник, руководитель, дата, время, сторона/на кого, описание):",
         reply_markup=create_main_keyboard()
     )
 
@@ -180,28 +178,22 @@ async def confirm_technical_issue(message: Message, state: FSMContext):
         return
     data = await state.get_data()
     try:
-        config = JiraConfig(
-            JIRA_URL=os.getenv("JIRA_URL"),
-            JIRA_API_TOKEN=os.getenv("JIRA_API_TOKEN"),
-            JIRA_DEFAULT_PROJECT="SCHED"
+        # Заявка создаётся в фоне; ссылка придёт отдельным сообщением
+        await get_outbox().enqueue(TECHNICAL_ISSUE, {
+            "chat_id": message.chat.id,
+            "employee_name": data["employee_name"],
+            "manager_name": data["manager_name"],
+            "description": data["description"],
+            "date": data["date"],
+            "start_time": data["start_time"],
+            "problem_side": data["problem_side"]
+        })
+        await message.answer(
+            "⏳ Заявка принята и будет создана в JIRA, ссылка придёт отдельным сообщением.\n"
+            f"• Сотрудник: {data['employee_name']}\n"
+            f"• Руководитель: {data['manager_name']}",
+            reply_markup=create_main_keyboard()
         )
-        async with JiraApiClient(config) as client:
-            issue = await create_technical_issue(
-                client=client,
-                employee_name=data["employee_name"],
-                manager_name=data["manager_name"],
-                description=data["description"],
-                date=data["date"],
-                start_time=data["start_time"],
-                problem_side=data["problem_side"]
-            )
-            jira_ticket_url = f"{config.JIRA_URL}/browse/{issue.get('key')}"
-            await message.answer(
-                f"✅ Заявка создана: <a href=\"{jira_ticket_url}\">{issue.get('key')}</a>\n"
-                f"• Сотрудник: {data['employee_name']}\n"
-                f"• Руководитель: {data['manager_name']}",
-                reply_markup=create_main_keyboard()
-            )
     except Exception as e:
         logger.error(f"Ошибка при создании заявки: {e}")
         await message.answer(
@@ -347,34 +339,24 @@ async def confirm_sick_leave(message: Message, state: FSMContext):
     data = await state.get_data()
     
     try:
-        # Создаем клиент JIRA
-        config = JiraConfig(
-            JIRA_URL=os.getenv("JIRA_URL"),
-            JIRA_API_TOKEN=os.getenv("JIRA_API_TOKEN"),
-            JIRA_DEFAULT_PROJECT="SCHED"
+        # Заявка создаётся в фоне; ссылка придёт отдельным сообщением
+        await get_outbox().enqueue(SICK_LEAVE, {
+            "chat_id": message.chat.id,
+            "employee_name": data["employee_name"],
+            "manager_name": data["manager_name"],
+            "description": data["description"],
+            "open_date": data["open_date"],
+            "for_who": data["for_who"]
+        })
+        await message.answer(
+            "⏳ Заявка принята и будет создана в JIRA, ссылка придёт отдельным сообщением.\n"
+            f"• Сотрудник: {data['employee_name']}\n"
+            f"• Руководитель: {data['manager_name']}\n"
+            f"• Дата открытия: {data['open_date']}\n"
+            f"• На кого открыт: {data['for_who']}",
+            reply_markup=create_main_keyboard()
         )
-        
-        async with JiraApiClient(config) as client:
-            # Создаем заявку
-            issue = await create_sick_leave(
-                client=client,
-                employee_name=data["employee_name"],
-                manager_name=data["manager_name"],
-                description=data["description"],
-                open_date=data["open_date"],
-                for_who=data["for_who"]
-            )
-            
-            jira_ticket_url = f"{config.JIRA_URL}/browse/{issue.get('key')}"
-            await message.answer(
-                f"✅ Заявка создана: <a href=\"{jira_ticket_url}\">{issue.get('key')}</a>\n"
-                f"• Сотрудник: {data['employee_name']}\n"
-                f"• Руководитель: {data['manager_name']}\n"
-                f"• Дата открытия: {data['open_date']}\n"
-                f"• На кого открыт: {data['for_who']}",
-                reply_markup=create_main_keyboard()
-            )
-            
+
     except Exception as e:
         logger.error(f"Ошибка при создании заявки: {e}")
         await message.answer(
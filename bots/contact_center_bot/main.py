@@ -24,7 +24,9 @@ from common.jira.config import JiraConfig
 
 # Импорты из локальных модулей
 from bots.contact_center_bot.handlers import router
+from bots.contact_center_bot.bulk_import import router as bulk_import_router
 from bots.contact_center_bot.keyboards import create_main_keyboard
+from bots.contact_center_bot.outbox import setup_outbox, close_jira_clients, get_gateway
 
 # Настройка логирования
 logger = setup_logging("contact_center_bot")
@@ -48,6 +50,7 @@ async def main():
     
     # Регистрация роутера
     dp.include_router(router)
+    dp.include_router(bulk_import_router)
     
     # Установка команд
     from aiogram.types import BotCommand
@@ -58,12 +61,20 @@ async def main():
     await bot.set_my_commands(commands)
     logger.info("✅ Команды установлены")
     
+    # Очередь заявок JIRA: пользователю отвечаем сразу, заявки создаются в фоне
+    jira_outbox = setup_outbox(bot)
+    # Шлюз создаётся сразу: схемы полей читаются из снимка метаданных, а не из JIRA
+    get_gateway()
+
     # Запуск бота
     try:
         logger.info("🤖 Бот начал работу")
+        asyncio.create_task(jira_outbox.run())
         await dp.start_polling(bot)
     finally:
         logger.info("🛑 Бот остановлен")
+        await jira_outbox.stop()
+        await close_jira_clients()
         await bot.session.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""
+Очередь создания заявок JIRA для бота контакт-центра.
+
+Пользователь получает подтверждение сразу, а ссылка на заявку приходит
+отдельным сообщением, когда JIRA её создаст. Все заявки идут через
+шлюз JIRA с одной сессией и ограниченным пулом соединений.
+"""
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+
+from common.jira.client import JiraApiClient
+from common.jira.config import JiraConfig
+from common.jira.gateway import JiraGateway
+from common.jira.metadata import DEFAULT_MAX_AGE, DEFAULT_SNAPSHOT_PATH
+from common.jira.outbox import JiraOutbox
+from common.jira.ticket_creator import create_technical_issue, create_sick_leave
+
+from bots.contact_center_bot.keyboards import create_main_keyboard
+
+logger = logging.getLogger(__name__)
+
+TECHNICAL_ISSUE = "cc_technical_issue"
+SICK_LEAVE = "cc_sick_leave"
+DEFAULT_DB_PATH = "data/cc_jira_outbox.db"
+
+_outbox: Optional[JiraOutbox] = None
+_gateway: Optional[JiraGateway] = None
+
+
+def get_outbox() -> Optional[JiraOutbox]:
+    return _outbox
+
+
+def jira_config() -> JiraConfig:
+    return JiraConfig(
+        JIRA_URL=os.getenv("JIRA_URL"),
+        JIRA_API_TOKEN=os.getenv("JIRA_API_TOKEN"),
+        JIRA_DEFAULT_PROJECT="SCHED"
+    )
+
+
+def get_gateway() -> JiraGateway:
+    """Шлюз JIRA бота контакт-центра (создаётся при первом обращении)"""
+    global _gateway
+    if _gateway is None:
+        _gateway = JiraGateway(
+            jira_config(),
+            pool_limit=int(os.getenv("CC_JIRA_POOL_LIMIT", "10"))
+        )
+        _gateway.load_snapshot(
+            os.getenv("CC_JIRA_METADATA_SNAPSHOT", DEFAULT_SNAPSHOT_PATH),
+            max_age=float(os.getenv("CC_JIRA_METADATA_MAX_AGE", DEFAULT_MAX_AGE))
+        )
+    return _gateway
+
+
+async def get_jira_client() -> JiraApiClient:
+    """REST-клиент JIRA на сессии шлюза"""
+    return (await get_gateway().start()).client
+
+
+async def close_jira_clients():
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+    _gateway = None
+
+
+def _create_options(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Ключ идемпотентности задания очереди: повтор найдёт заявку, созданную прошлой попыткой"""
+    if not payload.get("request_id"):
+        return {}
+    return {"request_id": payload["request_id"], "resume": payload.get("attempt", 1) > 1}
+
+
+async def _create_technical_issue(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Шлюз проверяет поля по схеме createmeta до отправки заявки
+    issue = await create_technical_issue(
+        client=get_gateway(),
+        employee_name=payload["employee_name"],
+        manager_name=payload["manager_name"],
+        description=payload["description"],
+        date=payload["date"],
+        start_time=payload["start_time"],
+        problem_side=payload["problem_side"],
+        **_create_options(payload)
+    )
+    return {"key": issue.get("key")}
+
+
+async def _create_sick_leave(payload: Dict[str, Any]) -> Dict[str, Any]:
+    issue = await create_sick_leave(
+        client=get_gateway(),
+        employee_name=payload["employee_name"],
+        manager_name=payload["manager_name"],
+        description=payload["description"],
+        open_date=payload["open_date"],
+        for_who=payload["for_who"],
+        **_create_options(payload)
+    )
+    return {"key": issue.get("key")}
+
+
+# Создание заявки по виду задания; используется и очередью, и массовым импортом
+HANDLERS = {
+    TECHNICAL_ISSUE: _create_technical_issue,
+    SICK_LEAVE: _create_sick_leave,
+}
+
+
+def setup_outbox(bot: Bot) -> JiraOutbox:
+    """Создаёт очередь заявок контакт-центра и регистрирует обработчики"""
+    global _outbox
+    outbox = JiraOutbox(
+        os.getenv("CC_JIRA_OUTBOX_DB", DEFAULT_DB_PATH),
+        concurrency=int(os.getenv("CC_JIRA_OUTBOX_CONCURRENCY", "2"))
+    )
+
+    async def on_done(payload: Dict[str, Any], result: Dict[str, Any]):
+        key = result.get("key")
+        lines = [
+            f"✅ Заявка создана: <a href=\"{jira_config().JIRA_URL}/browse/{key}\">{key}</a>",
+            f"• Сотрудник: {payload['employee_name']}",
+            f"• Руководитель: {payload['manager_name']}",
+        ]
+        if payload.get("open_date"):
+            lines.append(f"• Дата открытия: {payload['open_date']}")
+        if payload.get("for_who"):
+            lines.append(f"• На кого открыт: {payload['for_who']}")
+        await bot.send_message(payload["chat_id"], "\n".join(lines))
+
+    async def on_failed(payload: Dict[str, Any], error: str):
+        await bot.send_message(
+            payload["chat_id"],
+            f"❌ Не удалось создать заявку для сотрудника {payload['employee_name']}.\n"
+            f"Пожалуйста, попробуйте позже.",
+            reply_markup=create_main_keyboard()
+        )
+
+    for kind, handler in HANDLERS.items():
+        outbox.register(kind, handler, on_done=on_done, on_failed=on_failed)
+    _outbox = outbox
+    return outbox
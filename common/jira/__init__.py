@@ -8,8 +8,10 @@ from .models import JiraIssueModel, JiraTransition, JiraComment
 from .exceptions import (
     JiraError, JiraConnectionError, JiraAuthenticationError,
     JiraNotFoundError, JiraValidationError, JiraPermissionError,
-    JiraRateLimitError, JiraTransitionError, JiraCommentError
+    JiraRateLimitError, JiraTransitionError, JiraCommentError,
+    CircuitOpenError
 )
+from .circuit_breaker import CircuitBreaker, get_breaker
 
 __all__ = [
     'JiraApiClient',
@@ -25,5 +27,8 @@ __all__ = [
     'JiraPermissionError',
     'JiraRateLimitError',
     'JiraTransitionError',
-    'JiraCommentError'
+    'JiraCommentError',
+    'CircuitOpenError',
+    'CircuitBreaker',
+    'get_breaker'
 ] 
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Автоматический выключатель (circuit breaker) для обращений к JIRA.
+
+После серии сбоев подряд выключатель размыкается, и вызовы сразу завершаются
+CircuitOpenError, не дожидаясь таймаутов. Через recovery_timeout пропускается
+пробный запрос (полуоткрытое состояние): успех замыкает цепь, ошибка снова размыкает.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Числовое значение состояния для метрики
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Потокобезопасный выключатель: используется и из asyncio, и из потоков с requests."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        # Счётчики для метрик
+        self.rejected_total = 0
+        self.opened_total = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning(f"🔌 Выключатель JIRA «{self.name}»: {self._state} → {state}")
+            self._state = state
+
+    def before_call(self):
+        """Разрешает вызов или сразу выбрасывает CircuitOpenError"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self.rejected_total += 1
+            retry_after = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"JIRA недоступна ({self.name}), повтор через {retry_after:.0f} с", retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened_total += 1
+                self._set_state(OPEN)
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Возвращает пробный слот, если вызов завершился без вердикта о доступности JIRA"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    @contextmanager
+    def guard(self):
+        """
+        Оборачивает синхронный вызов: исключение внутри считается сбоем.
+        Для тонкой классификации ошибок используйте before_call/record_* напрямую.
+        """
+        self.before_call()
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> CircuitBreaker:
+    """Общий выключатель по имени (обычно — адрес JIRA): все клиенты одного сервера делят состояние"""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, failure_threshold, recovery_timeout)
+            _breakers[name] = breaker
+        return breaker
+
+
+def render_metrics(breakers: Optional[Dict[str, CircuitBreaker]] = None) -> str:
+    """Состояние выключателей в текстовом формате Prometheus"""
+    breakers = _breakers if breakers is None else breakers
+    lines = [
+        "# HELP jira_circuit_state Состояние выключателя JIRA (0 — замкнут, 1 — пробный, 2 — разомкнут)",
+        "# TYPE jira_circuit_state gauge",
+    ]
+    for name, breaker in breakers.items():
+        lines.append(f'jira_circuit_state{{name="{name}"}} {STATE_VALUES[breaker.state]}')
+    lines += ["# HELP jira_circuit_rejected_total Вызовы, отклонённые разомкнутым выключателем",
+              "# TYPE jira_circuit_rejected_total counter"]
+    for name, breaker in breakers.items():
+        lines.append(f'jira_circuit_rejected_total{{name="{name}"}} {breaker.rejected_total}')
+    lines += ["# HELP jira_circuit_opened_total Сколько раз выключатель размыкался",
+              "# TYPE jira_circuit_opened_total counter"]
+    for name, breaker in breakers.items():
+        lines.append(f'jira_circuit_opened_total{{name="{name}"}} {breaker.opened_total}')
+    return "\n".join(lines) + "\n"
@@ -1,68 +1,117 @@
+import asyncio
 import aiohttp
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterable, Sequence, Union
 from datetime import datetime
 import json
 from functools import wraps
 import time
-import requests
 
 from .interfaces import JiraClient, JiraIssue
 from .models import JiraIssueModel, JiraTransition, JiraComment
 from .exceptions import (
     JiraError, JiraConnectionError, JiraAuthenticationError,
     JiraNotFoundError, JiraValidationError, JiraPermissionError,
-    JiraRateLimitError, JiraTransitionError, JiraCommentError
+    JiraRateLimitError, JiraTransitionError, JiraCommentError, CircuitOpenError
 )
+from .circuit_breaker import CircuitBreaker, get_breaker
 from .config import JiraConfig
+from .session import jira_headers
+
+
+def _is_outage_status(status: int) -> bool:
+    """Ответы, говорящие о недоступности JIRA, а не об ошибке в запросе"""
+    return status >= 500 or status == 429
 
 
 def handle_jira_errors(func):
-    """Декоратор для обработки ошибок JIRA."""
+    """Декоратор для обработки ошибок JIRA и учёта их в выключателе клиента."""
     @wraps(func)
-    async def wrapper(*args, **kwargs):
+    async def wrapper(self, *args, **kwargs):
+        breaker = getattr(self, "breaker", None)
+        if breaker is None:
+            return await _call_mapped(func, self, *args, **kwargs)
+
+        breaker.before_call()
         try:
-            return await func(*args, **kwargs)
-        except aiohttp.ClientError as e:
-            raise JiraConnectionError(f"Ошибка подключения к JIRA: {str(e)}")
-        except aiohttp.ClientResponseError as e:
-            if e.status == 400:
-                raise JiraValidationError(f"Ошибка валидации JIRA: {str(e)}")
-            elif e.status == 401:
-                raise JiraAuthenticationError("Ошибка аутентификации в JIRA")
-            elif e.status == 403:
-                raise JiraPermissionError("Недостаточно прав для выполнения операции")
-            elif e.status == 404:
-                raise JiraNotFoundError("Запрашиваемый ресурс не найден")
-            elif e.status == 429:
-                raise JiraRateLimitError("Превышен лимит запросов к JIRA")
+            result = await _call_mapped(func, self, *args, **kwargs)
+        except (JiraConnectionError, JiraRateLimitError) as e:
+            if isinstance(e, CircuitOpenError):
+                breaker.release_probe()
             else:
-                raise JiraError(f"Ошибка JIRA: {str(e)}")
+                breaker.record_failure()
+            raise
+        except JiraError as e:
+            if getattr(e, "status", None) and _is_outage_status(e.status):
+                breaker.record_failure()
+            else:
+                # JIRA ответила — значит, она доступна
+                breaker.record_success()
+            raise
+        except Exception:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return result
     return wrapper
 
 
+async def _call_mapped(func, *args, **kwargs):
+    """Вызывает метод клиента, переводя ошибки aiohttp в исключения JIRA"""
+    try:
+        return await func(*args, **kwargs)
+    except aiohttp.ClientResponseError as e:
+        # Проверяется раньше ClientError: это его подкласс
+        if e.status == 400:
+            error = JiraValidationError(f"Ошибка валидации JIRA: {str(e)}")
+        elif e.status == 401:
+            error = JiraAuthenticationError("Ошибка аутентификации в JIRA")
+        elif e.status == 403:
+            error = JiraPermissionError("Недостаточно прав для выполнения операции")
+        elif e.status == 404:
+            error = JiraNotFoundError("Запрашиваемый ресурс не найден")
+        elif e.status == 429:
+            error = JiraRateLimitError("Превышен лимит запросов к JIRA")
+        else:
+            error = JiraError(f"Ошибка JIRA: {str(e)}")
+        error.status = e.status
+        raise error from e
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise JiraConnectionError(f"Ошибка подключения к JIRA: {str(e) or e.__class__.__name__}") from e
+
+
 class JiraApiClient(JiraClient):
     """Клиент для работы с JIRA API."""
     
-    def __init__(self, config: JiraConfig):
+    def __init__(self, config: JiraConfig, session: Optional[aiohttp.ClientSession] = None):
         self.config = config
         self.base_url = f"{config.JIRA_URL}/rest/api/{config.API_VERSION}"
-        self.headers = {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {config.JIRA_API_TOKEN}'
-        }
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.headers = jira_headers(config)
+        # Общая сессия (пул) передаётся снаружи и закрывается её владельцем
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        # Выключатель общий для всех клиентов одного сервера JIRA
+        self.breaker: CircuitBreaker = get_breaker(
+            config.JIRA_URL,
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT
+        )
         self._cache: Dict[str, Any] = {}
         self._cache_timestamps: Dict[str, float] = {}
     
+    def use_session(self, session: aiohttp.ClientSession):
+        """Подключает общую сессию (пул); закрывает её владелец, а не клиент."""
+        self.session = session
+        self._owns_session = False
+
     async def __aenter__(self):
         """Создание сессии при входе в контекстный менеджер."""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(headers=self.headers)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Закрытие сессии при выходе из контекстного менеджера."""
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
     
@@ -125,12 +174,14 @@ class JiraApiClient(JiraClient):
             }
     
     @handle_jira_errors
-    async def get_issue(self, issue_key: str) -> JiraIssue:
+    async def get_issue(self, issue_key: str, fields: Optional[Sequence[str]] = None) -> JiraIssue:
         """
         Получает информацию о задаче по её ключу.
         
         Args:
             issue_key: Ключ задачи (например, "PROJ-123")
+            fields: Запрашиваемые поля; без них JIRA отдаёт все поля задачи.
+                Для модели нужны summary, status, created и updated.
             
         Returns:
             JiraIssue: Объект задачи
@@ -142,8 +193,10 @@ class JiraApiClient(JiraClient):
         if not self.session:
             raise JiraConnectionError("Сессия не инициализирована")
 
+        params = {"fields": ",".join(fields)} if fields else None
         async with self.session.get(
             f"{self.base_url}/issue/{issue_key}",
+            params=params,
             timeout=self.config.REQUEST_TIMEOUT
         ) as response:
             try:
@@ -211,6 +264,19 @@ class JiraApiClient(JiraClient):
             response.raise_for_status()
             return await response.json()
     
+    @handle_jira_errors
+    async def get_myself(self) -> Dict[str, Any]:
+        """Пользователь, от имени которого работает клиент (в том числе его часовой пояс timeZone)."""
+        if not self.session:
+            raise JiraConnectionError("Сессия не инициализирована")
+
+        async with self.session.get(
+            f"{self.base_url}/myself",
+            timeout=self.config.REQUEST_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
     @handle_jira_errors
     async def update_issue(
         self,
@@ -238,9 +304,15 @@ class JiraApiClient(JiraClient):
     async def transition_issue(
         self,
         issue_key: str,
-        transition_id: str
-    ) -> JiraIssue:
-        """Изменение статуса задачи."""
+        transition_id: str,
+        refetch: bool = True
+    ) -> Optional[JiraIssue]:
+        """
+        Изменение статуса задачи.
+
+        С refetch=False выполняется один POST и возвращается None:
+        задачу при необходимости можно получить позже через get_issue.
+        """
         if not self.session:
             raise JiraConnectionError("Сессия не инициализирована")
         
@@ -252,32 +324,116 @@ class JiraApiClient(JiraClient):
             timeout=self.config.REQUEST_TIMEOUT
         ) as response:
             response.raise_for_status()
-            return await self.get_issue(issue_key)
+        if not refetch:
+            return None
+        return await self.get_issue(issue_key)
     
     @handle_jira_errors
-    async def search_issues(
+    async def search_page(
         self,
         jql: str,
+        fields: Optional[List[str]] = None,
+        start_at: int = 0,
         max_results: int = 50
-    ) -> List[JiraIssue]:
-        """Поиск задач по JQL."""
+    ) -> Dict[str, Any]:
+        """
+        Одна страница поиска по JQL в исходном виде ответа JIRA (startAt, total, issues).
+
+        Args:
+            jql: Запрос JQL
+            fields: Какие поля вернуть; без проекции JIRA отдаёт все поля задачи
+            start_at: Смещение первой задачи страницы
+            max_results: Размер страницы
+        """
         if not self.session:
             raise JiraConnectionError("Сессия не инициализирована")
-        
+
         params = {
             "jql": jql,
+            "startAt": start_at,
             "maxResults": max_results
         }
-        
+        if fields:
+            params["fields"] = ",".join(fields)
+
         async with self.session.get(
             f"{self.base_url}/search",
             params=params,
             timeout=self.config.REQUEST_TIMEOUT
         ) as response:
             response.raise_for_status()
-            result = await response.json()
-            return [JiraIssueModel.from_raw_data(issue) for issue in result["issues"]]
+            return await response.json()
+
+    async def iter_search(
+        self,
+        jql: str,
+        fields: Optional[List[str]] = None,
+        page_size: int = 100
+    ):
+        """Перебирает все задачи по JQL постранично (сырые словари задач)."""
+        start_at = 0
+        while True:
+            page = await self.search_page(jql, fields=fields, start_at=start_at, max_results=page_size)
+            issues = page.get("issues") or []
+            for issue in issues:
+                yield issue
+            start_at += len(issues)
+            if not issues or start_at >= page.get("total", 0):
+                return
+
+    async def search_issues(
+        self,
+        jql: str,
+        max_results: int = 50,
+        fields: Optional[List[str]] = None,
+        start_at: int = 0
+    ) -> List[JiraIssue]:
+        """Поиск задач по JQL."""
+        result = await self.search_page(jql, fields=fields, start_at=start_at, max_results=max_results)
+        return [JiraIssueModel.from_raw_data(issue) for issue in result["issues"]]
     
+    @handle_jira_errors
+    async def add_attachment(
+        self,
+        issue_key: str,
+        filename: str,
+        data: Union[bytes, bytearray, memoryview, AsyncIterable[bytes]],
+        content_type: str = "image/png"
+    ) -> List[Dict[str, Any]]:
+        """
+        Прикрепляет файл к задаче.
+
+        Данные отправляются как multipart прямо из памяти: байты передаются
+        без копирования, асинхронный итератор — по частям, без временного файла.
+
+        Returns:
+            Описания созданных вложений (id, filename, size, content)
+        """
+        if not self.session:
+            raise JiraConnectionError("Сессия не инициализирована")
+
+        with aiohttp.MultipartWriter("form-data") as writer:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                part = writer.append(aiohttp.payload.BytesPayload(data, content_type=content_type))
+            else:
+                part = writer.append(aiohttp.payload.AsyncIterablePayload(data, content_type=content_type))
+            part.set_content_disposition("form-data", name="file", filename=filename)
+
+        headers = {
+            # Без него JIRA отклоняет загрузку как XSRF
+            "X-Atlassian-Token": "no-check",
+            # Общий заголовок сессии (application/json) заменяем на multipart с границей
+            "Content-Type": writer.content_type
+        }
+        async with self.session.post(
+            f"{self.base_url}/issue/{issue_key}/attachments",
+            data=writer,
+            headers=headers,
+            timeout=self.config.REQUEST_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
     @handle_jira_errors
     async def add_comment(
         self,
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, field_validator
 from typing import Optional
 from pathlib import Path
 import os
@@ -9,6 +9,11 @@ from dotenv import load_dotenv
 dotenv_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=dotenv_path)
 
+def jira_base_url(url: str) -> str:
+    """Адрес JIRA без страницы входа и завершающего «/»: https://jira.example.com/login.jsp → https://jira.example.com"""
+    return url.strip().split("/login")[0].rstrip("/")
+
+
 class JiraConfig(BaseSettings):
     """Конфигурация для работы с JIRA."""
     
@@ -22,12 +27,20 @@ class JiraConfig(BaseSettings):
     REQUEST_TIMEOUT: int = Field(default=30, description="Таймаут запросов в секундах")
     MAX_RETRIES: int = Field(default=3, description="Максимальное количество попыток при ошибке")
     CACHE_TTL: int = Field(default=300, description="Время жизни кэша в секундах")
+    CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, description="Сбоев подряд до размыкания выключателя")
+    CIRCUIT_RECOVERY_TIMEOUT: float = Field(default=30.0, description="Через сколько секунд пробовать JIRA снова")
     
     # Настройки прокси (опционально)
     PROXY_URL: Optional[str] = Field(default=None, description="URL прокси-сервера")
     PROXY_USERNAME: Optional[str] = Field(default=None, description="Имя пользователя прокси")
     PROXY_PASSWORD: Optional[str] = Field(default=None, description="Пароль прокси")
     
+    @field_validator("JIRA_URL")
+    @classmethod
+    def _base_url(cls, value: str) -> str:
+        # В конфиге бота JIRA.LOGIN_URL указывает на /login.jsp; API живёт в корне
+        return jira_base_url(value)
+
     model_config = SettingsConfigDict(
         env_file=str(dotenv_path),
         env_file_encoding="utf-8",
@@ -40,4 +40,17 @@ class JiraTransitionError(JiraError):
 
 class JiraCommentError(JiraError):
     """Ошибка при работе с комментариями."""
-    pass 
\ No newline at end of file
+    pass
+
+
+class CircuitOpenError(JiraConnectionError):
+    """JIRA считается недоступной: вызов отклонён выключателем без обращения к серверу."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JiraUncertainResultError(JiraError):
+    """Связь прервалась после отправки запроса: неизвестно, выполнила ли его JIRA, повтор может задублировать."""
+    pass
@@ -0,0 +1,74 @@
+"""
+Поля задачи FA (тип Failure) в формате REST API.
+
+Единственное место, где заданы id полей FA. Если схема полей из createmeta
+доступна, шлюз собирает задачу сборщиком по FA_FIELD_ALIASES с проверкой
+значений; build_failure_fields — сборка без проверки, когда схемы нет.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .exceptions import JiraValidationError
+
+FA_PROJECT = "FA"
+FA_ISSUE_TYPE = "Failure"
+
+# Дополнительные поля FA: имя параметра → id поля JIRA
+FA_OPTION_FIELDS = {
+    "problem_level": "customfield_13117",
+    "problem_service": "customfield_13937",
+    "naumen_failure_type": "customfield_14074",
+    "stream_1c": "customfield_17317",
+    "influence": "customfield_17107",
+}
+FA_TIME_START_FIELD = "customfield_13119"
+
+
+def format_start_time(value: str) -> str:
+    """YYYY-MM-DD HH:MM → время JIRA с поясом UTC+3 (Москва)"""
+    try:
+        dt = datetime.strptime(value, "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise JiraValidationError(f"Неверный формат времени начала: {value}")
+    return dt.strftime("%Y-%m-%dT%H:%M:00.000+0300")
+
+
+# Параметры build_failure_fields → поля JIRA (для сборщика по схеме createmeta)
+FA_FIELD_ALIASES = {
+    "summary": "summary",
+    "description": "description",
+    **FA_OPTION_FIELDS,
+    "time_start_problem": (FA_TIME_START_FIELD, format_start_time),
+}
+
+
+def build_failure_fields(
+    summary: str,
+    description: str,
+    problem_level: Optional[str] = None,
+    problem_service: Optional[str] = None,
+    naumen_failure_type: Optional[str] = None,
+    stream_1c: Optional[str] = None,
+    time_start_problem: Optional[str] = None,
+    influence: Optional[str] = None
+) -> Dict[str, Any]:
+    """Поля для POST /issue; пустые необязательные поля не передаются"""
+    fields: Dict[str, Any] = {
+        "project": {"key": FA_PROJECT},
+        "summary": summary,
+        "description": description,
+        "issuetype": {"name": FA_ISSUE_TYPE},
+    }
+    values = {
+        "problem_level": problem_level,
+        "problem_service": problem_service,
+        "naumen_failure_type": naumen_failure_type,
+        "stream_1c": stream_1c,
+        "influence": influence,
+    }
+    for name, value in values.items():
+        if value:
+            fields[FA_OPTION_FIELDS[name]] = {"value": value}
+    if time_start_problem:
+        fields[FA_TIME_START_FIELD] = format_start_time(time_start_problem)
+    return fields
@@ -0,0 +1,248 @@
+"""
+Схема полей создания задач по createmeta.
+
+Реестр строится один раз из ответа createmeta (живого или сохранённого в файл,
+как sched_metadata.json) и компилирует для типа задачи сборщик полей:
+имена параметров заранее сопоставлены id полей, допустимые значения списков
+собраны в множества. Ошибки в значениях находятся до запроса к JIRA,
+а не по ответу 400.
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+from .exceptions import JiraValidationError
+
+logger = logging.getLogger(__name__)
+
+# Поля, которые JIRA заполняет из ссылки на проект и тип задачи
+STATIC_FIELDS = ("project", "issuetype")
+
+Converter = Callable[[Any], Any]
+# Параметр сборщика → id поля или (id поля, преобразование значения)
+Aliases = Mapping[str, Union[str, Tuple[str, Converter]]]
+
+
+def _allowed_labels(entry: Dict[str, Any]) -> Tuple[str, ...]:
+    """Значение варианта списка, по которому его можно указать: value, name или id"""
+    return tuple(str(entry[k]) for k in ("value", "name", "id") if entry.get(k) is not None)
+
+
+@dataclass
+class FieldSchema:
+    """Описание поля из createmeta"""
+    id: str
+    name: str
+    required: bool = False
+    type: str = ""
+    items: str = ""
+    has_default: bool = False
+    allowed: FrozenSet[str] = frozenset()
+    # Подпись варианта → ключ, которым он передаётся в REST (value или name)
+    ref_keys: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_meta(cls, field_id: str, meta: Dict[str, Any]) -> "FieldSchema":
+        schema = meta.get("schema") or {}
+        allowed, ref_keys = set(), {}
+        for entry in meta.get("allowedValues") or []:
+            if not isinstance(entry, dict) or entry.get("disabled"):
+                continue
+            labels = _allowed_labels(entry)
+            allowed.update(labels)
+            ref_key = "value" if "value" in entry else "name" if "name" in entry else "id"
+            for label in labels:
+                ref_keys.setdefault(label, ref_key)
+        return cls(
+            id=field_id,
+            name=meta.get("name", field_id),
+            required=bool(meta.get("required")),
+            type=schema.get("type", ""),
+            items=schema.get("items", ""),
+            has_default=bool(meta.get("hasDefaultValue")),
+            allowed=frozenset(allowed),
+            ref_keys=ref_keys
+        )
+
+    def check(self, value: Any) -> Optional[str]:
+        """Текст ошибки для значения в формате REST или None"""
+        if not self.allowed:
+            return None
+        refs = value if isinstance(value, list) else [value]
+        for ref in refs:
+            labels = _allowed_labels(ref) if isinstance(ref, dict) else (str(ref),)
+            if not any(label in self.allowed for label in labels):
+                shown = labels[0] if labels else ref
+                return f"недопустимое значение «{shown}» поля «{self.name}»"
+        return None
+
+    def to_rest(self, value: Any) -> Any:
+        """Значение параметра → формат REST: строка варианта становится {"value": ...}"""
+        if isinstance(value, dict):
+            return value
+        if self.type == "array":
+            values = value if isinstance(value, (list, tuple)) else [value]
+            if not self.allowed:
+                return list(values)
+            return [v if isinstance(v, dict) else {self.ref_keys.get(str(v), "value"): v} for v in values]
+        if self.type == "user":
+            return {"name": value}
+        if self.allowed:
+            return {self.ref_keys.get(str(value), "value"): value}
+        return value
+
+
+class PayloadBuilder:
+    """Скомпилированный сборщик полей одного типа задачи"""
+
+    def __init__(self, schema: "IssueTypeSchema", aliases: Aliases):
+        self.schema = schema
+        self._params: Dict[str, Tuple[FieldSchema, Optional[Converter]]] = {}
+        unknown = []
+        for param, target in aliases.items():
+            field_id, convert = (target, None) if isinstance(target, str) else target
+            field_schema = schema.fields.get(field_id)
+            if field_schema is None:
+                unknown.append((param, field_id))
+                continue
+            self._params[param] = (field_schema, convert)
+        if unknown:
+            # Поля нет на экране создания: JIRA отклонит задачу с ним
+            logger.warning(
+                f"⚠️ {schema.project}/{schema.name}: поля недоступны при создании: "
+                + ", ".join(f"{param} ({field_id})" for param, field_id in unknown)
+            )
+        self._unavailable = frozenset(param for param, _ in unknown)
+        self._required = [
+            f for f in schema.fields.values()
+            if f.required and not f.has_default and f.id not in STATIC_FIELDS
+        ]
+
+    def build(self, **values) -> Dict[str, Any]:
+        """
+        Поля для POST /issue; пустые параметры пропускаются.
+
+        Raises:
+            JiraValidationError: Все найденные ошибки сразу, запрос не отправляется
+        """
+        fields: Dict[str, Any] = {
+            "project": {"key": self.schema.project},
+            "issuetype": {"id": self.schema.issue_type_id},
+        }
+        errors = []
+        for param, value in values.items():
+            if value in (None, "", [], {}):
+                continue
+            if param in self._unavailable:
+                errors.append(f"поле «{param}» недоступно при создании")
+                continue
+            if param not in self._params:
+                errors.append(f"неизвестный параметр «{param}»")
+                continue
+            field_schema, convert = self._params[param]
+            rest = field_schema.to_rest(convert(value) if convert else value)
+            error = field_schema.check(rest)
+            if error:
+                errors.append(error)
+                continue
+            fields[field_schema.id] = rest
+        errors += [f"не заполнено поле «{f.name}»" for f in self._required if f.id not in fields]
+        if errors:
+            raise JiraValidationError(
+                f"Задача {self.schema.project}/{self.schema.name} не прошла проверку: " + "; ".join(errors)
+            )
+        return fields
+
+
+@dataclass
+class IssueTypeSchema:
+    """Поля создания одного типа задачи в проекте"""
+    project: str
+    issue_type_id: str
+    name: str
+    fields: Dict[str, FieldSchema]
+    _builders: Dict[str, PayloadBuilder] = field(default_factory=dict, repr=False)
+
+    def builder(self, name: str, aliases: Aliases) -> PayloadBuilder:
+        """Сборщик компилируется при первом запросе и дальше переиспользуется"""
+        builder = self._builders.get(name)
+        if builder is None:
+            builder = self._builders[name] = PayloadBuilder(self, aliases)
+        return builder
+
+    def validate(self, fields: Dict[str, Any]):
+        """Проверяет готовые поля REST (например, собранные вручную в ticket_creator)"""
+        errors = []
+        for field_id, value in fields.items():
+            if field_id in STATIC_FIELDS:
+                continue
+            field_schema = self.fields.get(field_id)
+            if field_schema is None:
+                errors.append(f"поле «{field_id}» недоступно при создании")
+                continue
+            error = field_schema.check(value)
+            if error:
+                errors.append(error)
+        for field_schema in self.fields.values():
+            if (field_schema.required and not field_schema.has_default
+                    and field_schema.id not in STATIC_FIELDS and fields.get(field_schema.id) in (None, "", [], {})):
+                errors.append(f"не заполнено поле «{field_schema.name}»")
+        if errors:
+            raise JiraValidationError(
+                f"Задача {self.project}/{self.name} не прошла проверку: " + "; ".join(errors)
+            )
+
+
+class FieldSchemaRegistry:
+    """Схемы полей по (проект, тип задачи); тип задачи ищется по id или имени."""
+
+    def __init__(self):
+        self._types: Dict[Tuple[str, str], IssueTypeSchema] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_createmeta(cls, metadata: Dict[str, Any]) -> "FieldSchemaRegistry":
+        registry = cls()
+        registry.update(metadata)
+        return registry
+
+    @classmethod
+    def load(cls, path: str) -> "FieldSchemaRegistry":
+        """Реестр из сохранённого ответа createmeta (expand=projects.issuetypes.fields)"""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_createmeta(json.load(f))
+
+    def update(self, metadata: Dict[str, Any]) -> List[IssueTypeSchema]:
+        """Добавляет типы задач из ответа createmeta; типы без полей пропускаются"""
+        added = []
+        for project in metadata.get("projects", []):
+            for issue_type in project.get("issuetypes", []):
+                if "fields" not in issue_type:
+                    continue
+                schema = IssueTypeSchema(
+                    project=project["key"],
+                    issue_type_id=str(issue_type["id"]),
+                    name=issue_type.get("name", ""),
+                    fields={fid: FieldSchema.from_meta(fid, meta) for fid, meta in issue_type["fields"].items()}
+                )
+                with self._lock:
+                    self._types[(schema.project, schema.issue_type_id)] = schema
+                    self._types[(schema.project, schema.name.casefold())] = schema
+                added.append(schema)
+        return added
+
+    def get(self, project: str, issue_type: str) -> Optional[IssueTypeSchema]:
+        with self._lock:
+            return self._types.get((project, str(issue_type))) or self._types.get((project, str(issue_type).casefold()))
+
+    def forget(self, project: str):
+        """Сбрасывает схемы проекта: после отказа JIRA они будут загружены заново"""
+        with self._lock:
+            for key in [k for k in self._types if k[0] == project]:
+                del self._types[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len({id(schema) for schema in self._types.values()})
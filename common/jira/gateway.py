@@ -0,0 +1,353 @@
+"""
+Единый асинхронный шлюз JIRA.
+
+Все боты обращаются к JIRA через один объект: общий пул соединений,
+кэш метаданных, схема полей createmeta, политика повторов и общий
+выключатель живут здесь.
+Переиспользование соединений видно по счётчикам TraceConfig (metrics()).
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import aiohttp
+
+from .client import JiraApiClient, handle_jira_errors
+from .config import JiraConfig
+from .exceptions import (
+    CircuitOpenError, JiraConnectionError, JiraError, JiraRateLimitError, JiraUncertainResultError,
+    JiraValidationError
+)
+from .fa_fields import FA_FIELD_ALIASES, FA_ISSUE_TYPE, FA_PROJECT, build_failure_fields
+from .field_schema import FieldSchemaRegistry, IssueTypeSchema
+from .metadata import DEFAULT_MAX_AGE, DEFAULT_SNAPSHOT_PATH, load_snapshot
+from .session import create_pooled_session, DEFAULT_POOL_LIMIT
+from .transitions import TransitionResolver
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+REQUEST_LABEL_PREFIX = "bot-"
+
+
+def request_label(request_id: str) -> str:
+    """Метка задачи с ключом идемпотентности: по ней повтор находит уже созданную задачу"""
+    return f"{REQUEST_LABEL_PREFIX}{request_id}"
+
+
+class ConnectionStats:
+    """Счётчики запросов и соединений aiohttp, собираемые через TraceConfig"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.errors = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_end(session, context, params):
+            self.requests += 1
+
+        async def on_request_exception(session, context, params):
+            self.errors += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.reuse_ratio, 3),
+        }
+
+
+class JiraGateway:
+    """Точка входа в JIRA для всех ботов: REST и переходы на одной сессии."""
+
+    def __init__(self, config: JiraConfig, pool_limit: int = DEFAULT_POOL_LIMIT,
+                 max_retries: Optional[int] = None):
+        self.config = config
+        self.pool_limit = pool_limit
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.stats = ConnectionStats()
+        self.client = JiraApiClient(config)
+        self.transitions = TransitionResolver(self.client)
+        self.schemas = FieldSchemaRegistry()
+        # Проекты, схемы которых взяты из снимка и ещё не сверялись с JIRA
+        self._snapshot_projects: set = set()
+        # Выключатель общий с клиентами: он же используется для cached-запросов шлюза
+        self.breaker = self.client.breaker
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._start_lock = asyncio.Lock()
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    @classmethod
+    def from_settings(cls, url: str, token: str, project: str = "FA",
+                      request_timeout: int = 15, **kwargs) -> "JiraGateway":
+        """Шлюз по адресу JIRA (можно с /login.jsp) и токену"""
+        config = JiraConfig(
+            JIRA_URL=url,
+            JIRA_API_TOKEN=token,
+            JIRA_DEFAULT_PROJECT=project,
+            REQUEST_TIMEOUT=request_timeout
+        )
+        return cls(config, **kwargs)
+
+    def load_snapshot(self, path: str = DEFAULT_SNAPSHOT_PATH, max_age: Optional[float] = DEFAULT_MAX_AGE) -> bool:
+        """
+        Загружает схемы полей из снимка метаданных, чтобы не запрашивать createmeta при запуске.
+        Устаревший снимок и снимок другого сервера JIRA пропускаются.
+        """
+        snapshot = load_snapshot(path, max_age=max_age, jira_url=self.config.JIRA_URL)
+        if snapshot is None:
+            return False
+        types = self.schemas.update(snapshot["createmeta"])
+        self._snapshot_projects.update(schema.project for schema in types)
+        logger.info(f"📦 Схемы полей JIRA из снимка {path} ({snapshot.get('fetched_at')}): {len(types)} типов задач")
+        return True
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def start(self) -> "JiraGateway":
+        """Открывает общую сессию; повторные вызовы ничего не делают"""
+        async with self._start_lock:
+            if not self.started:
+                self._session = create_pooled_session(
+                    self.config, limit=self.pool_limit, trace_configs=[self.stats.trace_config()]
+                )
+                self.client.use_session(self._session)
+                logger.info(f"🔌 Шлюз JIRA открыт: {self.config.JIRA_URL} (пул {self.pool_limit})")
+        return self
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info(f"🔌 Шлюз JIRA закрыт: {self.metrics()}")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # --- Политика повторов ---
+
+    def _retry_delay(self, attempt: int) -> float:
+        delay = min(RETRY_BASE_DELAY * (2 ** (attempt - 1)), RETRY_MAX_DELAY)
+        return delay * (0.5 + random.random() / 2)
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, retry: bool = True, **kwargs) -> Any:
+        """
+        Вызывает метод клиента, повторяя сбои соединения и 429.
+        Неидемпотентные операции (создание задач) вызываются с retry=False:
+        их повторяет очередь заданий, а не шлюз.
+        """
+        await self.start()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except (JiraConnectionError, JiraRateLimitError) as e:
+                if not retry or attempt > self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"⚠️ JIRA: {e}. Повтор {attempt}/{self.max_retries} через {delay:.1f} с")
+                await asyncio.sleep(delay)
+
+    # --- Кэш ---
+
+    async def cached(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """Значение из кэша; одновременные промахи по одному ключу делают один запрос"""
+        ttl = self.config.CACHE_TTL if ttl is None else ttl
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(loader())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        value = await asyncio.shield(future)
+        self._cache[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        self._cache.pop(key, None)
+
+    # --- Операции ---
+
+    @handle_jira_errors
+    async def _server_info(self) -> Dict[str, Any]:
+        async with self._session.get(f"{self.client.base_url}/serverInfo") as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def warm_up(self) -> Dict[str, Any]:
+        """Открывает соединение заранее, чтобы первый запрос не платил за DNS, TCP и TLS"""
+        await self.start()
+        return await self.cached("serverInfo", lambda: self.call(self._server_info))
+
+    async def get_createmeta(self, project: str, issue_type_id: Optional[str] = None) -> Dict[str, Any]:
+        """createmeta проекта с полями (кэшируется на CACHE_TTL)"""
+        return await self.cached(
+            ("createmeta", project, issue_type_id),
+            lambda: self.call(self.client.get_create_issue_metadata, project, issue_type_id, "projects.issuetypes.fields")
+        )
+
+    async def field_schema(self, project: str, issue_type: str) -> Optional[IssueTypeSchema]:
+        """
+        Схема полей типа задачи: из реестра, иначе из createmeta проекта.
+        None, если createmeta недоступна — тогда задача уходит без локальной проверки.
+        """
+        schema = self.schemas.get(project, issue_type)
+        if schema is not None:
+            return schema
+
+        async def load():
+            try:
+                return await self.get_createmeta(project)
+            except JiraError as e:
+                logger.warning(f"⚠️ createmeta {project} недоступна, поля не проверяются: {e}")
+                return None
+
+        # Неудача тоже кэшируется на CACHE_TTL, чтобы не спрашивать createmeta перед каждой задачей
+        metadata = await self.cached(("schema", project), load)
+        if metadata:
+            self.schemas.update(metadata)
+        return self.schemas.get(project, issue_type)
+
+    async def find_created(self, project: str, request_id: str) -> Optional[Dict[str, Any]]:
+        """Задача, уже созданная с ключом request_id, или None"""
+        page = await self.call(
+            self.client.search_page, f'project = "{project}" AND labels = "{request_label(request_id)}"',
+            fields=["key"], max_results=1
+        )
+        issues = page.get("issues") or []
+        return {"id": issues[0].get("id"), "key": issues[0]["key"]} if issues else None
+
+    @staticmethod
+    def _tag(fields: Dict[str, Any], schema: Optional[IssueTypeSchema], request_id: Optional[str]) -> bool:
+        """Добавляет метку request_id, если поле labels есть на экране создания"""
+        if not request_id or (schema is not None and "labels" not in schema.fields):
+            return False
+        labels: List[str] = list(fields.get("labels") or [])
+        fields["labels"] = labels + [request_label(request_id)]
+        return True
+
+    def _forget_schema(self, project: str):
+        self.schemas.forget(project)
+        self._snapshot_projects.discard(project)
+        self.invalidate(("schema", project))
+        self.invalidate(("createmeta", project, None))
+
+    async def _checked(self, project: str, issue_type: str,
+                       check: Callable[[Optional[IssueTypeSchema]], Any]) -> Tuple[Optional[IssueTypeSchema], Any]:
+        """
+        check(схема) по схеме полей типа задачи. Если схема из снимка не приняла
+        значения, createmeta загружается заново и проверка повторяется один раз.
+        """
+        schema = await self.field_schema(project, issue_type)
+        try:
+            return schema, check(schema)
+        except JiraValidationError as e:
+            if schema is None or project not in self._snapshot_projects:
+                raise
+            logger.info(f"🔄 {project}: значения не прошли проверку по снимку ({e}), загружаю createmeta заново")
+            self._forget_schema(project)
+        schema = await self.field_schema(project, issue_type)
+        return schema, check(schema)
+
+    async def _create(self, project: str, fields: Dict[str, Any], request_id: Optional[str] = None,
+                      tagged: bool = False, resume: bool = False) -> Dict[str, Any]:
+        if tagged and resume:
+            # Прошлая попытка могла создать задачу, но ответ до нас не дошёл
+            found = await self.find_created(project, request_id)
+            if found:
+                logger.info(f"♻️ Задача {found['key']} уже создана прошлой попыткой ({request_label(request_id)})")
+                return found
+        try:
+            result = await self.call(self.client.create_issue, {"fields": fields}, retry=False)
+        except JiraValidationError:
+            # Схема могла устареть: в следующий раз она будет загружена заново
+            self._forget_schema(project)
+            raise
+        except JiraConnectionError as e:
+            if request_id and not tagged and not isinstance(e, CircuitOpenError):
+                # Без метки уже созданную задачу не найти — повтор мог бы её задублировать
+                raise JiraUncertainResultError(f"Неизвестно, создана ли задача {project}: {e}") from e
+            raise
+        if not result or not result.get("key"):
+            raise JiraError(f"JIRA не вернула ключ задачи: {result}")
+        return result
+
+    async def create_issue(self, issue_data: Dict[str, Any], request_id: Optional[str] = None,
+                           resume: bool = False) -> Dict[str, Any]:
+        """
+        Создаёт задачу из готовых полей REST, проверив их по схеме createmeta.
+        request_id — ключ идемпотентности задания; resume — повтор, перед которым
+        ищется задача, созданная прошлой попыткой.
+        """
+        fields = dict(issue_data["fields"])
+        project = fields["project"]["key"]
+        issue_type = fields["issuetype"].get("id") or fields["issuetype"].get("name")
+        schema, _ = await self._checked(project, issue_type, lambda schema: schema.validate(fields) if schema else None)
+        tagged = self._tag(fields, schema, request_id)
+        return await self._create(project, fields, request_id, tagged, resume)
+
+    async def create_fa_issue(self, request_id: Optional[str] = None, resume: bool = False,
+                              **values) -> Dict[str, Any]:
+        """Создаёт задачу FA; values — параметры build_failure_fields, остальное — как у create_issue"""
+        def build(schema: Optional[IssueTypeSchema]) -> Dict[str, Any]:
+            if schema is not None:
+                return schema.builder("fa", FA_FIELD_ALIASES).build(**values)
+            return build_failure_fields(**values)
+
+        schema, fields = await self._checked(FA_PROJECT, FA_ISSUE_TYPE, build)
+        tagged = self._tag(fields, schema, request_id)
+        return await self._create(FA_PROJECT, fields, request_id, tagged, resume)
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.stats.as_dict()
+
+    def render_metrics(self, name: str = "jira") -> str:
+        """Счётчики соединений в текстовом формате Prometheus"""
+        stats = self.stats
+        rows = [
+            ("jira_gateway_requests_total", "counter", "Запросы к JIRA через шлюз", stats.requests),
+            ("jira_gateway_errors_total", "counter", "Запросы, завершившиеся ошибкой соединения", stats.errors),
+            ("jira_gateway_connections_created_total", "counter", "Новые TCP/TLS-соединения", stats.connections_created),
+            ("jira_gateway_connections_reused_total", "counter", "Запросы на уже открытом соединении", stats.connections_reused),
+        ]
+        lines = []
+        for metric, kind, help_text, value in rows:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", f'{metric}{{name="{name}"}} {value}']
+        return "\n".join(lines) + "\n"
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 from datetime import datetime
 
 
@@ -77,12 +77,13 @@ class JiraClient(ABC):
         pass
     
     @abstractmethod
-    async def get_issue(self, issue_key: str) -> JiraIssue:
+    async def get_issue(self, issue_key: str, fields: Optional[Sequence[str]] = None) -> JiraIssue:
         """
         Получение задачи по ключу.
         
         Args:
             issue_key: Ключ задачи
+            fields: Запрашиваемые поля (None — все)
             
         Returns:
             Задача
@@ -111,17 +112,19 @@ class JiraClient(ABC):
     async def transition_issue(
         self,
         issue_key: str,
-        transition_id: str
-    ) -> JiraIssue:
+        transition_id: str,
+        refetch: bool = True
+    ) -> Optional[JiraIssue]:
         """
         Изменение статуса задачи.
         
         Args:
             issue_key: Ключ задачи
             transition_id: ID перехода
+            refetch: Запросить задачу заново после перехода
             
         Returns:
-            Обновленная задача
+            Обновленная задача (None при refetch=False)
         """
         pass
     
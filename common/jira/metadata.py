@@ -0,0 +1,180 @@
+"""
+Снимок метаданных JIRA: проекты, типы задач и поля создания (createmeta).
+
+Снимок собирается параллельными запросами (createmeta — пачками проектов
+в одном запросе), хранится компактным JSON с номером версии и загружается
+ботами при запуске вместо запросов к JIRA. Снимок старше max_age или
+снятый с другого сервера JIRA не используется.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import jira_base_url
+from .exceptions import JiraError
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = "data/jira_metadata.json"
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# Проектов в одном запросе createmeta (projectKeys через запятую)
+CREATEMETA_BATCH = 5
+DEFAULT_CONCURRENCY = 4
+CREATEMETA_EXPAND = "projects.issuetypes.fields"
+
+# Что остаётся от описания поля в снимке — ровно то, что нужно FieldSchemaRegistry
+_FIELD_KEYS = ("name", "required", "hasDefaultValue")
+_SCHEMA_KEYS = ("type", "items", "custom")
+_ALLOWED_KEYS = ("id", "value", "name", "disabled")
+
+
+def _compact_field(meta: Dict[str, Any]) -> Dict[str, Any]:
+    field = {k: meta[k] for k in _FIELD_KEYS if meta.get(k)}
+    schema = {k: v for k, v in (meta.get("schema") or {}).items() if k in _SCHEMA_KEYS}
+    if schema:
+        field["schema"] = schema
+    allowed = [
+        {k: v[k] for k in _ALLOWED_KEYS if k in v}
+        for v in meta.get("allowedValues") or [] if isinstance(v, dict)
+    ]
+    if allowed:
+        field["allowedValues"] = allowed
+    return field
+
+
+def compact_createmeta(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """createmeta без self-ссылок, аватаров и описаний"""
+    return {"projects": [
+        {
+            "key": project["key"],
+            "name": project.get("name", ""),
+            "issuetypes": [
+                {
+                    "id": str(issue_type["id"]),
+                    "name": issue_type.get("name", ""),
+                    "fields": {fid: _compact_field(meta) for fid, meta in issue_type.get("fields", {}).items()},
+                }
+                for issue_type in project.get("issuetypes", [])
+            ],
+        }
+        for project in metadata.get("projects", [])
+    ]}
+
+
+async def fetch_metadata(client, projects: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                         batch_size: int = CREATEMETA_BATCH) -> Dict[str, Any]:
+    """
+    Собирает снимок метаданных параллельно.
+
+    Args:
+        client: JiraApiClient с открытой сессией
+        projects: Ключи проектов, для которых нужна createmeta
+    """
+    projects = list(dict.fromkeys(projects))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    batches = [",".join(projects[i:i + batch_size]) for i in range(0, len(projects), batch_size)]
+    all_projects, issue_types, *createmeta = await asyncio.gather(
+        bounded(client.get_all_projects()),
+        bounded(client.get_issue_types()),
+        *[bounded(client.get_create_issue_metadata(batch, None, CREATEMETA_EXPAND)) for batch in batches]
+    )
+    return {
+        "version": SNAPSHOT_VERSION,
+        "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        "jira_url": client.config.JIRA_URL,
+        "projects": [{"id": p.get("id"), "key": p["key"], "name": p.get("name", "")} for p in all_projects],
+        "issue_types": [{"id": t["id"], "name": t.get("name", "")} for t in issue_types],
+        "createmeta": compact_createmeta(
+            {"projects": [p for part in createmeta for p in part.get("projects", [])]}
+        ),
+    }
+
+
+def save_snapshot(snapshot: Dict[str, Any], path: str = DEFAULT_SNAPSHOT_PATH):
+    """Пишет снимок компактно; файл заменяется целиком, чтобы бот не прочитал его наполовину"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, max_age: Optional[float] = DEFAULT_MAX_AGE,
+                  jira_url: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Снимок из файла; None, если его нет, он повреждён, другой версии,
+    старше max_age секунд (None — без ограничения) или снят не с jira_url.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (ValueError, OSError) as e:
+        logger.warning(f"⚠️ Не удалось прочитать снимок метаданных JIRA {path}: {e}")
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"⚠️ Снимок метаданных JIRA {path}: версия {snapshot.get('version')}, "
+                       f"ожидается {SNAPSHOT_VERSION} — не используется")
+        return None
+    if jira_url and jira_base_url(snapshot.get("jira_url") or "") != jira_base_url(jira_url):
+        logger.warning(f"⚠️ Снимок метаданных JIRA {path} снят с {snapshot.get('jira_url')}, "
+                       f"а бот работает с {jira_url} — не используется")
+        return None
+    if max_age is not None:
+        try:
+            age = (datetime.now() - datetime.fromisoformat(snapshot["fetched_at"])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            age = None
+        if age is None or age > max_age:
+            logger.warning(f"⚠️ Снимок метаданных JIRA {path} от {snapshot.get('fetched_at')} "
+                           f"старше {max_age:.0f} с — не используется")
+            return None
+    return snapshot
+
+
+def describe_issue_type(snapshot: Dict[str, Any], project: str, issue_type: str) -> List[str]:
+    """Краткое описание полей типа задачи: обязательные поля и варианты списков"""
+    for project_meta in snapshot["createmeta"]["projects"]:
+        if project_meta["key"] != project:
+            continue
+        for type_meta in project_meta["issuetypes"]:
+            if issue_type not in (type_meta["id"], type_meta["name"]) \
+                    and type_meta["name"].casefold() != issue_type.casefold():
+                continue
+            lines = [f"📋 {project} / {type_meta['name']} (ID: {type_meta['id']}), полей: {len(type_meta['fields'])}"]
+            for field_id, field in sorted(type_meta["fields"].items(), key=lambda f: not f[1].get("required")):
+                mark = "🔴" if field.get("required") else "•"
+                line = f"  {mark} {field_id} — {field.get('name', field_id)} ({field.get('schema', {}).get('type', '?')})"
+                values = [v.get("value") or v.get("name") for v in field.get("allowedValues", []) if not v.get("disabled")]
+                if values:
+                    shown = ", ".join(str(v) for v in values[:10])
+                    line += f": {shown}" + (f" … ещё {len(values) - 10}" if len(values) > 10 else "")
+                lines.append(line)
+            return lines
+        return [f"❌ Тип задачи «{issue_type}» не найден в createmeta проекта {project}"]
+    return [f"❌ Проект {project} не найден в createmeta"]
+
+
+async def refresh_snapshot(client, projects: Iterable[str], path: str = DEFAULT_SNAPSHOT_PATH,
+                           concurrency: int = DEFAULT_CONCURRENCY) -> Optional[Dict[str, Any]]:
+    """Собирает и сохраняет снимок; при ошибке JIRA прежний файл остаётся на месте"""
+    try:
+        snapshot = await fetch_metadata(client, projects, concurrency=concurrency)
+    except JiraError as e:
+        logger.error(f"❌ Не удалось собрать метаданные JIRA: {e}")
+        return None
+    await asyncio.to_thread(save_snapshot, snapshot, path)
+    logger.info(f"💾 Снимок метаданных JIRA сохранён: {path}")
+    return snapshot
@@ -45,6 +45,10 @@ class JiraIssueModel(JiraIssue):
     @property
     def updated(self) -> datetime:
         return self._updated
+
+    @property
+    def raw_data(self) -> Dict[str, Any]:
+        return self._raw_data
     
     @classmethod
     def from_raw_data(cls, data: Dict[str, Any]) -> "JiraIssueModel":
@@ -63,7 +67,7 @@ class JiraIssueModel(JiraIssue):
             _summary=fields["summary"],
             _description=fields.get("description", ""),
             _status=fields["status"]["name"],
-            _assignee=fields.get("assignee", {}).get("displayName"),
+            _assignee=(fields.get("assignee") or {}).get("displayName"),
             _created=datetime.fromisoformat(fields["created"].replace("Z", "+00:00")),
             _updated=datetime.fromisoformat(fields["updated"].replace("Z", "+00:00")),
             _raw_data=data
@@ -81,6 +85,7 @@ class JiraTransition:
     is_global: bool
     is_initial: bool
     is_conditional: bool
+    to_category: Optional[str] = None
     
     @classmethod
     def from_raw_data(cls, data: Dict[str, Any]) -> "JiraTransition":
@@ -100,7 +105,8 @@ class JiraTransition:
             has_screen=data.get("hasScreen", False),
             is_global=data.get("isGlobal", False),
             is_initial=data.get("isInitial", False),
-            is_conditional=data.get("isConditional", False)
+            is_conditional=data.get("isConditional", False),
+            to_category=(data["to"].get("statusCategory") or {}).get("key")
         )
 
 
@@ -0,0 +1,265 @@
+"""
+Надёжная очередь (outbox) операций с JIRA на SQLite.
+
+Обработчик бота кладёт задание в очередь и сразу отвечает пользователю,
+а фоновый воркер выполняет задания с ограниченной параллельностью
+и повторяет неудачные попытки с экспоненциальной задержкой.
+Задания переживают перезапуск бота.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .exceptions import JiraUncertainResultError, JiraValidationError
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+# Выполняет операцию в JIRA и возвращает результат (например, ключ задачи).
+# Получает payload с request_id (ключ идемпотентности задания) и attempt (номер попытки):
+# при attempt > 1 прошлая попытка могла дойти до JIRA
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# Вызывается после успешного выполнения: (payload, result)
+DoneCallback = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+# Вызывается, когда попытки исчерпаны: (payload, текст ошибки)
+FailedCallback = Callable[[Dict[str, Any], str], Awaitable[None]]
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Ошибка в самом запросе (валидация, 4xx кроме 429): повтор даст тот же ответ"""
+    if isinstance(error, (JiraValidationError, JiraUncertainResultError)):
+        return True
+    status = getattr(error, "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+@dataclass
+class OutboxJob:
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+@dataclass
+class _Kind:
+    handler: JobHandler
+    on_done: Optional[DoneCallback] = None
+    on_failed: Optional[FailedCallback] = None
+
+
+class JiraOutbox:
+    """Очередь заданий JIRA с фоновым воркером."""
+
+    def __init__(
+        self,
+        db_path: str,
+        concurrency: int = 2,
+        max_attempts: int = 8,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        poll_interval: float = 30.0
+    ):
+        self._db_path = db_path
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self._kinds: Dict[str, _Kind] = {}
+        self._wakeup = asyncio.Event()
+        self._running: set = set()
+        self._stopping = False
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path)
+
+    def _init_db(self):
+        directory = os.path.dirname(self._db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jira_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    result TEXT,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON jira_outbox (status, next_attempt_at)")
+            # Задания, прерванные остановкой бота, выполняем заново; прерванная попытка засчитывается
+            conn.execute(
+                "UPDATE jira_outbox SET status = ?, attempts = attempts + 1 WHERE status = ?", (PENDING, PROCESSING)
+            )
+
+    def register(self, kind: str, handler: JobHandler,
+                 on_done: Optional[DoneCallback] = None, on_failed: Optional[FailedCallback] = None):
+        """Регистрирует обработчик для вида заданий"""
+        self._kinds[kind] = _Kind(handler, on_done, on_failed)
+
+    # --- Синхронные операции с БД (выполняются в отдельном потоке) ---
+
+    def _insert(self, kind: str, payload: Dict[str, Any]) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jira_outbox (kind, payload, status, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload, ensure_ascii=False), PENDING, now, now)
+            )
+            return cursor.lastrowid
+
+    def _claim(self, limit: int) -> List[OutboxJob]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, kind, payload, attempts FROM jira_outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, time.time(), limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jira_outbox SET status = ? WHERE id = ?",
+                [(PROCESSING, row[0]) for row in rows]
+            )
+        return [OutboxJob(row[0], row[1], json.loads(row[2]), row[3]) for row in rows]
+
+    def _next_due_in(self) -> Optional[float]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM jira_outbox WHERE status = ?", (PENDING,)
+            ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def _finish(self, job_id: int, result: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jira_outbox SET status = ?, result = ?, last_error = NULL WHERE id = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), job_id)
+            )
+
+    def _fail(self, job_id: int, attempts: int, error: str, retry_at: Optional[float]):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jira_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (PENDING if retry_at else FAILED, attempts, error, retry_at or time.time(), job_id)
+            )
+
+    def _counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jira_outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # --- Асинхронный интерфейс ---
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any]) -> int:
+        """Сохраняет задание и будит воркер. Возвращает id задания."""
+        if kind not in self._kinds:
+            raise ValueError(f"Неизвестный вид задания: {kind}")
+        payload = {**payload, "request_id": payload.get("request_id") or uuid.uuid4().hex[:16]}
+        job_id = await asyncio.to_thread(self._insert, kind, payload)
+        logger.info(f"📥 Задание JIRA #{job_id} ({kind}) поставлено в очередь")
+        self._wakeup.set()
+        return job_id
+
+    async def stats(self) -> Dict[str, int]:
+        """Количество заданий по статусам"""
+        return await asyncio.to_thread(self._counts)
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+
+    async def _process(self, job: OutboxJob):
+        kind = self._kinds.get(job.kind)
+        attempts = job.attempts + 1
+        if kind is None:
+            await asyncio.to_thread(self._fail, job.id, attempts, f"Нет обработчика для {job.kind}", None)
+            logger.error(f"❌ Задание JIRA #{job.id}: нет обработчика для «{job.kind}»")
+            return
+        try:
+            result = await kind.handler({**job.payload, "attempt": attempts})
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after is not None:
+                # JIRA заведомо недоступна (выключатель разомкнут) — попытку не засчитываем
+                delay = max(retry_after, 1.0)
+                await asyncio.to_thread(self._fail, job.id, job.attempts, error, time.time() + delay)
+                logger.info(f"⏸️ Задание JIRA #{job.id} ({job.kind}) отложено на {delay:.0f} с: {error}")
+                return
+            permanent = is_permanent_error(e)
+            if permanent or attempts >= self.max_attempts:
+                await asyncio.to_thread(self._fail, job.id, attempts, error, None)
+                if permanent:
+                    logger.error(f"❌ Задание JIRA #{job.id} ({job.kind}) отклонено без повторов: {error}")
+                else:
+                    logger.error(f"❌ Задание JIRA #{job.id} ({job.kind}) не выполнено после {attempts} попыток: {error}")
+                if kind.on_failed:
+                    await self._safe_callback(kind.on_failed, job.payload, error)
+            else:
+                delay = self._retry_delay(attempts)
+                await asyncio.to_thread(self._fail, job.id, attempts, error, time.time() + delay)
+                logger.warning(f"⚠️ Задание JIRA #{job.id} ({job.kind}), попытка {attempts}: {error}. Повтор через {delay:.0f} с")
+            return
+
+        # Задача в JIRA уже создана: ошибки обратного вызова не должны приводить к повтору
+        await asyncio.to_thread(self._finish, job.id, result or {})
+        logger.info(f"✅ Задание JIRA #{job.id} ({job.kind}) выполнено: {result}")
+        if kind.on_done:
+            await self._safe_callback(kind.on_done, job.payload, result or {})
+
+    @staticmethod
+    async def _safe_callback(callback, *args):
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.error(f"❌ Ошибка обработки результата задания JIRA: {e}", exc_info=True)
+
+    async def run(self):
+        """Цикл воркера: выбирает готовые задания, не превышая concurrency одновременно"""
+        logger.info(f"📤 Воркер очереди JIRA запущен (параллельно: {self.concurrency})")
+        while not self._stopping:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            if free > 0:
+                for job in await asyncio.to_thread(self._claim, free):
+                    task = asyncio.create_task(self._process(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._on_task_done)
+
+            timeout = self.poll_interval
+            if len(self._running) < self.concurrency:
+                due_in = await asyncio.to_thread(self._next_due_in)
+                if due_in is not None:
+                    timeout = min(timeout, due_in)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_task_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def stop(self, timeout: float = 10.0):
+        """Останавливает воркер, давая текущим заданиям завершиться"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._running:
+            await asyncio.wait(list(self._running), timeout=timeout)
@@ -0,0 +1,35 @@
+"""
+Общий пул HTTP-соединений с JIRA.
+
+Клиенты REST API и Service Desk одного бота работают поверх одной
+aiohttp-сессии, поэтому соединения (TCP/TLS) переиспользуются между заявками.
+"""
+from typing import Optional, Sequence
+
+import aiohttp
+
+from .config import JiraConfig
+
+# Сколько соединений с JIRA держать одновременно
+DEFAULT_POOL_LIMIT = 10
+
+
+def jira_headers(config: JiraConfig) -> dict:
+    return {
+        'Accept': 'application/json',
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {config.JIRA_API_TOKEN}'
+    }
+
+
+def create_pooled_session(config: JiraConfig, limit: int = DEFAULT_POOL_LIMIT,
+                          connector: Optional[aiohttp.BaseConnector] = None,
+                          trace_configs: Sequence[aiohttp.TraceConfig] = ()) -> aiohttp.ClientSession:
+    """Сессия с ограниченным пулом keep-alive соединений и кэшем DNS"""
+    connector = connector or aiohttp.TCPConnector(limit=limit, ttl_dns_cache=300)
+    return aiohttp.ClientSession(
+        headers=jira_headers(config),
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT),
+        trace_configs=list(trace_configs)
+    )
@@ -6,28 +6,30 @@ import os
 from dotenv import load_dotenv
 import json
 from datetime import datetime
-import requests
+from typing import Union
 
 # Внимание: относительные импорты здесь не работают, если файл запускается напрямую.
 # Если вы запускаете этот файл напрямую, убедитесь, что PYTHONPATH настроен корректно.
 # Для запуска из корневой директории проекта можно использовать: python -m common.jira.ticket_creator
 from common.jira.client import JiraApiClient
 from common.jira.config import JiraConfig # Импортируем JiraConfig
+from common.jira.gateway import JiraGateway
 
 # Внимание: относительные импорты здесь не работают, если файл запускается напрямую.
 # Все импорты JiraApiClient, JiraConfig и JiraError будут выполнены внутри main().
 
 
 async def create_technical_issue(
-    client: JiraApiClient,
+    client: Union[JiraApiClient, JiraGateway],
     employee_name: str,
     manager_name: str,
     description: str = "",
     date: str = "",
     start_time: str = "",
-    problem_side: str = ""
+    problem_side: str = "",
+    **options
 ) -> dict:
-    """Создает заявку о технической неполадке в JIRA Service Desk."""
+    """Создает заявку о технической неполадке в JIRA Service Desk. options — параметры create_issue шлюза."""
     project_key = "SCHED"
     issue_type_id = "10408"  # ID для 'Сервисный запрос'
 
@@ -64,18 +66,19 @@ async def create_technical_issue(
         elif "компании" in problem_side.lower():
             fields["customfield_17432"] = {"id": "18047"}  # Проблема со стороны компании
 
-    return await client.create_issue({"fields": fields})
+    return await client.create_issue({"fields": fields}, **options)
 
 
 async def create_sick_leave(
-    client: JiraApiClient,
+    client: Union[JiraApiClient, JiraGateway],
     employee_name: str,
     manager_name: str,
     description: str = "",
     open_date: str = "",
-    for_who: str = ""
+    for_who: str = "",
+    **options
 ) -> dict:
-    """Создает заявку о больничном в JIRA Service Desk."""
+    """Создает заявку о больничном в JIRA Service Desk. options — параметры create_issue шлюза."""
     project_key = "SCHED"
     issue_type_id = "10408"  # ID для 'Сервисный запрос'
 
@@ -109,7 +112,7 @@ async def create_sick_leave(
         elif "себя" in for_who.lower():
             fields["customfield_16004"] = {"id": "18028"}  # На себя
 
-    return await client.create_issue({"fields": fields})
+    return await client.create_issue({"fields": fields}, **options)
 
 
 async def get_issue_details(client: JiraApiClient, issue_key: str) -> dict:
@@ -121,55 +124,6 @@ async def get_issue_details(client: JiraApiClient, issue_key: str) -> dict:
     return issue
 
 
-def create_sd_request(
-    jira_url: str,
-    api_token: str,
-    service_desk_id: str,
-    request_type_id: str,
-    summary: str,
-    description: str,
-    assignee: str
-) -> dict:
-    """
-    Создает заявку через JIRA Service Desk API.
-    
-    Args:
-        jira_url: URL JIRA (например, https://jira.petrovich.tech)
-        api_token: API токен
-        service_desk_id: ID сервис-деска (например, "55")
-        request_type_id: ID типа запроса (например, "926" для больничного)
-        summary: Заголовок заявки
-        description: Описание заявки
-        assignee: Имя исполнителя (например, "firstline.ws@petrovich.ru")
-    
-    Returns:
-        dict: Ответ от JIRA Service Desk API
-    """
-    print(f"Создаем заявку через Service Desk API на {jira_url}/rest/servicedeskapi/request")
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "X-Atlassian-Token": "no-check"
-    }
-    payload = {
-        "serviceDeskId": service_desk_id,
-        "requestTypeId": request_type_id,
-        "requestFieldValues": {
-            "summary": summary,
-            "description": description,
-            "assignee": assignee
-        }
-    }
-    response = requests.post(
-        f"{jira_url}/rest/servicedeskapi/request",
-        headers=headers,
-        json=payload,
-        auth=("", api_token)  # Изменено для использования пустого логина и токена как пароля
-    )
-    response.raise_for_status()
-    return response.json()
-
-
 async def main():
     """Основная функция для выполнения операций JIRA."""
     load_dotenv()
@@ -210,32 +164,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    # Загружаем переменные окружения
-    load_dotenv()
-    
-    # Создаем конфигурацию
-    config = JiraConfig(
-        JIRA_URL=os.getenv("JIRA_URL"),
-        JIRA_API_TOKEN=os.getenv("JIRA_API_TOKEN"),
-        JIRA_DEFAULT_PROJECT="SCHED"
-    )
-    
-    async def test_create_tickets():
-        try:
-            # Тестируем создание заявки через Service Desk API
-            print("\nТестирование создания заявки через Service Desk API...")
-            sd_response = create_sd_request(
-                jira_url=os.getenv("JIRA_URL"),
-                api_token=os.getenv("JIRA_API_TOKEN"),
-                service_desk_id="55",
-                request_type_id="926",  # для больничного
-                summary="Тестовая заявка через Service Desk API",
-                description="Описание тестовой заявки",
-                assignee="firstline.ws@petrovich.ru"
-            )
-            print("Ответ от Service Desk API:", sd_response)
-        except Exception as e:
-            print(f"Ошибка при создании заявок: {e}")
-    
-    # Запускаем тест
-    asyncio.run(test_create_tickets())
\ No newline at end of file
+    asyncio.run(main())
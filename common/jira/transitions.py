@@ -0,0 +1,100 @@
+"""
+Кэш id переходов JIRA.
+
+Id перехода зависит только от схемы workflow: (проект, тип задачи, текущий статус,
+целевой статус). Узнав его один раз из ответа /transitions, следующие задачи в том же
+положении переводятся одним POST без предварительного запроса переходов.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from .exceptions import JiraTransitionError, JiraValidationError
+from .models import JiraTransition
+
+logger = logging.getLogger(__name__)
+
+# Цель «решить задачу»: любой статус категории done
+DONE = "done"
+# Статус задачи неизвестен (например, сразу после создания) — тоже часть ключа
+UNKNOWN_STATUS = ""
+
+TransitionKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class TransitionResult:
+    """Итог перехода: куда перешла задача и понадобился ли запрос переходов"""
+    transition_id: str
+    to_status: str
+    cached: bool
+
+
+def _norm(value: Optional[str]) -> str:
+    return (value or "").strip().casefold()
+
+
+def _matches(transition: JiraTransition, target: str) -> bool:
+    """Цель — имя статуса или ключ категории статуса (done, indeterminate...)"""
+    target = _norm(target)
+    return _norm(transition.to_status) == target or _norm(transition.to_category) == target
+
+
+class TransitionResolver:
+    """Выбирает и запоминает id переходов; общий для всех задач одного сервера JIRA."""
+
+    def __init__(self, client):
+        self._client = client
+        self._ids: Dict[TransitionKey, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(project: str, issue_type: str, status: Optional[str], target: str) -> TransitionKey:
+        return _norm(project), _norm(issue_type), _norm(status) or UNKNOWN_STATUS, _norm(target)
+
+    def cached(self, project: str, issue_type: str, status: Optional[str], target: str) -> Optional[Tuple[str, str]]:
+        """(id перехода, имя целевого статуса) из кэша"""
+        with self._lock:
+            return self._ids.get(self.make_key(project, issue_type, status, target))
+
+    def learn(self, project: str, issue_type: str, status: Optional[str],
+              transitions: Iterable[JiraTransition], target: str) -> Optional[JiraTransition]:
+        """Запоминает подходящий переход из ответа /transitions и возвращает его"""
+        for transition in transitions:
+            if _matches(transition, target):
+                with self._lock:
+                    self._ids[self.make_key(project, issue_type, status, target)] = (
+                        transition.id, transition.to_status
+                    )
+                return transition
+        return None
+
+    def forget(self, project: str, issue_type: str, status: Optional[str], target: str):
+        with self._lock:
+            self._ids.pop(self.make_key(project, issue_type, status, target), None)
+
+    async def transition(self, issue_key: str, target: str = DONE, issue_type: str = "",
+                         status: Optional[str] = None, refetch: bool = False) -> TransitionResult:
+        """
+        Переводит задачу в целевой статус.
+        При известном id — один POST; если переход больше не подходит
+        (статус задачи изменили вручную), id забывается и ищется заново.
+        """
+        project = issue_key.split("-", 1)[0]
+        known = self.cached(project, issue_type, status, target)
+        if known:
+            transition_id, to_status = known
+            try:
+                await self._client.transition_issue(issue_key, transition_id, refetch=refetch)
+                return TransitionResult(transition_id, to_status, cached=True)
+            except JiraValidationError:
+                logger.info(f"🔁 Переход {transition_id} для {issue_key} устарел, уточняю у JIRA")
+                self.forget(project, issue_type, status, target)
+
+        transition = self.learn(project, issue_type, status,
+                                await self._client.get_transitions(issue_key), target)
+        if transition is None:
+            raise JiraTransitionError(f"Для {issue_key} нет перехода в «{target}»")
+        await self._client.transition_issue(issue_key, transition.id, refetch=refetch)
+        return TransitionResult(transition.id, transition.to_status, cached=False)
@@ -2,7 +2,6 @@ import asyncio
 import logging
 import os
 import sys
-from datetime import datetime
 
 from aiogram import Bot, Dispatcher, types
 from aiogram.filters import Command
@@ -15,7 +14,7 @@ from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
 
 from config import CONFIG
-from utils.create_jira_fa import create_failure_issue
+from modules.jira.client import create_failure_issue, close_gateway, get_gateway
 
 # Настройка логирования
 def setup_logging():
@@ -306,21 +305,10 @@ async def process_confirmation(message: types.Message, state: FSMContext):
         data = await state.get_data()
         try:
             # Создаем задачу в Jira
-            jira_response = create_failure_issue(
-                summary=data['summary'],
-                description=data['description'],
-                problem_level=data['level'],
-                problem_service=data['service'],
-                naumen_failure_type=data.get('naumen_type'),
-                stream_1c=data.get('stream_1c'),
-                time_start_problem=datetime.now().strftime("%Y-%m-%d %H:%M"),
-                influence=data.get('influence')
-            )
-            
-            logger.info(f"Ответ от Jira: {jira_response}")
+            task_key = await create_failure_issue(data)
+            logger.info(f"Задача создана: {task_key}")
             
-            if jira_response and 'key' in jira_response:
-                task_key = jira_response['key']
+            if task_key:
                 task_url = f"https://jira.petrovich.tech/browse/{task_key}"
                 await message.answer(
                     f"✅ Задача успешно создана!\n"
@@ -329,7 +317,7 @@ async def process_confirmation(message: types.Message, state: FSMContext):
                     reply_markup=get_main_keyboard()
                 )
             else:
-                error_msg = f"Не удалось создать задачу в Jira. Ответ: {jira_response}"
+                error_msg = "Не удалось создать задачу в Jira: пустой ключ"
                 logger.error(error_msg)
                 raise Exception(error_msg)
                 
@@ -359,11 +347,15 @@ async def main():
     await bot.set_my_commands(commands)
     logger.info("✅ Команды установлены")
 
+    # Схемы полей FA читаются из снимка метаданных при запуске, а не из JIRA
+    get_gateway()
+
     try:
         logger.info("🤖 FA бот начал работу")
         await dp.start_polling(bot)
     finally:
         logger.info("🛑 FA бот остановлен")
+        await close_gateway()
         await bot.session.close()
 
 if __name__ == "__main__":
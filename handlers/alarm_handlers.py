@@ -23,8 +23,9 @@ from keyboards import (
 )
 from utils.helpers import NewMessageStates, parse_duration, get_user_name, is_admin
 from bot_state import bot_state
+from utils.announcements import alarm_channel_text, maintenance_channel_text
+from utils.jira_jobs import FA_ISSUE, get_outbox, scm_alarm_text
 from config import CONFIG, PROBLEM_LEVELS, PROBLEM_SERVICES, INFLUENCE_OPTIONS
-from utils.create_jira_fa import create_failure_issue
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -291,73 +292,71 @@ async def confirm_send_callback(callback: CallbackQuery, state: FSMContext):
         if msg_type == "alarm":
             issue = data["title"]
             fix_time = dt.fromisoformat(data["fix_time"])
-            # Пытаемся создать задачу в Jira
-            try:
-                jira_response = create_failure_issue(
-                    summary=issue,
-                    description=data["description"],
-                    problem_level="Потенциальная недоступность сервиса",
-                    problem_service=data["service"],
-                    time_start_problem=dt.now().strftime("%Y-%m-%d %H:%M"),
-                    influence="Клиенты"
-                )
-                if jira_response and 'key' in jira_response:
-                    alarm_id = jira_response['key']
-                    jira_url = f"https://jira.petrovich.tech/browse/{alarm_id}"
-                    logger.info(f"[{user_id}] Задача в Jira создана: {alarm_id}")
-                else:
-                    raise Exception("Не удалось получить ID задачи из Jira")
-            except Exception as jira_error:
-                logger.error(f"[{user_id}] Ошибка создания задачи в Jira: {str(jira_error)}")
-                alarm_id = str(uuid.uuid4())[:4]
-                jira_url = None
-                logger.info(f"[{user_id}] Используем локальный ID: {alarm_id}")
-
-            bot_state.active_alarms[alarm_id] = {
+            # Задача в Jira создаётся в фоне через очередь; до её создания сбой живёт под временным ID
+            alarm_id = str(uuid.uuid4())[:4]
+            outbox = get_outbox()
+
+            alarm = {
                 "issue": issue,
                 "fix_time": fix_time,
                 "user_id": user_id,
-                "created_at": dt.now().isoformat()
+                "created_at": dt.now().isoformat(),
+                "service": data["service"],
+                "jira_pending": outbox is not None
             }
+            bot_state.active_alarms[alarm_id] = alarm
+            bot_state.touch()
 
-            base_text = (
-                f"🚨 <b>Технический сбой</b>\n"
-                f"• <b>Задача в Jira:</b> <a href='{jira_url}'>{alarm_id}</a>\n"
-                f"• <b>Сервис:</b> {data['service']}\n"
-                f"• <b>Проблема:</b> {data['title']}\n"
-                f"• <b>Описание:</b> {data['description']}\n"
-                f"• <i>Ссылка в Ктолк: https://petrovich.ktalk.ru/emergencyteam  </i>\n"
-            )
+            base_text = scm_alarm_text(alarm_id, data)
 
-            chat_message = (
-                f"🚨 <b>Технический сбой</b>\n"
-                f"• <b>Проблема:</b> {data['title']}\n"
-                f"• <b>Сервис:</b> {data['service']}\n"
-                f"• <b>Исправим до:</b> {fix_time.strftime(DATETIME_FORMAT)}\n"
-                f"• <i>Мы уже работаем над устранением сбоя. Спасибо за ваше терпение и понимание!</i>"
-            )
+            chat_message = alarm_channel_text(alarm)
 
-            await callback.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], chat_message, parse_mode='HTML')
+            # id объявлений сохраняем, чтобы продление и завершение правили их, а не плодили новые
+            channel_message = await callback.bot.send_message(
+                CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], chat_message, parse_mode='HTML'
+            )
+            alarm["channel_message_id"] = channel_message.message_id
 
             scm_channel_id = CONFIG["TELEGRAM"].get("SCM_CHANNEL_ID")
             if scm_channel_id:
                 topic = await callback.bot.create_forum_topic(chat_id=scm_channel_id, name=f"🔥{alarm_id} {data['title'][:20]}...")
-                await callback.bot.send_message(
+                scm_message = await callback.bot.send_message(
                     chat_id=scm_channel_id,
                     message_thread_id=topic.message_thread_id,
                     text=base_text,
                     parse_mode='HTML'
                 )
+                alarm["scm_chat_id"] = scm_channel_id
+                alarm["scm_thread_id"] = topic.message_thread_id
+                alarm["scm_message_id"] = scm_message.message_id
                 logger.info(f"[{user_id}] Тема создана: {topic.message_thread_id}")
 
             user_message = f"✅ Сбой зарегистрирован! ID: <code>{alarm_id}</code>"
-            if jira_url:
-                user_message += f"\n🔗 <a href='{jira_url}'>Задача в Jira</a>"
+            if outbox is not None:
+                user_message += "\n⏳ Задача в Jira создаётся, ссылка появится здесь"
+            else:
+                logger.error(f"[{user_id}] Очередь Jira не настроена, задача для {alarm_id} не будет создана")
 
             await callback.message.edit_text(user_message, parse_mode='HTML', reply_markup=None)
             await bot_state.save_state()
             await state.clear()
 
+            if outbox is not None:
+                await outbox.enqueue(FA_ISSUE, {
+                    "alarm_id": alarm_id,
+                    "title": issue,
+                    "description": data["description"],
+                    "service": data["service"],
+                    "problem_level": "Потенциальная недоступность сервиса",
+                    "influence": "Клиенты",
+                    "time_start_problem": dt.now().strftime("%Y-%m-%d %H:%M"),
+                    "chat_id": callback.message.chat.id,
+                    "message_id": callback.message.message_id,
+                    "scm_chat_id": alarm.get("scm_chat_id"),
+                    "scm_thread_id": alarm.get("scm_thread_id"),
+                    "scm_message_id": alarm.get("scm_message_id")
+                })
+
         elif msg_type == "maintenance":
             work_id = str(uuid.uuid4())[:4]
             description = data["description"]
@@ -365,7 +364,7 @@ async def confirm_send_callback(callback: CallbackQuery, state: FSMContext):
             end_time = dt.fromisoformat(data["end_time"])
             unavailable_services = data.get("unavailable_services", "не указано")
 
-            bot_state.active_maintenances[work_id] = {
+            work = {
                 "description": description,
                 "start_time": start_time,
                 "end_time": end_time,
@@ -373,19 +372,15 @@ async def confirm_send_callback(callback: CallbackQuery, state: FSMContext):
                 "user_id": user_id,
                 "created_at": dt.now().isoformat()
             }
+            bot_state.active_maintenances[work_id] = work
+            bot_state.touch()
 
-            maint_text = (
-                f"🔧 <b>Проводим плановые технические работы – станет ещё лучше!</b>\n"
-                f"• <b>Описание:</b> {description}\n"
-                f"• <b>Начало:</b> {start_time.strftime(DATETIME_FORMAT)}\n"
-                f"• <b>Конец:</b> {end_time.strftime(DATETIME_FORMAT)}\n"
-                f"• <b>Недоступно:</b> {unavailable_services}\n"
-                f"• <i>Спасибо за понимание! Эти изменения – важный шаг к тому, чтобы сервис стал ещё удобнее и надёжнее для вас 💙</i>\n"
-                f"• <i>Если возникнут вопросы – наша поддержка всегда на связи</i>\n"
-                f"• <i>С заботой, Ваша команда Петрович-ТЕХ</i>"
-            )
+            maint_text = maintenance_channel_text(work)
 
-            await callback.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], maint_text, parse_mode='HTML')
+            channel_message = await callback.bot.send_message(
+                CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], maint_text, parse_mode='HTML'
+            )
+            work["channel_message_id"] = channel_message.message_id
             logger.info(f"[{user_id}] Работа {work_id} зарегистрирована")
             await callback.message.edit_text(
                 f"✅ Работы зарегистрированы! ID: <code>{work_id}</code>",
@@ -1,14 +1,19 @@
 # handlers/current_events.py
 
 import logging
+from itertools import islice
+from typing import Dict, Optional, Tuple
+
 from aiogram.filters import Command
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramBadRequest
 
 from bot_state import bot_state
+from utils.user_cache import user_cache
 from keyboards import create_event_list_keyboard, create_refresh_keyboard
 
 logger = logging.getLogger(__name__)
@@ -16,13 +21,26 @@ router = Router()
 
 ITEMS_PER_PAGE = 5  # Сколько событий показывать на одной странице
 
+# Кэш отрисованных страниц: (view, page) -> (версия, текст, всего страниц).
+# Версия учитывает и состояние событий, и кэш имён авторов.
+_render_cache: Dict[Tuple[str, int], Tuple[Tuple[int, int], str, Optional[int]]] = {}
+
+
+def _render_version() -> Tuple[int, int]:
+    return bot_state.version, user_cache.version
+
+
+def _author(user_id) -> str:
+    """Имя автора из кэша; неизвестные имена дозапрашиваются в фоне и появятся при обновлении"""
+    if user_id is None:
+        return "Неизвестен"
+    return user_cache.display(user_id)
+
 
 def format_alarms_page(alarms: dict, page: int) -> tuple:
     """Форматирует список сбоёв для отображения постранично"""
-    alarm_items = list(alarms.items())
     start = page * ITEMS_PER_PAGE
-    end = start + ITEMS_PER_PAGE
-    page_items = alarm_items[start:end]
+    page_items = list(islice(alarms.items(), start, start + ITEMS_PER_PAGE))
 
     if not page_items:
         return "🚨 Нет активных сбоёв.", None
@@ -34,7 +52,7 @@ def format_alarms_page(alarms: dict, page: int) -> tuple:
         except Exception as e:
             logger.warning(f"Ошибка форматирования времени сбоя {alarm_id}: {e}")
             fix_time = "неизвестно"
-        author = alarm_info.get("user_id", "Неизвестен")
+        author = _author(alarm_info.get("user_id"))
         text += (
             f"• <code>{alarm_id}</code>\n"
             f"  👤 Автор: {author}\n"
@@ -42,16 +60,14 @@ def format_alarms_page(alarms: dict, page: int) -> tuple:
             f"  🔧 Проблема: {alarm_info['issue']}\n\n"
         )
 
-    total_pages = (len(alarm_items) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    total_pages = (len(alarms) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
     return text, total_pages
 
 
 def format_maintenances_page(maintenances: dict, page: int) -> tuple:
     """Форматирует список работ для отображения постранично"""
-    maint_items = list(maintenances.items())
     start = page * ITEMS_PER_PAGE
-    end = start + ITEMS_PER_PAGE
-    page_items = maint_items[start:end]
+    page_items = list(islice(maintenances.items(), start, start + ITEMS_PER_PAGE))
 
     if not page_items:
         return "🔧 Нет активных работ.", None
@@ -65,7 +81,7 @@ def format_maintenances_page(maintenances: dict, page: int) -> tuple:
             logger.warning(f"Ошибка форматирования времени работы {work_id}: {e}")
             start_time = end_time = "неизвестно"
         description = work_info.get("description", "Нет описания")
-        author = work_info.get("user_id", "Неизвестен")
+        author = _author(work_info.get("user_id"))
         text += (
             f"• <code>{work_id}</code>\n"
             f"  👤 Автор: {author}\n"
@@ -73,10 +89,65 @@ def format_maintenances_page(maintenances: dict, page: int) -> tuple:
             f"  📝 Описание: {description}\n\n"
         )
 
-    total_pages = (len(maint_items) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    total_pages = (len(maintenances) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
     return text, total_pages
 
 
+def render_page(view: str, page: int) -> Tuple[str, Optional[int]]:
+    """
+    Возвращает текст страницы и число страниц, используя кэш по версии состояния.
+    Страница пересчитывается, только если с момента прошлой отрисовки что-то изменилось.
+    """
+    version = _render_version()
+    cached = _render_cache.get((view, page))
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    if view == "alarms":
+        text, total_pages = format_alarms_page(bot_state.active_alarms, page)
+    elif view == "maintenances":
+        text, total_pages = format_maintenances_page(bot_state.active_maintenances, page)
+    else:
+        return "❌ Неизвестное состояние", None
+
+    # Страницы старых версий больше не понадобятся
+    for key in [k for k, v in _render_cache.items() if v[0] != version]:
+        del _render_cache[key]
+    _render_cache[(view, page)] = (version, text, total_pages)
+    return text, total_pages
+
+
+async def show_page(call: CallbackQuery, state: FSMContext, view: str, page: int) -> bool:
+    """
+    Показывает страницу списка в сообщении с кнопками.
+    Если в сообщении уже отображена эта же страница той же версии состояния,
+    запрос в Telegram не отправляется. Возвращает True, если сообщение изменено.
+    """
+    user_id = call.from_user.id
+    version = list(_render_version())
+    text, total_pages = render_page(view, page)
+    data = await state.get_data()
+    await state.update_data(view=view, page=page, total_pages=total_pages)
+
+    shown = [view, page, version]
+    if data.get("shown") == shown:
+        logger.debug(f"[{user_id}] Страница {view}/{page} не изменилась (версия {version})")
+        return False
+
+    markup = create_refresh_keyboard(current_page=page, total_pages=total_pages)
+    try:
+        await call.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            logger.warning(f"[{user_id}] Ошибка при редактировании сообщения: {e}")
+            await call.message.answer(text, parse_mode=ParseMode.HTML, reply_markup=markup)
+    except Exception as e:
+        logger.warning(f"[{user_id}] Ошибка при редактировании сообщения: {e}")
+        await call.message.answer(text, parse_mode=ParseMode.HTML, reply_markup=markup)
+    await state.update_data(shown=shown)
+    return True
+
+
 @router.message(Command("alarm_list"))
 @router.message(F.text == "📕 Текущие события")
 async def show_current_events(message: Message, state: FSMContext):
@@ -99,27 +170,8 @@ async def handle_list_callback(call: CallbackQuery, state: FSMContext):
 
     logger.info(f"[{user_id}] Пользователь выбрал: {choice}, страница: {page}")
 
-    if choice == "show_alarms":
-        alarms = bot_state.active_alarms
-        text, total_pages = format_alarms_page(alarms, page)
-        await state.update_data(view="alarms", total_pages=total_pages)
-
-    elif choice == "show_maintenances":
-        maintenances = bot_state.active_maintenances
-        text, total_pages = format_maintenances_page(maintenances, page)
-        await state.update_data(view="maintenances", total_pages=total_pages)
-
-    else:
-        text = "❌ Неизвестная команда"
-        total_pages = None
-
-    markup = create_refresh_keyboard(current_page=page, total_pages=total_pages)
-    try:
-        await call.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=markup)
-    except Exception as e:
-        logger.warning(f"[{user_id}] Ошибка при редактировании сообщения: {e}")
-        await call.message.answer(text, parse_mode=ParseMode.HTML, reply_markup=markup)
-
+    view = "alarms" if choice == "show_alarms" else "maintenances"
+    await show_page(call, state, view, page)
     await call.answer()
 
 
@@ -127,23 +179,15 @@ async def handle_list_callback(call: CallbackQuery, state: FSMContext):
 async def refresh_selection(call: CallbackQuery, state: FSMContext):
     user_id = call.from_user.id
     logger.info(f"[{user_id}] Пользователь нажал «🔄 Обновить»")
-    await call.answer("🔄 Обновляю данные...", show_alert=False)
 
     data = await state.get_data()
     view = data.get("view", "alarms")
     page = data.get("page", 0)
 
-    if view == "alarms":
-        text, total_pages = format_alarms_page(bot_state.active_alarms, page)
-    elif view == "maintenances":
-        text, total_pages = format_maintenances_page(bot_state.active_maintenances, page)
+    if await show_page(call, state, view, page):
+        await call.answer("✅ Данные обновлены")
     else:
-        text = "❌ Неизвестное состояние"
-        total_pages = None
-
-    markup = create_refresh_keyboard(current_page=page, total_pages=total_pages)
-    await call.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=markup)
-    await call.answer("✅ Данные обновлены")
+        await call.answer("✅ Данные актуальны")
 
 
 @router.callback_query(F.data == "close_selection")
@@ -175,16 +219,7 @@ async def handle_pagination(call: CallbackQuery, state: FSMContext):
     else:
         new_page = current_page
 
-    await state.update_data(page=new_page)
     logger.info(f"[{user_id}] Перешли на страницу {new_page} для {view}")
 
-    if view == "alarms":
-        text, _ = format_alarms_page(bot_state.active_alarms, new_page)
-    elif view == "maintenances":
-        text, _ = format_maintenances_page(bot_state.active_maintenances, new_page)
-    else:
-        text = "❌ Неизвестное состояние"
-
-    markup = create_refresh_keyboard(current_page=new_page, total_pages=total_pages)
-    await call.message.edit_text(text, parse_mode=ParseMode.HTML, reply_markup=markup)
-    await call.answer()
\ No newline at end of file
+    await show_page(call, state, view, new_page)
+    await call.answer()
@@ -12,6 +12,8 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.enums import ParseMode
 
 from bot_state import bot_state
+from utils.announcements import announcements, EXTENDED, RESOLVED
+from utils.jira_jobs import enqueue_fa_resolve
 from keyboards import (
     create_stop_type_keyboard,
     create_action_keyboard,
@@ -21,8 +23,7 @@ from keyboards import (
     create_reminder_keyboard,
     create_main_keyboard
 )
-from utils.helpers import is_admin, is_superadmin, get_user_name
-from config import CONFIG
+from utils.helpers import is_admin, is_superadmin
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -168,29 +169,31 @@ async def handle_action_callback(call: CallbackQuery, state: FSMContext):
     action = call.data
     data = await state.get_data()
     data_type = data['data_type']
-    item_id = data['item_id']
+    item_id = bot_state.resolve_alarm_id(data['item_id']) if data_type == "alarm" else data['item_id']
     logger.info(f"[{call.from_user.id}] Выбрано действие: {action} для {data_type}: {item_id}")
 
     if action == "action_stop":
         logger.info(f"[{call.from_user.id}] Начата остановка {data_type}: {item_id}")
         if data_type == "alarm":
-            alarm_info = bot_state.active_alarms[item_id]
-            del bot_state.active_alarms[item_id]
-            text = (
-                f"✅ <b>Сбой завершён</b>\n"
-                f"• <b>Проблема:</b> {alarm_info['issue']}"
-            )
-            await call.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
+            alarm_info = bot_state.close_alarm(item_id)
+            if alarm_info is None:
+                # Сбой уже завершён из JIRA или синхронизацией
+                logger.warning(f"[{call.from_user.id}] Сбой {item_id} не найден при остановке")
+                await call.message.edit_text("❌ Сбой не найден", reply_markup=None)
+                await state.clear()
+                await call.message.answer("Выберите действие:", reply_markup=create_main_keyboard())
+                await call.answer()
+                return
+            bot_state.touch()
+            announcements.schedule(call.bot, "alarm", item_id, alarm_info, RESOLVED)
+            await enqueue_fa_resolve(item_id, alarm_info)
             logger.info(f"[{call.from_user.id}] Сбой {item_id} удалён из состояния")
 
         elif data_type == "maintenance":
             maint_info = bot_state.active_maintenances[item_id]
             del bot_state.active_maintenances[item_id]
-            text = (
-                f"✅ <b>Работа завершена</b>\n"
-                f"• <b>Описание:</b> {maint_info['description']}"
-            )
-            await call.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
+            bot_state.touch()
+            announcements.schedule(call.bot, "maintenance", item_id, maint_info, RESOLVED)
             logger.info(f"[{call.from_user.id}] Работа {item_id} удалена из состояния")
 
         await call.message.edit_text(f"{('🚨 Сбой' if data_type == 'alarm' else '🔧 Работа')} {item_id} остановлен(а)")
@@ -219,7 +222,7 @@ async def handle_action_callback(call: CallbackQuery, state: FSMContext):
 async def handle_alarm_extension_callback(call: CallbackQuery, state: FSMContext):
     duration = call.data
     data = await state.get_data()
-    item_id = data['item_id']
+    item_id = bot_state.resolve_alarm_id(data['item_id'])
     logger.info(f"[{call.from_user.id}] Выбрано продление сбоя {item_id} на {duration}")
 
     alarm = bot_state.active_alarms.get(item_id)
@@ -272,15 +275,11 @@ async def handle_alarm_extension_callback(call: CallbackQuery, state: FSMContext
 
     new_end = old_end + delta
     alarm["fix_time"] = new_end.isoformat()
+    bot_state.touch()
     logger.info(f"[{call.from_user.id}] Новое время завершения: {new_end.isoformat()}")
 
-    text = (
-        f"🔄 <b>Сбой продлён</b>\n"
-        f"• <b>Проблема:</b> {alarm['issue']}\n"
-        f"• <b>Новое время окончания:</b> {new_end.strftime('%d.%m.%Y %H:%M')}"
-    )
-    await call.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
-    logger.info(f"[{call.from_user.id}] Сообщение о продлении отправлено в канал")
+    announcements.schedule(call.bot, "alarm", item_id, alarm, EXTENDED)
+    logger.info(f"[{call.from_user.id}] Обновление объявления о продлении запланировано")
 
     await call.message.edit_text(f"🕒 Сбой {item_id} продлён до {new_end.strftime('%d.%m.%Y %H:%M')}", reply_markup=None)
     await call.message.answer("Выберите действие:", reply_markup=create_main_keyboard())
@@ -307,16 +306,12 @@ async def handle_maintenance_new_end(message: Message, state: FSMContext):
 
     try:
         new_time = datetime.strptime(new_time_str, "%d.%m.%Y %H:%M")
-        maint["end"] = new_time.isoformat()
+        maint["end_time"] = new_time
+        bot_state.touch()
         logger.info(f"[{message.from_user.id}] Новое время установлено: {new_time.isoformat()}")
 
-        text = (
-            f"🔄 <b>Работа продлена</b>\n"
-            f"• <b>Описание:</b> {maint['description']}\n"
-            f"• <b>Новое время окончания:</b> {new_time.strftime('%d.%m.%Y %H:%M')}"
-        )
-        await message.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
-        logger.info(f"[{message.from_user.id}] Сообщение о продлении работы отправлено в канал")
+        announcements.schedule(message.bot, "maintenance", item_id, maint, EXTENDED)
+        logger.info(f"[{message.from_user.id}] Обновление объявления о продлении работы запланировано")
 
         await message.answer(f"🕒 Работа {item_id} продлена до {new_time.strftime('%d.%m.%Y %H:%M')}")
         await bot_state.save_state()
@@ -396,7 +391,7 @@ async def handle_reminder_action(call: CallbackQuery, state: FSMContext):
         await call.answer("❌ Это уведомление устарело")
         return
 
-    alarm_id = user_state["alarm_id"]
+    alarm_id = bot_state.resolve_alarm_id(user_state["alarm_id"])
     alarm = bot_state.active_alarms.get(alarm_id)
 
     if not alarm:
@@ -409,12 +404,10 @@ async def handle_reminder_action(call: CallbackQuery, state: FSMContext):
 
     if action == "stop":
         logger.info(f"[{user_id}] Сбой {alarm_id} остановлен по напоминанию")
-        text = (
-            f"✅ <b>Сбой завершён</b>\n"
-            f"• <b>Проблема:</b> {alarm['issue']}"
-        )
-        del bot_state.active_alarms[alarm_id]
-        await call.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
+        bot_state.close_alarm(alarm_id)
+        bot_state.touch()
+        announcements.schedule(call.bot, "alarm", alarm_id, alarm, RESOLVED)
+        await enqueue_fa_resolve(alarm_id, alarm)
         await call.message.edit_text("🚫 Сбой завершён по решению автора", reply_markup=None)
         await call.message.answer("Выберите действие:", reply_markup=create_main_keyboard())
         if user_id in bot_state.user_states:
@@ -437,7 +430,7 @@ async def handle_reminder_action(call: CallbackQuery, state: FSMContext):
 async def handle_reminder_extension(call: CallbackQuery, state: FSMContext):
     duration = call.data
     data = await state.get_data()
-    alarm_id = data["alarm_id"]
+    alarm_id = bot_state.resolve_alarm_id(data["alarm_id"])
     alarm = bot_state.active_alarms.get(alarm_id)
 
     if not alarm:
@@ -454,16 +447,12 @@ async def handle_reminder_extension(call: CallbackQuery, state: FSMContext):
     delta = timedelta(minutes=30) if duration == "extend_30_min" else timedelta(hours=1)
     new_end = old_end + delta
     alarm["fix_time"] = new_end.isoformat()
+    bot_state.touch()
 
     logger.info(f"[{call.from_user.id}] Новое время окончания: {new_end.isoformat()}")
 
-    text = (
-        f"🔄 <b>Сбой продлён</b>\n"
-        f"• <b>Проблема:</b> {alarm['issue']}\n"
-        f"• <b>Новое время окончания:</b> {new_end.strftime('%d.%m.%Y %H:%M')}"
-    )
-    await call.bot.send_message(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], text, parse_mode="HTML")
-    logger.info(f"[{call.from_user.id}] Сообщение о продлении отправлено в канал")
+    announcements.schedule(call.bot, "alarm", alarm_id, alarm, EXTENDED)
+    logger.info(f"[{call.from_user.id}] Обновление объявления о продлении запланировано")
 
     await call.message.edit_text(f"🕒 Сбой {alarm_id} продлён до {new_end.strftime('%d.%m.%Y %H:%M')}", reply_markup=None)
     await call.message.answer("Выберите действие:", reply_markup=create_main_keyboard())
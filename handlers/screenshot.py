@@ -2,20 +2,32 @@
 
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, ReplyKeyboardRemove, FSInputFile
+from aiogram.types import CallbackQuery, Message, ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
 
 import asyncio
+import html
 import logging
 from typing import Optional
 
 # Импорты из модулей
-from selenium_utils import make_confluence_screenshot, make_jira_screenshot, make_confluence_screenshot_page
+# selenium_utils (selenium, webdriver_manager) импортируется только в процессах снимков
 from config import CONFIG
-from keyboards import create_view_selection_keyboard, create_main_keyboard, create_cancel_keyboard
+from keyboards import (
+    create_view_selection_keyboard, create_main_keyboard, create_cancel_keyboard, create_prerender_refresh_keyboard
+)
 from utils.helpers import is_admin  # <-- Добавили импорт функции проверки админства
+from utils.media_cache import answer_photo_cached
+from utils.prerender import Render, get_prerenderer
+from utils.screenshot_worker import render_screenshot
+from utils.maintenance_calendar import (
+    VIEW_BROWSER, VIEW_IMAGE, calendar_view, render_week_html, render_week_png, week_maintenance
+)
+from utils.jira_card import (
+    CARD_BROWSER, CARD_IMAGE, card_mode, fetch_issue_card, render_card_html, render_card_png
+)
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -44,6 +56,94 @@ async def view_start(message: Message, state: FSMContext):
     )
 
 
+async def send_week_maintenance(message: Message) -> bool:
+    """Работы на неделю из Team Calendars через REST; False — нужен скриншот браузером"""
+    try:
+        week = await asyncio.wait_for(week_maintenance(), timeout=CONFIG.get("TASK_TIMEOUT", 30))
+    except Exception as e:
+        logger.warning(f"⚠️ Календарь работ через REST недоступен, делаю скриншот: {e}")
+        return False
+    if week is None:
+        return False
+
+    link = f"<a href='{html.escape(CONFIG['CONFLUENCE']['TARGET_URL'].strip(), quote=True)}'>Ссылка на страницу</a>"
+    if calendar_view() == VIEW_IMAGE:
+        try:
+            png = await asyncio.to_thread(render_week_png, *week)
+        except ImportError:
+            logger.warning("⚠️ Pillow не установлен — календарь работ отправляется текстом")
+        else:
+            await answer_photo_cached(
+                message, png, "calendar.png",
+                caption=f"🗓️ Календарь работ\n{link}",
+                parse_mode='HTML',
+                reply_markup=create_main_keyboard()
+            )
+            return True
+
+    await message.answer(
+        f"{render_week_html(*week)}\n\n{link}",
+        parse_mode='HTML',
+        disable_web_page_preview=True,
+        reply_markup=create_main_keyboard()
+    )
+    return True
+
+
+def _page_caption(url: str) -> str:
+    if url == CONFIG["CONFLUENCE"]["TARGET_URL"].strip():
+        return f"🗓️ Вот календарь работ!\n[Ссылка на страницу]({url})"
+    return f"📌 Скриншот страницы:\n{url}"
+
+
+async def send_render(message: Message, render: Render):
+    """Отправляет снимок предотрисовки с его возрастом и кнопкой обновления"""
+    await answer_photo_cached(
+        message, render.image.data, render.image.filename("page"),
+        caption=f"{_page_caption(render.url)}\n{render.caption()}",
+        parse_mode='Markdown',
+        reply_markup=create_prerender_refresh_keyboard(get_prerenderer().urls.index(render.url))
+    )
+
+
+async def send_prerendered(message: Message, url: str) -> bool:
+    """Последний снимок страницы из предотрисовки; False — снимка нет, нужен скриншот"""
+    prerenderer = get_prerenderer()
+    render = prerenderer.latest(url) if prerenderer else None
+    if render is None:
+        return False
+    logger.info(f"[{message.from_user.id}] Снимок {url} отдан из предотрисовки ({render.age()})")
+    await send_render(message, render)
+    return True
+
+
+@router.callback_query(F.data.startswith("prerender_refresh_"))
+async def refresh_prerendered(call: CallbackQuery):
+    """Обновление снимка по запросу пользователя"""
+    if not is_admin(call.from_user.id):
+        await call.answer("❌ У вас нет прав для выполнения этой команды ❌", show_alert=True)
+        return
+    prerenderer = get_prerenderer()
+    index = int(call.data.rsplit("_", 1)[-1])
+    if prerenderer is None or index >= len(prerenderer.urls):
+        await call.answer("⚠️ Страница больше не обновляется по расписанию", show_alert=True)
+        return
+    await call.answer("🔄 Обновляю снимок...")
+    try:
+        render = await prerenderer.refresh(prerenderer.urls[index])
+    except asyncio.TimeoutError:
+        await call.message.answer("⏳ Превышено время ожидания при создании скриншота")
+        return
+    except Exception as e:
+        logger.error(f"[{call.from_user.id}] Ошибка обновления снимка: {str(e)}")
+        await call.message.answer(f"❌ Ошибка: {str(e)}")
+        return
+    if render is None:
+        await call.message.answer("❌ Не удалось сделать скриншот")
+        return
+    await send_render(call.message, render)
+
+
 @router.message(F.text == "📅 Календарь работ")
 async def take_calendar_screenshot(message: Message):
     user_id = message.from_user.id
@@ -53,16 +153,18 @@ async def take_calendar_screenshot(message: Message):
         await message.answer("❌ У вас нет прав для выполнения этой команды ❌", parse_mode='HTML')
         return
 
+    if calendar_view() != VIEW_BROWSER and await send_week_maintenance(message):
+        return
+    if await send_prerendered(message, CONFIG["CONFLUENCE"]["TARGET_URL"].strip()):
+        return
+
     msg = await message.answer("📸 Делаю скриншот календаря...", reply_markup=ReplyKeyboardRemove())
 
     try:
-        success = await asyncio.wait_for(
-            asyncio.to_thread(make_confluence_screenshot),
-            timeout=CONFIG.get("TASK_TIMEOUT", 30)
-        )
-        if success:
-            await message.answer_photo(
-                photo=FSInputFile("screenshot.png"),
+        image = await render_screenshot()
+        if image:
+            await answer_photo_cached(
+                message, image.data, image.filename("calendar"),
                 caption=f"🗓️ Вот календарь работ!\n[Ссылка на страницу]({CONFIG['CONFLUENCE']['TARGET_URL']})",
                 parse_mode='Markdown',
                 reply_markup=create_main_keyboard()
@@ -114,6 +216,39 @@ async def watch_confluence(message: Message, state: FSMContext):
     )
 
 
+async def send_issue_card(message: Message, url: str) -> bool:
+    """Показывает задачу JIRA карточкой через REST; False — нужен скриншот браузером"""
+    try:
+        card = await asyncio.wait_for(fetch_issue_card(url), timeout=CONFIG.get("TASK_TIMEOUT", 30))
+    except Exception as e:
+        logger.warning(f"⚠️ Карточка задачи по {url} недоступна, делаю скриншот: {e}")
+        return False
+    if card is None:
+        return False
+
+    if card_mode() == CARD_IMAGE:
+        try:
+            png = await asyncio.to_thread(render_card_png, card)
+        except ImportError:
+            logger.warning("⚠️ Pillow не установлен — карточка задачи отправляется текстом")
+        else:
+            await answer_photo_cached(
+                message, png, f"{card.key}.png",
+                caption=f"📌 <a href='{html.escape(card.url, quote=True)}'>{html.escape(card.key)}</a>",
+                parse_mode='HTML',
+                reply_markup=create_view_selection_keyboard()
+            )
+            return True
+
+    await message.answer(
+        render_card_html(card),
+        parse_mode='HTML',
+        disable_web_page_preview=True,
+        reply_markup=create_view_selection_keyboard()
+    )
+    return True
+
+
 @router.message(ViewStates.WAITING_URL)
 async def process_view_url(message: Message, state: FSMContext):
     url = message.text.strip()
@@ -128,27 +263,23 @@ async def process_view_url(message: Message, state: FSMContext):
         await message.answer("⚠️ Некорректный URL. Введите полный адрес.", reply_markup=create_cancel_keyboard())
         return
 
+    is_jira = "jira" in url.lower()
+    if is_jira and card_mode() != CARD_BROWSER and await send_issue_card(message, url):
+        await state.clear()
+        return
+    if await send_prerendered(message, url):
+        await state.clear()
+        return
+
     msg = await message.answer("📸 Делаю скриншот страницы...", reply_markup=ReplyKeyboardRemove())
 
     try:
-        is_jira = "jira" in url.lower()
-        success = False
-
-        if is_jira:
-            success = await asyncio.wait_for(
-                asyncio.to_thread(make_jira_screenshot, url),
-                timeout=CONFIG.get("TASK_TIMEOUT", 30)
-            )
-        else:
-            success = await asyncio.wait_for(
-                asyncio.to_thread(make_confluence_screenshot_page, url),
-                timeout=CONFIG.get("TASK_TIMEOUT", 30)
-            )
+        image = await render_screenshot(url)
 
-        if success:
+        if image:
             caption = f"📌 Скриншот страницы:\n{url}"
-            await message.answer_photo(
-                photo=FSInputFile("screenshot.png"),
+            await answer_photo_cached(
+                message, image.data, image.filename("screenshot"),
                 caption=caption,
                 parse_mode='Markdown',
                 reply_markup=create_view_selection_keyboard()
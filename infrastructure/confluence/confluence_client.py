@@ -1,3 +1,199 @@
 """
 Клиент для работы с Confluence
-""" 
\ No newline at end of file
+
+Асинхронный клиент REST API Confluence Server: страницы (/rest/api/content)
+и события Team Calendars (/rest/calendar-services). Все запросы идут через
+одну сессию с пулом соединений; ответы с ETag кэшируются, и повторный запрос
+с If-None-Match получает 304 без тела.
+"""
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 15
+DEFAULT_POOL_LIMIT = 10
+DEFAULT_TIMEZONE = "Europe/Moscow"
+# Id календарей в разметке макроса Team Calendars на странице
+CALENDAR_MACRO_RE = re.compile(
+    r'<ac:structured-macro[^>]*ac:name="calendar".*?<ac:parameter ac:name="id">([^<]+)</ac:parameter>',
+    re.DOTALL
+)
+
+
+class ConfluenceError(Exception):
+    """Ошибка запроса к Confluence"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class CalendarEvent:
+    """Событие календаря работ"""
+    title: str
+    start: datetime
+    end: datetime
+    all_day: bool = False
+    calendar: str = ""
+    description: str = ""
+
+    @classmethod
+    def from_raw(cls, data: Dict[str, Any]) -> "CalendarEvent":
+        return cls(
+            title=data.get("title", ""),
+            start=_parse_time(data["start"]),
+            end=_parse_time(data.get("end") or data["start"]),
+            all_day=bool(data.get("allDay")),
+            calendar=data.get("subCalendarName") or data.get("subCalendarId", ""),
+            description=data.get("description") or ""
+        )
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def page_id_from_url(url: str) -> Optional[str]:
+    """pageId из ссылки вида .../viewpage.action?pageId=309867053"""
+    values = parse_qs(urlparse(url.strip()).query).get("pageId")
+    return values[0] if values else None
+
+
+def week_bounds(day: Optional[date] = None) -> Tuple[date, date]:
+    """Понедельник и следующий понедельник недели, в которую входит day"""
+    day = day or date.today()
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=7)
+
+
+class ConfluenceClient:
+    """Клиент Confluence с общей сессией и кэшем ответов по ETag."""
+
+    def __init__(self, base_url: str, token: Optional[str] = None, username: Optional[str] = None,
+                 password: Optional[str] = None, timeout: int = DEFAULT_TIMEOUT,
+                 pool_limit: int = DEFAULT_POOL_LIMIT):
+        self.base_url = base_url.strip().rstrip("/")
+        self.timeout = timeout
+        self.pool_limit = pool_limit
+        self._headers = {"Accept": "application/json"}
+        self._auth = None
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        elif username:
+            self._auth = aiohttp.BasicAuth(username, password or "")
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._etags: Dict[Tuple[str, Tuple], Tuple[str, Any]] = {}
+        self.not_modified = 0
+
+    @classmethod
+    def from_config(cls, settings: Dict[str, Any]) -> "ConfluenceClient":
+        """Клиент по секции CONFIG["CONFLUENCE"]: адрес берётся из LOGIN_URL"""
+        base_url = settings["LOGIN_URL"].strip().split("/login")[0]
+        return cls(
+            base_url,
+            token=settings.get("TOKEN"),
+            username=settings.get("USERNAME"),
+            password=settings.get("PASSWORD"),
+            timeout=settings.get("REQUEST_TIMEOUT", DEFAULT_TIMEOUT),
+            pool_limit=settings.get("POOL_LIMIT", DEFAULT_POOL_LIMIT)
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self._headers,
+                auth=self._auth,
+                connector=aiohttp.TCPConnector(limit=self.pool_limit, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET с If-None-Match: при 304 возвращается закэшированный ответ"""
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        try:
+            async with self._get_session().get(f"{self.base_url}{path}", params=params,
+                                               headers=headers) as response:
+                if response.status == 304 and cached:
+                    self.not_modified += 1
+                    return cached[1]
+                if response.status >= 400:
+                    raise ConfluenceError(f"Confluence ответил {response.status} на {path}", response.status)
+                data = await response.json(content_type=None)
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._etags[key] = (etag, data)
+                return data
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ConfluenceError(f"Confluence недоступен: {e}") from e
+
+    # --- Страницы ---
+
+    async def get_content(self, page_id: str, expand: str = "body.storage,version") -> Dict[str, Any]:
+        """Страница Confluence с телом в формате storage"""
+        return await self._get(f"/rest/api/content/{page_id}", {"expand": expand})
+
+    async def calendar_ids_from_page(self, page_id: str) -> List[str]:
+        """Id календарей Team Calendars, встроенных в страницу макросом calendar"""
+        content = await self.get_content(page_id)
+        storage = content.get("body", {}).get("storage", {}).get("value", "")
+        ids = []
+        for match in CALENDAR_MACRO_RE.findall(storage):
+            ids += [i.strip() for i in match.split(",") if i.strip()]
+        return list(dict.fromkeys(ids))
+
+    # --- Календари ---
+
+    async def get_calendar_events(self, sub_calendar_id: str, start: date, end: date,
+                                  timezone: str = DEFAULT_TIMEZONE) -> List[CalendarEvent]:
+        """События одного календаря в интервале [start, end)"""
+        data = await self._get("/rest/calendar-services/1.0/calendar/events.json", {
+            "subCalendarId": sub_calendar_id,
+            "userTimeZoneId": timezone,
+            "start": datetime.combine(start, time.min).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": datetime.combine(end, time.min).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+        return [CalendarEvent.from_raw(event) for event in data.get("events", [])]
+
+    async def get_events(self, sub_calendar_ids: Sequence[str], start: date, end: date,
+                         timezone: str = DEFAULT_TIMEZONE) -> List[CalendarEvent]:
+        """События нескольких календарей, запрошенные одновременно и отсортированные по началу"""
+        results = await asyncio.gather(*[
+            self.get_calendar_events(calendar_id, start, end, timezone) for calendar_id in sub_calendar_ids
+        ])
+        return sorted((event for events in results for event in events), key=lambda e: e.start)
+
+    async def maintenance_for_week(self, page_id: str, calendar_ids: Sequence[str] = (),
+                                   day: Optional[date] = None) -> Tuple[date, date, List[CalendarEvent]]:
+        """
+        Работы на неделю, в которую входит day.
+
+        Календари берутся из calendar_ids, а если их нет — из макроса на странице page_id.
+        """
+        start, end = week_bounds(day)
+        calendar_ids = list(calendar_ids) or await self.calendar_ids_from_page(page_id)
+        if not calendar_ids:
+            raise ConfluenceError(f"На странице {page_id} нет календаря работ")
+        return start, end, await self.get_events(calendar_ids, start, end)
@@ -1,3 +1,191 @@
 """
 Сервис для создания скриншотов
-""" 
\ No newline at end of file
+
+ScreenshotBackend — общий интерфейс снимков страниц JIRA и Confluence в PNG.
+SeleniumBackend выполняет синхронный selenium_utils через переданную функцию
+запуска (в процессе снимков или в потоке). PlaywrightBackend работает в цикле
+событий: один браузер, по контексту на сайт, до PAGES страниц одновременно;
+вход сохраняется в файл состояния и переживает перезапуск, а вместо опроса
+WebDriverWait страница ждёт затишья в сети (networkidle).
+"""
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGES = 4
+DEFAULT_STATE_DIR = "data/browser_state"
+# networkidle может не наступить на страницах с длинными опросами — тогда снимаем по load
+NETWORK_IDLE_TIMEOUT = 10
+VIEWPORT = {"width": 1920, "height": 1080}
+
+
+class ScreenshotBackend(ABC):
+    """Базовый интерфейс снимков страниц"""
+
+    async def start(self):
+        """Заранее поднимает браузер, чтобы первый снимок не ждал его запуска"""
+
+    @abstractmethod
+    async def capture(self, url: Optional[str] = None, timeout: Optional[float] = None) -> Optional[bytes]:
+        """PNG страницы (без url — календаря работ); None, если снять не удалось"""
+
+    async def close(self):
+        """Освобождает браузер"""
+
+
+class SeleniumBackend(ScreenshotBackend):
+    """Снимки через selenium_utils; run(«модуль:функция», *args, timeout=...) решает, где они выполняются."""
+
+    def __init__(self, run: Callable[..., Awaitable[Any]]):
+        self._run = run
+
+    async def start(self):
+        await self._run("selenium_utils:prelaunch_browser")
+
+    async def capture(self, url: Optional[str] = None, timeout: Optional[float] = None) -> Optional[bytes]:
+        return await self._run("selenium_utils:capture_page_png", url, timeout=timeout)
+
+
+@dataclass
+class SiteLogin:
+    """Сайт с формой входа и элементом, который попадает на снимок"""
+    name: str
+    base_url: str
+    login_url: str
+    username: str
+    password: str
+    username_field: str
+    password_field: str
+    submit: str
+    selector: Optional[str] = None
+    user_agent: Optional[str] = None
+
+    def matches(self, url: str) -> bool:
+        return url.startswith(self.base_url)
+
+
+class PlaywrightBackend(ScreenshotBackend):
+    """Асинхронные снимки через Playwright (импортируется только при запуске)."""
+
+    def __init__(self, sites: List[SiteLogin], default_url: str, pages: int = DEFAULT_PAGES,
+                 state_dir: str = DEFAULT_STATE_DIR, timeout: float = 30):
+        if not sites:
+            raise ValueError("Не задан ни один сайт для снимков")
+        self.sites = sites
+        self.default_url = default_url.strip()
+        self.state_dir = state_dir
+        self.timeout = timeout
+        self._pages = asyncio.Semaphore(pages)
+        self._playwright = None
+        self._browser = None
+        self._contexts: Dict[str, Any] = {}
+        self._login_locks: Dict[str, asyncio.Lock] = {site.name: asyncio.Lock() for site in sites}
+        self._start_lock = asyncio.Lock()
+        self._context_lock = asyncio.Lock()
+
+    def site_for(self, url: str) -> SiteLogin:
+        return next((site for site in self.sites if site.matches(url)), self.sites[0])
+
+    def _state_path(self, site: SiteLogin) -> str:
+        return os.path.join(self.state_dir, f"{site.name}.json")
+
+    async def start(self):
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+            logger.info("🚀 Браузер Playwright запущен")
+
+    async def close(self):
+        for context in self._contexts.values():
+            await context.close()
+        self._contexts.clear()
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+    async def _context(self, site: SiteLogin):
+        """Контекст сайта с сохранённым входом (куки и localStorage из файла состояния)"""
+        await self.start()
+        async with self._context_lock:
+            context = self._contexts.get(site.name)
+            if context is None:
+                state = self._state_path(site)
+                context = await self._browser.new_context(
+                    viewport=VIEWPORT,
+                    user_agent=site.user_agent,
+                    storage_state=state if os.path.exists(state) else None
+                )
+                self._contexts[site.name] = context
+        return context
+
+    async def _wait_idle(self, page):
+        try:
+            await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT * 1000)
+        except Exception:
+            logger.info(f"⏳ Сеть не затихла на {page.url}, снимаем по событию load")
+
+    async def _login(self, site: SiteLogin, page):
+        """Входит через форму и сохраняет состояние; параллельные страницы ждут один вход"""
+        lock = self._login_locks[site.name]
+        if lock.locked():
+            async with lock:
+                return
+        async with lock:
+            logger.info(f"🔑 Вход в {site.name} через Playwright")
+            await page.goto(site.login_url, wait_until="load")
+            await page.fill(site.username_field, site.username)
+            await page.fill(site.password_field, site.password)
+            await page.click(site.submit)
+            await self._wait_idle(page)
+            os.makedirs(self.state_dir, exist_ok=True)
+            await page.context.storage_state(path=self._state_path(site))
+
+    async def _needs_login(self, site: SiteLogin, page) -> bool:
+        return await page.locator(site.username_field).count() > 0
+
+    async def _open(self, page, url: str):
+        await page.goto(url, wait_until="load")
+        await self._wait_idle(page)
+
+    async def _shoot(self, url: str) -> bytes:
+        site = self.site_for(url)
+        context = await self._context(site)
+        async with self._pages:
+            page = await context.new_page()
+            try:
+                await self._open(page, url)
+                if await self._needs_login(site, page):
+                    await self._login(site, page)
+                    await self._open(page, url)
+                element = page.locator(site.selector).first if site.selector else None
+                if element is not None and await element.count():
+                    return await element.screenshot()
+                if site.selector:
+                    logger.warning(f"⚠️ Элемент {site.selector} не найден — снимаем всю страницу")
+                return await page.screenshot(full_page=True)
+            finally:
+                await page.close()
+
+    async def capture(self, url: Optional[str] = None, timeout: Optional[float] = None) -> Optional[bytes]:
+        url = (url or self.default_url).strip()
+        try:
+            png = await asyncio.wait_for(self._shoot(url), timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"🚨 Ошибка создания скриншота {url}: {e}", exc_info=True)
+            return None
+        logger.info(f"✅ Скриншот успешно создан ({len(png)} байт)")
+        return png
@@ -192,4 +192,12 @@ def create_refresh_keyboard(current_page: int = 0, total_pages: int = 1) -> Inli
         InlineKeyboardButton(text="🔄 Обновить", callback_data="refresh_selection"),
         InlineKeyboardButton(text="❌ Закрыть", callback_data="close_selection")
     )
-    return builder.as_markup()
\ No newline at end of file
+    return builder.as_markup()
+
+
+def create_prerender_refresh_keyboard(page_index: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(text="🔄 Обновить снимок", callback_data=f"prerender_refresh_{page_index}")
+    )
+    return builder.as_markup()
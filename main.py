@@ -3,23 +3,44 @@ import logging
 import os
 import sys
 
-from aiogram import Bot, Dispatcher
-from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.client.default import DefaultBotProperties
-from utils.helpers import is_admin, is_superadmin
+# Профилировщик подключаем первым, чтобы замерить импорт остальных модулей
+from utils.startup_profiler import startup_profiler
+
+with startup_profiler.stage("aiogram", kind="import"):
+    from aiogram import Bot, Dispatcher
+    from aiogram.enums import ParseMode
+    from aiogram.fsm.storage.memory import MemoryStorage
+    from aiogram.client.default import DefaultBotProperties
 
 # Импорты из ваших модулей
-from bot_state import BotState
-from config import CONFIG
-from handlers import (
-    start_help,
-    alarm_handlers,
-    screenshot,
-    manage_handlers,
-)
-from handlers.current_events import router as current_events_router
-from handlers.manage_handlers import check_reminders
+with startup_profiler.stage("config, bot_state", kind="import"):
+    from utils.helpers import is_admin, is_superadmin
+    from bot_state import bot_state
+    from config import CONFIG
+
+with startup_profiler.stage("handlers", kind="import"):
+    from handlers import (
+        start_help,
+        alarm_handlers,
+        screenshot,
+        manage_handlers,
+    )
+    from handlers.current_events import router as current_events_router
+    from handlers.manage_handlers import check_reminders
+    from utils.startup import (
+        StartupOrchestrator, StartupStep, register_commands, warmup_steps, shutdown_warmed_resources
+    )
+    from utils.status_board import status_board, status_board_enabled
+    from utils.announcements import announcements
+    from utils.middlewares import UserProfileMiddleware, UserSerialMiddleware
+    from utils.user_cache import user_cache, init_user_repository
+    from utils.jira_jobs import setup_outbox, close_api_client, get_gateway
+    from utils.jira_webhook import create_webhook_server
+    from utils.jira_sync import create_sync_worker
+    from utils.maintenance_calendar import close_confluence_client
+    from utils.prerender import get_prerenderer
+    from utils.screenshot_worker import close_screenshot_backend
+startup_profiler.mark_imports_done()
 print('main.py запускается')
 # --- Настройка логирования ---
 logger = logging.getLogger(__name__)
@@ -45,13 +66,10 @@ def setup_logging():
         handlers=[file_handler, console_handler]
     )
 
-setup_logging()  # Вызываем настройку логирования до всего
+with startup_profiler.stage("setup_logging"):
+    setup_logging()  # Вызываем настройку логирования до всего
 logger = logging.getLogger(__name__)
 
-
-# Глобальные переменные
-bot_state = BotState()
-
 # Проверка наличия токена
 if "TELEGRAM" not in CONFIG or "TOKEN" not in CONFIG["TELEGRAM"]:
     logger.critical("❌ Токен Telegram не найден в конфиге")
@@ -76,20 +94,26 @@ async def main():
         logger.warning("⚠️ Не удалось проверить дублирование запуска — возможно, это Windows")
 
     # Инициализация бота и диспетчера
-    bot = Bot(token=CONFIG["TELEGRAM"]["TOKEN"], default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    dp = Dispatcher(storage=MemoryStorage())
-
-    await bot_state.load_state()
-    logger.info("📂 Состояние загружено")
-
-    # Регистрация роутеров
-    dp.include_router(start_help.router)
-    dp.include_router(alarm_handlers.router)
-    dp.include_router(screenshot.router)
-    dp.include_router(manage_handlers.router)
-    dp.include_router(current_events_router)
-
-    # Установка команд
+    with startup_profiler.stage("Bot и Dispatcher"):
+        bot = Bot(token=CONFIG["TELEGRAM"]["TOKEN"], default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+        dp = Dispatcher(storage=MemoryStorage())
+        user_cache.attach(bot)
+        dp.message.outer_middleware(UserProfileMiddleware())
+        dp.callback_query.outer_middleware(UserProfileMiddleware())
+        # Одна очередь на пользователя для сообщений и нажатий кнопок
+        serial = UserSerialMiddleware(max_pending=CONFIG.get("USER_QUEUE_LIMIT", 5))
+        dp.message.outer_middleware(serial)
+        dp.callback_query.outer_middleware(serial)
+
+    # Регистрация роутеров (синхронно и быстро, до параллельных шагов)
+    with startup_profiler.stage("регистрация роутеров"):
+        dp.include_router(start_help.router)
+        dp.include_router(alarm_handlers.router)
+        dp.include_router(screenshot.router)
+        dp.include_router(manage_handlers.router)
+        dp.include_router(current_events_router)
+
+    # Команды бота
     from aiogram.types import BotCommand
     commands = [
         BotCommand(command="start", description="Запустить бота"),
@@ -99,17 +123,64 @@ async def main():
         BotCommand(command="manage", description="Управление событиями"),
         BotCommand(command="alarm_list", description="Список активных событий"),
     ]
-    await bot.set_my_commands(commands)
-    logger.info("✅ Команды установлены")
 
-    # Запуск бота
+    # Независимые шаги инициализации выполняются параллельно
+    orchestrator = StartupOrchestrator(profiler=startup_profiler)
+    orchestrator.add_stage("инициализация", [
+        StartupStep("загрузка состояния", bot_state.load_state, critical=True),
+        StartupStep("установка команд", lambda: register_commands(bot, commands)),
+        StartupStep("загрузка имён пользователей", init_user_repository),
+        *warmup_steps(),
+    ])
+    # Возвращается, когда прогревы завершены или исчерпали STARTUP.WARMUP_TIMEOUT; не успевшие досчитываются в фоне
+    warmup = await orchestrator.start()
+    logger.info("📂 Состояние загружено")
+
+    if startup_profiler.enabled:
+        # Режим --profile-startup: дожидаемся прогревов, печатаем разбивку и выходим без polling
+        await warmup
+        print(startup_profiler.report())
+        await shutdown_warmed_resources()
+        await bot.session.close()
+        return
+
+    jira_outbox = setup_outbox(bot)
+    webhook_server = create_webhook_server(bot)
+    sync_worker = create_sync_worker(bot)
+    prerenderer = get_prerenderer()
     try:
         logger.info("🤖 Бот начал работу")
+        if get_gateway():
+            # Общая сессия JIRA для очереди, синхронизации и переходов
+            await get_gateway().start()
+        if webhook_server:
+            await webhook_server.start()
         asyncio.create_task(check_reminders(bot))
+        asyncio.create_task(jira_outbox.run())
+        if sync_worker:
+            asyncio.create_task(sync_worker.run())
+        if prerenderer:
+            asyncio.create_task(prerenderer.run())
+        if status_board_enabled():
+            status_board.start(bot)
         await dp.start_polling(bot)
     finally:
         logger.info("🛑 Бот остановлен")
+        warmup.cancel()
+        await jira_outbox.stop()
+        await close_api_client()
+        await close_confluence_client()
+        await close_screenshot_backend()
+        if sync_worker:
+            sync_worker.stop()
+        if prerenderer:
+            prerenderer.stop()
+        if webhook_server:
+            await webhook_server.stop()
+        await announcements.flush()
+        await status_board.flush()
         await bot_state.save_state()
+        await shutdown_warmed_resources()
         await bot.session.close()
 
 
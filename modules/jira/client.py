@@ -2,14 +2,43 @@
 Клиент для работы с Jira API
 """
 import logging
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Optional
 
-from jira import JIRA
+from common.jira.gateway import JiraGateway
+from common.jira.metadata import DEFAULT_MAX_AGE, DEFAULT_SNAPSHOT_PATH
 from utils.config import CONFIG
 
 logger = logging.getLogger(__name__)
 
-def create_failure_issue(data: Dict[str, Any]) -> str:
+_gateway: Optional[JiraGateway] = None
+
+
+def get_gateway() -> JiraGateway:
+    """Шлюз JIRA бота FA (создаётся при первом обращении)"""
+    global _gateway
+    if _gateway is None:
+        jira = CONFIG["JIRA"]
+        _gateway = JiraGateway.from_settings(
+            jira["LOGIN_URL"], jira["TOKEN"],
+            request_timeout=jira.get("REQUEST_TIMEOUT", 15),
+            pool_limit=jira.get("POOL_LIMIT", 10)
+        )
+        _gateway.load_snapshot(
+            jira.get("METADATA_SNAPSHOT", DEFAULT_SNAPSHOT_PATH),
+            max_age=jira.get("METADATA_MAX_AGE", DEFAULT_MAX_AGE)
+        )
+    return _gateway
+
+
+async def close_gateway():
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+    _gateway = None
+
+
+async def create_failure_issue(data: Dict[str, Any]) -> str:
     """
     Создает задачу в Jira
     
@@ -20,27 +49,19 @@ def create_failure_issue(data: Dict[str, Any]) -> str:
         str: Ключ созданной задачи
     """
     try:
-        jira = JIRA(
-            server=CONFIG["JIRA"]["LOGIN_URL"],
-            basic_auth=(CONFIG["JIRA"]["USERNAME"], CONFIG["JIRA"]["PASSWORD"])
+        issue = await get_gateway().create_fa_issue(
+            summary=data['summary'],
+            description=data['description'],
+            problem_level=data.get('level'),
+            problem_service=data.get('service'),
+            naumen_failure_type=data.get('naumen_type'),
+            stream_1c=data.get('stream_1c'),
+            time_start_problem=data.get('time_start_problem') or datetime.now().strftime("%Y-%m-%d %H:%M"),
+            influence=data.get('influence')
         )
-        
-        issue_dict = {
-            'project': {'key': 'FA'},
-            'summary': data['summary'],
-            'description': data['description'],
-            'issuetype': {'name': 'Failure'},
-            'customfield_10001': data.get('level', ''),
-            'customfield_10002': data.get('service', ''),
-            'customfield_10003': data.get('naumen_type', ''),
-            'customfield_10004': data.get('stream_1c', ''),
-            'customfield_10005': data.get('influence', '')
-        }
-        
-        new_issue = jira.create_issue(fields=issue_dict)
-        logger.info(f"Создана задача {new_issue.key}")
-        return new_issue.key
+        logger.info(f"Создана задача {issue['key']}")
+        return issue['key']
         
     except Exception as e:
         logger.error(f"Ошибка при создании задачи в Jira: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
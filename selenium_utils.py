@@ -6,204 +6,243 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
-import os
+import base64
 import logging
+import threading
+from functools import lru_cache
+from typing import Optional
 from config import CONFIG
 
 logger = logging.getLogger(__name__)
-SCREENSHOT_PATH = "screenshot.png"
 SELENIUM_TIMEOUT = 30  # Таймаут ожидания загрузки элементов
+# Снимаемые элементы: тело страницы Confluence и карточка задачи JIRA
+CONFLUENCE_SELECTOR = "#main-content"
+JIRA_SELECTOR = "#issue-content"
+CONFLUENCE_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0 Safari/537.36"
 
+# Заранее запущенный браузер, который отдаётся первому запросу скриншота
+_spare_driver = None
+_spare_lock = threading.Lock()
+_keep_spare = False
 
-def make_confluence_screenshot():
-    """
-    Делает скриншот целевой страницы Confluence (из конфига)
-    """
-    logger.info("📸 Делаю скриншот календаря...")
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Путь к chromedriver; ChromeDriverManager проверяет версию по сети, поэтому кэшируем"""
+    return ChromeDriverManager().install()
+
+
+def _launch_driver():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
+    service = Service(_chromedriver_path())
+    return webdriver.Chrome(service=service, options=options)
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
 
+def _replenish_spare():
+    global _spare_driver
     try:
-        driver.delete_all_cookies()
-        logger.info("🌐 Переходим на страницу входа в Confluence")
-        driver.get(CONFIG["CONFLUENCE"]["LOGIN_URL"])
-
-        logger.info("⏳ Ждём поля ввода логина")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.ID, "os_username"))
-        ).send_keys(CONFIG["CONFLUENCE"]["USERNAME"])
-        driver.find_element(By.ID, "os_password").send_keys(CONFIG["CONFLUENCE"]["PASSWORD"])
-        driver.find_element(By.ID, "loginButton").click()
-
-        logger.info("⏳ Ждём загрузки главной страницы")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
+        driver = _launch_driver()
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось заранее запустить браузер: {e}")
+        return
+    with _spare_lock:
+        if _spare_driver is None:
+            _spare_driver = driver
+            return
+    driver.quit()
 
-        logger.info(f"🌐 Открываем целевую страницу: {CONFIG['CONFLUENCE']['TARGET_URL']}")
-        driver.get(CONFIG["CONFLUENCE"]["TARGET_URL"])
 
-        logger.info("⏳ Ждём завершения загрузки страницы")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
+def _create_driver(user_agent: Optional[str] = None):
+    """
+    Возвращает драйвер Chrome: заранее запущенный, если он есть, иначе новый
+    """
+    global _spare_driver
+    with _spare_lock:
+        driver, _spare_driver = _spare_driver, None
 
-        current_url = driver.current_url
-        logger.info(f"🌐 Загружена страница: {current_url}")
+    if driver is not None:
+        try:
+            driver.current_url  # Проверяем, что браузер ещё жив
+            logger.info("♻️ Используем заранее запущенный браузер")
+        except Exception:
+            logger.warning("⚠️ Заранее запущенный браузер недоступен, запускаем новый")
+            driver = None
+    if driver is None:
+        driver = _launch_driver()
 
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        driver.set_window_size(1920, total_height)
+    if _keep_spare:
+        threading.Thread(target=_replenish_spare, daemon=True).start()
 
-        logger.info(f"📷 Сохраняем скриншот в: {os.path.abspath(SCREENSHOT_PATH)}")
-        success = driver.save_screenshot(SCREENSHOT_PATH)
+    if user_agent:
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+    return driver
 
-        if success:
-            logger.info("✅ Скриншот успешно создан")
-        else:
-            logger.error("❌ Не удалось сохранить скриншот")
-        return success
 
-    except Exception as e:
-        logger.error(f"🚨 Ошибка создания скриншота Confluence: {str(e)}", exc_info=True)
-        return False
-
-    finally:
+def prelaunch_browser():
+    """
+    Запускает браузер заранее, чтобы первый скриншот не ждал старта Chrome.
+    После каждого использования запасной браузер поднимается снова.
+    """
+    global _keep_spare
+    _keep_spare = True
+    with _spare_lock:
+        if _spare_driver is not None:
+            return
+    _replenish_spare()
+    logger.info("🚀 Браузер для скриншотов запущен заранее")
+
+
+def shutdown_browser():
+    """Закрывает заранее запущенный браузер"""
+    global _spare_driver, _keep_spare
+    _keep_spare = False
+    with _spare_lock:
+        driver, _spare_driver = _spare_driver, None
+    if driver is not None:
         try:
             driver.quit()
-            logger.info("🛑 Закрыли драйвер Selenium")
         except Exception as e:
             logger.warning(f"⚠️ Не удалось корректно завершить драйвер: {str(e)}")
 
 
-def make_jira_screenshot(jira_url: str):
-    """
-    Делает скриншот по ссылке в JIRA
-    """
-    logger.info(f"📸 Начинаем создание скриншота JIRA: {jira_url}")
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
+def _login_confluence(driver):
+    driver.delete_all_cookies()
+    logger.info("🌐 Переходим на страницу входа в Confluence")
+    driver.get(CONFIG["CONFLUENCE"]["LOGIN_URL"])
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    logger.info("⏳ Ждём поля ввода логина")
+    WebDriverWait(driver, SELENIUM_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, "os_username"))
+    ).send_keys(CONFIG["CONFLUENCE"]["USERNAME"])
+    driver.find_element(By.ID, "os_password").send_keys(CONFIG["CONFLUENCE"]["PASSWORD"])
+    driver.find_element(By.ID, "loginButton").click()
 
-    try:
-        logger.info("🌐 Переходим на страницу входа в JIRA")
-        driver.get(CONFIG["JIRA"]["LOGIN_URL"])
+    logger.info("⏳ Ждём загрузки главной страницы")
+    WebDriverWait(driver, SELENIUM_TIMEOUT).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
 
-        logger.info("⏳ Ждём поля логина")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.ID, "login-form-username"))
-        ).send_keys(CONFIG["JIRA"]["USERNAME"])
-        driver.find_element(By.ID, "login-form-password").send_keys(CONFIG["JIRA"]["PASSWORD"])
-        driver.find_element(By.ID, "login-form-submit").click()
 
-        logger.info("⏳ Ждём загрузки главной страницы JIRA")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
+def _login_jira(driver):
+    logger.info("🌐 Переходим на страницу входа в JIRA")
+    driver.get(CONFIG["JIRA"]["LOGIN_URL"])
 
-        logger.info(f"🌐 Открываем задачу: {jira_url}")
-        driver.get(jira_url)
+    logger.info("⏳ Ждём поля логина")
+    WebDriverWait(driver, SELENIUM_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, "login-form-username"))
+    ).send_keys(CONFIG["JIRA"]["USERNAME"])
+    driver.find_element(By.ID, "login-form-password").send_keys(CONFIG["JIRA"]["PASSWORD"])
+    driver.find_element(By.ID, "login-form-submit").click()
 
-        logger.info("⏳ Ждём загрузки тела страницы")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        driver.set_window_size(1920, total_height)
+    logger.info("⏳ Ждём загрузки главной страницы JIRA")
+    WebDriverWait(driver, SELENIUM_TIMEOUT).until(
+        EC.presence_of_element_located((By.TAG_NAME, "body"))
+    )
 
-        logger.info(f"📷 Сохраняем скриншот в: {os.path.abspath(SCREENSHOT_PATH)}")
-        success = driver.save_screenshot(SCREENSHOT_PATH)
 
-        if success:
-            logger.info("✅ Скриншот успешно создан")
-        else:
-            logger.error("❌ Не удалось сохранить скриншот")
-        return success
+def _screenshot_settings() -> dict:
+    return CONFIG.get("SCREENSHOT", {})
 
-    except Exception as e:
-        logger.error(f"🚨 Ошибка создания скриншота JIRA: {str(e)}", exc_info=True)
-        return False
 
-    finally:
-        try:
-            driver.quit()
-            logger.info("🛑 Закрыли драйвер Selenium")
-        except Exception as e:
-            logger.warning(f"⚠️ Не удалось корректно завершить драйвер: {str(e)}")
+def _element_clip(driver, selector: str) -> Optional[dict]:
+    """Прямоугольник элемента в координатах документа (None, если элемента нет)"""
+    rect = driver.execute_script(
+        "const el = document.querySelector(arguments[0]);"
+        "if (!el) return null;"
+        "const r = el.getBoundingClientRect();"
+        "return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};",
+        selector
+    )
+    if not rect or rect["width"] < 1 or rect["height"] < 1:
+        return None
+    return {**rect, "scale": 1}
 
 
-def make_confluence_screenshot_page(confluence_url: str):
+def _capture_png(driver, selector: Optional[str] = None) -> bytes:
     """
-    Делает скриншот по произвольной ссылке в Confluence
+    PNG через DevTools (Page.captureScreenshot) прямо в память: только элемент selector,
+    а без него или если элемента нет — вся страница. Окно браузера при этом не растягивается.
     """
-    logger.info(f"📸 Начинаем создание скриншота Confluence: {confluence_url}")
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0 Safari/537.36")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-
+    clip = _element_clip(driver, selector) if selector else None
+    if clip is None:
+        if selector:
+            logger.warning(f"⚠️ Элемент {selector} не найден — снимаем всю страницу")
+        size = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})["cssContentSize"]
+        clip = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+    result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png",
+        "clip": clip,
+        "captureBeyondViewport": True,
+        "fromSurface": True,
+    })
+    return base64.b64decode(result["data"])
+
+
+def _capture(url: str, login, selector: Optional[str], user_agent: Optional[str] = None) -> Optional[bytes]:
+    driver = _create_driver(user_agent=user_agent)
     try:
-        driver.delete_all_cookies()
-        logger.info("🌐 Переходим на страницу входа в Confluence")
-        driver.get(CONFIG["CONFLUENCE"]["LOGIN_URL"])
-
-        logger.info("⏳ Ждём поля ввода логина")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.ID, "os_username"))
-        ).send_keys(CONFIG["CONFLUENCE"]["USERNAME"])
-        driver.find_element(By.ID, "os_password").send_keys(CONFIG["CONFLUENCE"]["PASSWORD"])
-        driver.find_element(By.ID, "loginButton").click()
+        login(driver)
 
-        logger.info("⏳ Ждём загрузки главной страницы")
-        WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-
-        logger.info(f"🌐 Открываем страницу: {confluence_url}")
-        driver.get(confluence_url)
+        logger.info(f"🌐 Открываем страницу: {url}")
+        driver.get(url)
 
-        logger.info("⏳ Ждём загрузки тела страницы")
+        logger.info("⏳ Ждём завершения загрузки страницы")
         WebDriverWait(driver, SELENIUM_TIMEOUT).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
+            lambda d: d.execute_script('return document.readyState') == 'complete'
         )
-
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        driver.set_window_size(1920, total_height)
-
-        logger.info(f"📷 Сохраняем скриншот в: {os.path.abspath(SCREENSHOT_PATH)}")
-        success = driver.save_screenshot(SCREENSHOT_PATH)
-
-        if success:
-            logger.info("✅ Скриншот успешно создан")
-        else:
-            logger.error("❌ Не удалось сохранить скриншот")
-        return success
+        if selector:
+            try:
+                WebDriverWait(driver, SELENIUM_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                )
+            except TimeoutException:
+                pass
+
+        png = _capture_png(driver, selector)
+        logger.info(f"✅ Скриншот успешно создан ({len(png)} байт)")
+        return png
 
     except Exception as e:
-        logger.error(f"🚨 Ошибка создания скриншота Confluence: {str(e)}", exc_info=True)
-        return False
+        logger.error(f"🚨 Ошибка создания скриншота {url}: {str(e)}", exc_info=True)
+        return None
 
     finally:
         try:
             driver.quit()
             logger.info("🛑 Закрыли драйвер Selenium")
         except Exception as e:
-            logger.warning(f"⚠️ Не удалось корректно завершить драйвер: {str(e)}")
\ No newline at end of file
+            logger.warning(f"⚠️ Не удалось корректно завершить драйвер: {str(e)}")
+
+
+def capture_confluence_png(url: Optional[str] = None) -> Optional[bytes]:
+    """
+    Скриншот страницы Confluence (по умолчанию — целевой из конфига) в памяти, в формате PNG.
+    Снимается только содержимое страницы (SCREENSHOT.CONFLUENCE_SELECTOR).
+    """
+    logger.info("📸 Делаю скриншот Confluence...")
+    return _capture(
+        (url or CONFIG["CONFLUENCE"]["TARGET_URL"]).strip(),
+        _login_confluence,
+        _screenshot_settings().get("CONFLUENCE_SELECTOR", CONFLUENCE_SELECTOR),
+        user_agent=CONFLUENCE_USER_AGENT if url else None
+    )
+
+
+def capture_jira_png(jira_url: str) -> Optional[bytes]:
+    """Скриншот задачи JIRA в памяти: только карточка задачи (SCREENSHOT.JIRA_SELECTOR)"""
+    logger.info(f"📸 Начинаем создание скриншота JIRA: {jira_url}")
+    return _capture(jira_url, _login_jira, _screenshot_settings().get("JIRA_SELECTOR", JIRA_SELECTOR))
+
+
+def capture_page_png(url: Optional[str] = None) -> Optional[bytes]:
+    """PNG страницы JIRA или Confluence по ссылке (без ссылки — календарь работ)"""
+    if url and "jira" in url.lower():
+        return capture_jira_png(url)
+    return capture_confluence_png(url)
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from config import CONFIG
+from utils.announcements import (
+    ACTIVE, AnnouncementUpdater, EXTENDED, REOPENED, RESOLVED, UPDATED, alarm_thread_text
+)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.edited = []
+
+    async def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text, kwargs))
+        return SimpleNamespace(message_id=500)
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.edited.append((message_id, text))
+
+
+@pytest.fixture(autouse=True)
+def channel(monkeypatch):
+    monkeypatch.setitem(CONFIG["TELEGRAM"], "ALARM_CHANNEL_ID", "-100500")
+
+
+@pytest.mark.asyncio
+async def test_pending_updates_are_coalesced_into_one_edit_and_reply():
+    bot = FakeBot()
+    updater = AnnouncementUpdater(debounce=0.05)
+    alarm = {
+        "issue": "Не работает почта",
+        "fix_time": datetime(2025, 1, 1, 12),
+        "service": "Электронная почта",
+        "channel_message_id": 42,
+        "scm_chat_id": "-100600",
+        "scm_thread_id": 7,
+        "scm_message_id": 8,
+    }
+    updater.schedule(bot, "alarm", "FA-1", alarm, EXTENDED)
+    alarm["fix_time"] = datetime(2025, 1, 1, 13)
+    updater.schedule(bot, "alarm", "FA-1", alarm, EXTENDED)
+    updater.schedule(bot, "alarm", "FA-1", alarm, RESOLVED)
+    await asyncio.sleep(0.1)
+
+    assert len(bot.edited) == 1
+    assert bot.edited[0][0] == 42 and "Сбой завершён" in bot.edited[0][1]
+    assert len(bot.sent) == 1
+    chat_id, text, kwargs = bot.sent[0]
+    assert chat_id == "-100600" and kwargs["message_thread_id"] == 7 and kwargs["reply_to_message_id"] == 8
+
+
+@pytest.mark.asyncio
+async def test_legacy_announcement_without_id_is_posted_again():
+    bot = FakeBot()
+    updater = AnnouncementUpdater(debounce=0)
+    updater.schedule(bot, "maintenance", "ab12", {"description": "Обновление ЗУП"}, RESOLVED)
+    await updater.flush()
+
+    assert bot.edited == []
+    assert bot.sent[0][0] == "-100500" and "Работа завершена" in bot.sent[0][1]
+
+
+def test_thread_reply_matches_the_kind_of_change():
+    alarm = {"issue": "Не работает почта", "fix_time": datetime(2025, 1, 1, 12)}
+    assert "продлён" in alarm_thread_text(alarm, EXTENDED)
+    assert "возобновлён" in alarm_thread_text(alarm, REOPENED)
+    assert "Не работает почта" in alarm_thread_text(alarm, UPDATED)
+    assert alarm_thread_text(alarm, ACTIVE) is None
+
+
+@pytest.mark.asyncio
+async def test_channel_only_update_skips_thread_reply():
+    bot = FakeBot()
+    updater = AnnouncementUpdater(debounce=0)
+    alarm = {"issue": "Почта", "fix_time": datetime(2025, 1, 1, 12), "channel_message_id": 42,
+             "scm_chat_id": "-100600", "scm_thread_id": 7}
+    updater.schedule(bot, "alarm", "FA-1", alarm, RESOLVED, reply_in_thread=False)
+    await updater.flush()
+    assert len(bot.edited) == 1 and bot.sent == []
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from bots.contact_center_bot.bulk_import import ImportProgress, RowError, iter_csv, iter_rows, run_import
+from bots.contact_center_bot.outbox import SICK_LEAVE, TECHNICAL_ISSUE
+
+CSV = (
+    "﻿Тип;Сотрудник;Руководитель;Дата;Время;Сторона;Описание\n"
+    "Больничный;Иванов И.И.;Петров П.П.;17.06.2025;;на себя;\n"
+    "Неполадка;Сидоров С.С.;Петров П.П.;17.06.2025;09:15;оператора;Не работает гарнитура\n"
+    ";;;;;;\n"
+    "Неполадка;Кузнецов К.К.;Петров П.П.;2025-06-17;09:15;компании;\n"
+    "Отпуск;Смирнов;Петров;17.06.2025;;;\n"
+).encode("utf-8")
+
+
+def test_rows_are_validated_while_reading():
+    rows = list(iter_rows(iter_csv(CSV)))
+
+    assert [r.kind for r in rows[:2]] == [SICK_LEAVE, TECHNICAL_ISSUE]
+    assert rows[0].payload["open_date"] == "2025-06-17"
+    assert rows[1].payload["problem_side"] == "👤 Проблема на стороне оператора"
+    # Пустая строка 4 пропущена, номера строк — как в файле
+    assert [(r.line, type(r)) for r in rows[2:]] == [(5, RowError), (6, RowError)]
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError):
+        list(iter_rows(iter_csv("Сотрудник,Дата\nИванов,17.06.2025\n".encode())))
+
+
+@pytest.mark.asyncio
+async def test_run_import_bounds_concurrency_and_collects_failures():
+    in_flight = 0
+    peak = 0
+    updates = []
+
+    async def create(kind, payload):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if payload["employee_name"] == "Сидоров С.С.":
+            raise RuntimeError("400")
+        return {"key": f"SCHED-{payload['employee_name']}"}
+
+    async def on_progress():
+        updates.append(progress.created)
+
+    progress = ImportProgress()
+    await run_import(iter_rows(iter_csv(CSV)), create, progress, on_progress=on_progress,
+                     concurrency=2, rate=1000)
+
+    assert progress.finished
+    assert (progress.read, progress.created) == (4, 1)
+    assert [e.line for e in progress.failed] == [3]
+    assert len(progress.invalid) == 2
+    assert peak <= 2
+    assert len(updates) == 2
+    assert "Строка 3" in progress.render()
@@ -0,0 +1,76 @@
+import time
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from common.jira.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, render_metrics
+from common.jira.client import handle_jira_errors
+from common.jira.exceptions import CircuitOpenError, JiraConnectionError, JiraValidationError
+
+
+def test_opens_after_threshold_and_rejects_fast():
+    breaker = CircuitBreaker("jira", failure_threshold=3, recovery_timeout=60)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+    start = time.perf_counter()
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert time.perf_counter() - start < 0.01
+    assert info.value.retry_after > 0
+    assert breaker.rejected_total == 1
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker("jira", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("jira", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.recovery_timeout = 60
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert 'jira_circuit_state{name="jira"} 2' in render_metrics({"jira": breaker})
+
+
+class FakeClient:
+    def __init__(self, error):
+        self.breaker = CircuitBreaker("fake", failure_threshold=2, recovery_timeout=60)
+        self.error = error
+
+    @handle_jira_errors
+    async def call(self):
+        raise self.error
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_mapped_and_counted():
+    request_info = aiohttp.RequestInfo(URL("https://jira.example/rest/api/2/issue"), "POST", {}, URL("https://jira.example"))
+    response_error = aiohttp.ClientResponseError(request_info, (), status=400, message="Bad Request")
+    client = FakeClient(response_error)
+    for _ in range(3):
+        with pytest.raises(JiraValidationError):
+            await client.call()
+    # Ошибка в данных не размыкает выключатель
+    assert client.breaker.state == CLOSED
+
+    client.error = aiohttp.ClientConnectionError("connection refused")
+    for _ in range(2):
+        with pytest.raises(JiraConnectionError):
+            await client.call()
+    with pytest.raises(CircuitOpenError):
+        await client.call()
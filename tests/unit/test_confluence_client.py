@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from infrastructure.confluence.confluence_client import ConfluenceClient, ConfluenceError, page_id_from_url
+from utils.maintenance_calendar import render_week_html
+
+PAGE = {
+    "id": "309867053",
+    "body": {"storage": {"value": (
+        '<p>Календарь</p><ac:structured-macro ac:name="calendar" ac:schema-version="1">'
+        '<ac:parameter ac:name="id">cal-infra,cal-1c</ac:parameter></ac:structured-macro>'
+    )}},
+}
+EVENTS = {
+    "cal-infra": [{"title": "Обновление <VPN>", "start": "2025-01-08T22:00:00+03:00",
+                   "end": "2025-01-08T23:30:00+03:00", "allDay": False, "subCalendarName": "Инфраструктура"}],
+    "cal-1c": [{"title": "Регламент 1С", "start": "2025-01-06T00:00:00+03:00",
+                "end": "2025-01-08T00:00:00+03:00", "allDay": True}],
+}
+
+
+class FakeConfluence:
+    def __init__(self):
+        self.page_bodies_sent = 0
+        self.event_queries = []
+
+    async def content(self, request):
+        if request.headers.get("If-None-Match") == '"v7"':
+            return web.Response(status=304)
+        self.page_bodies_sent += 1
+        return web.json_response(PAGE, headers={"ETag": '"v7"'})
+
+    async def events(self, request):
+        self.event_queries.append(dict(request.query))
+        return web.json_response({"success": True, "events": EVENTS[request.query["subCalendarId"]]})
+
+
+@pytest_asyncio.fixture
+async def confluence():
+    fake = FakeConfluence()
+    app = web.Application()
+    app.router.add_get("/rest/api/content/309867053", fake.content)
+    app.router.add_get("/rest/calendar-services/1.0/calendar/events.json", fake.events)
+    server = TestServer(app)
+    await server.start_server()
+    client = ConfluenceClient(str(server.make_url("")), token="pat")
+    yield fake, client
+    await client.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_week_maintenance_from_page_calendars_with_etag_cache(confluence):
+    fake, client = confluence
+    start, end, events = await client.maintenance_for_week("309867053", day=date(2025, 1, 9))
+    await client.maintenance_for_week("309867053", day=date(2025, 1, 9))
+
+    assert (start, end) == (date(2025, 1, 6), date(2025, 1, 13))
+    assert [e.title for e in events] == ["Регламент 1С", "Обновление <VPN>"]
+    assert fake.page_bodies_sent == 1 and client.not_modified == 1
+    assert fake.event_queries[0]["start"] == "2025-01-06T00:00:00Z"
+
+    text = render_week_html(start, end, events)
+    assert "<b>Пн 06.01</b>\n• весь день — Регламент 1С" in text
+    assert "<b>Вт 07.01</b>\n• весь день — Регламент 1С" in text
+    assert "• 22:00–23:30 — Обновление &lt;VPN&gt; <i>(Инфраструктура)</i>" in text
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported_as_confluence_error(confluence):
+    fake, client = confluence
+    with pytest.raises(ConfluenceError) as error:
+        await client.get_content("404")
+    assert error.value.status == 404
+
+
+def test_page_id_is_taken_from_target_url():
+    assert page_id_from_url("https://confluence/pages/viewpage.action?pageId=309867053 ") == "309867053"
+    assert page_id_from_url("https://confluence/display/OPS/Calendar") is None
@@ -0,0 +1,102 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import handlers.current_events as current_events
+from bot_state import bot_state
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    bot_state.active_alarms.clear()
+    bot_state.active_maintenances.clear()
+    current_events._render_cache.clear()
+    yield
+    bot_state.active_alarms.clear()
+    bot_state.active_maintenances.clear()
+    current_events._render_cache.clear()
+
+
+def _add_alarm(alarm_id: str):
+    bot_state.active_alarms[alarm_id] = {
+        "issue": f"Проблема {alarm_id}",
+        "fix_time": datetime(2025, 1, 1, 12, 0),
+        "user_id": 1,
+    }
+    bot_state.touch()
+
+
+def test_page_is_rendered_once_per_version(monkeypatch):
+    _add_alarm("FA-1")
+    calls = []
+    original = current_events.format_alarms_page
+
+    def counting(alarms, page):
+        calls.append(page)
+        return original(alarms, page)
+
+    monkeypatch.setattr(current_events, "format_alarms_page", counting)
+
+    first = current_events.render_page("alarms", 0)
+    second = current_events.render_page("alarms", 0)
+    assert first == second
+    assert calls == [0]
+
+    _add_alarm("FA-2")
+    text, total_pages = current_events.render_page("alarms", 0)
+    assert calls == [0, 0]
+    assert "FA-2" in text
+    assert total_pages == 1
+
+
+def test_stale_versions_are_dropped():
+    _add_alarm("FA-1")
+    current_events.render_page("alarms", 0)
+    current_events.render_page("maintenances", 0)
+    _add_alarm("FA-2")
+    current_events.render_page("alarms", 0)
+    assert list(current_events._render_cache) == [("alarms", 0)]
+
+
+def test_pagination_uses_slice_of_items():
+    for i in range(current_events.ITEMS_PER_PAGE + 2):
+        _add_alarm(f"FA-{i}")
+    text, total_pages = current_events.render_page("alarms", 1)
+    assert total_pages == 2
+    assert "FA-5" in text and "FA-6" in text
+    assert "FA-0" not in text
+
+
+class FakeState:
+    def __init__(self):
+        self.data = {}
+
+    async def get_data(self):
+        return dict(self.data)
+
+    async def update_data(self, **kwargs):
+        self.data.update(kwargs)
+
+
+class FakeMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        self.edits.append((text, kwargs["reply_markup"]))
+
+
+@pytest.mark.asyncio
+async def test_show_page_builds_pagination_keyboard():
+    for i in range(current_events.ITEMS_PER_PAGE + 2):
+        _add_alarm(f"FA-{i}")
+    message = FakeMessage()
+    call = SimpleNamespace(from_user=SimpleNamespace(id=1), message=message)
+    state = FakeState()
+
+    assert await current_events.show_page(call, state, "alarms", 0)
+    assert not await current_events.show_page(call, state, "alarms", 0)
+    _, markup = message.edits[0]
+    callbacks = [button.callback_data for row in markup.inline_keyboard for button in row]
+    assert callbacks == ["page_next", "refresh_selection", "close_selection"]
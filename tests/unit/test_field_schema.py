@@ -0,0 +1,101 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from common.jira.config import JiraConfig
+from common.jira.exceptions import JiraValidationError
+from common.jira.fa_fields import FA_FIELD_ALIASES
+from common.jira.field_schema import FieldSchemaRegistry
+from common.jira.gateway import JiraGateway
+
+CREATEMETA = {"projects": [
+    {"key": "FA", "issuetypes": [{"id": "11700", "name": "Failure", "fields": {
+        "summary": {"name": "Тема", "required": True, "schema": {"type": "string"}},
+        "description": {"name": "Описание", "required": False, "schema": {"type": "string"}},
+        "issuetype": {"name": "Тип", "required": True, "schema": {"type": "issuetype"}},
+        "project": {"name": "Проект", "required": True, "schema": {"type": "project"}},
+        "customfield_13117": {"name": "Уровень проблемы", "required": True, "schema": {"type": "option"},
+                              "allowedValues": [{"id": "1", "value": "Замедление работы сервиса"},
+                                                {"id": "2", "value": "Полная недоступность сервиса"},
+                                                {"id": "3", "value": "Старый уровень", "disabled": True}]},
+        "customfield_13937": {"name": "Сервис", "required": False, "schema": {"type": "option"},
+                              "allowedValues": [{"id": "10", "value": "Naumen"}]},
+        "customfield_13119": {"name": "Время начала", "required": False, "schema": {"type": "datetime"}},
+    }}]},
+    {"key": "SCHED", "issuetypes": [{"id": "10408", "name": "Сервисный запрос", "fields": {
+        "summary": {"name": "Тема", "required": True, "schema": {"type": "string"}},
+        "customfield_17432": {"name": "Сторона", "required": False, "schema": {"type": "option"},
+                              "allowedValues": [{"id": "18046", "value": "оператор"}]},
+    }}]},
+    {"key": "OLD", "issuetypes": [{"id": "1", "name": "Без полей"}]},
+]}
+
+
+def test_builder_converts_and_validates_locally():
+    registry = FieldSchemaRegistry.from_createmeta(CREATEMETA)
+    builder = registry.get("FA", "failure").builder("fa", FA_FIELD_ALIASES)
+
+    fields = builder.build(summary="Сбой", description="", problem_level="Замедление работы сервиса",
+                           problem_service="Naumen", time_start_problem="2025-01-10 09:30")
+    assert fields == {
+        "project": {"key": "FA"},
+        "issuetype": {"id": "11700"},
+        "summary": "Сбой",
+        "customfield_13117": {"value": "Замедление работы сервиса"},
+        "customfield_13937": {"value": "Naumen"},
+        "customfield_13119": "2025-01-10T09:30:00.000+0300",
+    }
+    assert registry.get("FA", "11700").builder("fa", FA_FIELD_ALIASES) is builder
+    assert registry.get("OLD", "1") is None
+
+    with pytest.raises(JiraValidationError) as error:
+        builder.build(summary="Сбой", problem_level="Старый уровень", stream_1c="ЭДО")
+    assert "недопустимое значение «Старый уровень»" in str(error.value)
+    assert "поле «stream_1c» недоступно" in str(error.value)
+
+
+def test_validate_ready_fields_by_option_id():
+    schema = FieldSchemaRegistry.from_createmeta(CREATEMETA).get("SCHED", "10408")
+    schema.validate({"project": {"key": "SCHED"}, "issuetype": {"id": "10408"},
+                     "summary": "Тех. неполадка", "customfield_17432": {"id": "18046"}})
+    with pytest.raises(JiraValidationError) as error:
+        schema.validate({"customfield_17432": {"id": "18047"}})
+    assert "не заполнено поле «Тема»" in str(error.value)
+    assert "«18047»" in str(error.value)
+
+
+@pytest_asyncio.fixture
+async def jira():
+    created = []
+
+    async def createmeta(request):
+        return web.json_response(CREATEMETA)
+
+    async def create(request):
+        created.append(await request.json())
+        return web.json_response({"id": "1", "key": "FA-1"}, status=201)
+
+    app = web.Application()
+    app.router.add_get("/rest/api/2/issue/createmeta", createmeta)
+    app.router.add_post("/rest/api/2/issue", create)
+    server = TestServer(app)
+    await server.start_server()
+    config = JiraConfig(JIRA_URL=str(server.make_url("")).rstrip("/"), JIRA_API_TOKEN="t",
+                        JIRA_DEFAULT_PROJECT="FA")
+    gateway = JiraGateway(config)
+    yield created, gateway
+    await gateway.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_gateway_rejects_invalid_option_without_posting(jira):
+    created, gateway = jira
+    with pytest.raises(JiraValidationError):
+        await gateway.create_fa_issue(summary="Сбой", problem_level="Всё сломалось")
+    assert created == []
+
+    await gateway.create_fa_issue(summary="Сбой", problem_level="Полная недоступность сервиса")
+    assert created[0]["fields"]["issuetype"] == {"id": "11700"}
+    assert gateway.metrics()["requests"] == 2
@@ -0,0 +1,28 @@
+import io
+import random
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+from utils.image_encoding import encode_within_budget  # noqa: E402
+
+
+def _noisy_png(width: int, height: int) -> bytes:
+    random.seed(1)
+    image = Image.frombytes("RGB", (width, height), bytes(random.getrandbits(8) for _ in range(width * height * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["jpeg", "webp"])
+def test_tall_screenshot_fits_budget(fmt):
+    png = _noisy_png(1920, 1200)
+    image = encode_within_budget(png, fmt=fmt, max_bytes=150_000, max_width=1600)
+
+    assert len(image.data) <= 150_000 < len(png)
+    assert image.format == fmt and image.width <= 1600
+    assert Image.open(io.BytesIO(image.data)).format == fmt.upper()
+    assert image.filename("calendar") == ("calendar.jpg" if fmt == "jpeg" else "calendar.webp")
@@ -0,0 +1,54 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from common.jira.client import JiraApiClient
+from common.jira.config import JiraConfig
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024
+
+
+@pytest_asyncio.fixture
+async def jira():
+    received = []
+
+    async def attachments(request):
+        assert request.headers["X-Atlassian-Token"] == "no-check"
+        reader = await request.multipart()
+        part = await reader.next()
+        received.append((part.name, part.filename, part.headers["Content-Type"], await part.read()))
+        return web.json_response([{"id": "100", "filename": part.filename}])
+
+    app = web.Application()
+    app.router.add_post("/rest/api/2/issue/FA-1/attachments", attachments)
+    server = TestServer(app)
+    await server.start_server()
+    config = JiraConfig(JIRA_URL=str(server.make_url("")).rstrip("/"), JIRA_API_TOKEN="t",
+                        JIRA_DEFAULT_PROJECT="FA")
+    async with JiraApiClient(config) as client:
+        yield client, received
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_attachment_from_bytes(jira):
+    client, received = jira
+    result = await client.add_attachment("FA-1", "calendar.png", PNG)
+
+    assert result[0]["id"] == "100"
+    assert received == [("file", "calendar.png", "image/png", PNG)]
+
+
+@pytest.mark.asyncio
+async def test_attachment_streamed_from_async_iterator(jira):
+    client, received = jira
+
+    async def chunks():
+        for start in range(0, len(PNG), 256):
+            yield PNG[start:start + 256]
+
+    await client.add_attachment("FA-1", "status.png", chunks())
+
+    assert received[0][1] == "status.png"
+    assert received[0][3] == PNG
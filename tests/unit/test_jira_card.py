@@ -0,0 +1,72 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from common.jira.client import JiraApiClient
+from common.jira.config import JiraConfig
+from utils.jira_card import CARD_FIELDS, issue_card, parse_issue_key, render_card_html, render_card_png
+
+RAW_ISSUE = {
+    "key": "FA-4242",
+    "fields": {
+        "summary": "Недоступен <Naumen>",
+        "status": {"name": "В работе", "statusCategory": {"key": "indeterminate"}},
+        "issuetype": {"name": "Failure"},
+        "priority": {"name": "High"},
+        "assignee": None,
+        "reporter": {"displayName": "Иван Дежурный"},
+        "created": "2025-01-10T09:30:00.000+0300",
+        "updated": "2025-01-10T10:05:00.000+0300",
+        "description": "Операторы не могут войти",
+        "customfield_13117": {"value": "Полная недоступность сервиса"},
+        "customfield_13119": "2025-01-10T09:15:00.000+0300",
+    },
+}
+
+
+def test_issue_key_is_parsed_from_links():
+    assert parse_issue_key("https://jira.petrovich.tech/browse/FA-4242") == "FA-4242"
+    assert parse_issue_key("https://jira/projects/FA/issues?selectedIssue=FA-7&x=1") == "FA-7"
+    assert parse_issue_key("https://jira.petrovich.tech/secure/Dashboard.jspa") is None
+
+
+def test_html_card_escapes_and_shows_fa_fields():
+    card = issue_card(RAW_ISSUE, "https://jira/browse/FA-4242")
+    text = render_card_html(card)
+
+    assert "<b>Недоступен &lt;Naumen&gt;</b>" in text
+    assert "• <b>Исполнитель:</b> не назначен" in text
+    assert "• <b>Уровень:</b> Полная недоступность сервиса" in text
+    assert "• <b>Начало:</b> 10.01.2025 09:15" in text
+    assert "<blockquote>Операторы не могут войти</blockquote>" in text
+
+
+def test_png_card_is_rendered_in_memory():
+    pytest.importorskip("PIL")
+    png = render_card_png(issue_card(RAW_ISSUE, "https://jira/browse/FA-4242"))
+    assert png.startswith(b"\x89PNG")
+
+
+@pytest.mark.asyncio
+async def test_get_issue_requests_only_card_fields():
+    seen = {}
+
+    async def get_issue(request):
+        seen["fields"] = request.query.get("fields")
+        return web.json_response(RAW_ISSUE)
+
+    app = web.Application()
+    app.router.add_get("/rest/api/2/issue/FA-4242", get_issue)
+    server = TestServer(app)
+    await server.start_server()
+    config = JiraConfig(JIRA_URL=str(server.make_url("")).rstrip("/"), JIRA_API_TOKEN="t",
+                        JIRA_DEFAULT_PROJECT="FA")
+    try:
+        async with JiraApiClient(config) as client:
+            issue = await client.get_issue("FA-4242", CARD_FIELDS)
+    finally:
+        await server.close()
+
+    assert seen["fields"].split(",") == list(CARD_FIELDS)
+    assert issue.summary == "Недоступен <Naumen>"
+    assert issue.raw_data["fields"]["priority"] == {"name": "High"}
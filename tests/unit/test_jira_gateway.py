@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from common.jira.config import JiraConfig
+from common.jira.exceptions import (
+    JiraConnectionError, JiraRateLimitError, JiraUncertainResultError, JiraValidationError
+)
+from common.jira.gateway import JiraGateway
+
+
+class FakeJira:
+    def __init__(self):
+        self.created = []
+        self.meta_requests = 0
+        self.fail_next = 0
+
+    async def server_info(self, request):
+        return web.json_response({"version": "9.4.0"})
+
+    async def createmeta(self, request):
+        self.meta_requests += 1
+        await asyncio.sleep(0.01)
+        return web.json_response({"projects": [{"key": request.query["projectKeys"]}]})
+
+    async def create(self, request):
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=429)
+        self.created.append(await request.json())
+        key = f"FA-{len(self.created)}"
+        return web.json_response({"id": str(len(self.created)), "key": key, "self": key}, status=201)
+
+    async def search(self, request):
+        label = request.query["jql"].split('labels = "')[1].rstrip('"')
+        issues = [
+            {"id": str(n), "key": f"FA-{n}"}
+            for n, issue in enumerate(self.created, start=1) if label in issue["fields"].get("labels", [])
+        ]
+        return web.json_response({"startAt": 0, "total": len(issues), "issues": issues[:1]})
+
+
+@pytest_asyncio.fixture
+async def jira():
+    fake = FakeJira()
+    app = web.Application()
+    app.router.add_get("/rest/api/2/serverInfo", fake.server_info)
+    app.router.add_get("/rest/api/2/issue/createmeta", fake.createmeta)
+    app.router.add_post("/rest/api/2/issue", fake.create)
+    app.router.add_get("/rest/api/2/search", fake.search)
+    server = TestServer(app)
+    await server.start_server()
+    config = JiraConfig(JIRA_URL=str(server.make_url("")).rstrip("/"), JIRA_API_TOKEN="t",
+                        JIRA_DEFAULT_PROJECT="FA")
+    gateway = JiraGateway(config, pool_limit=2, max_retries=2)
+    yield fake, gateway
+    await gateway.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_calls_share_one_pooled_connection(jira):
+    fake, gateway = jira
+    await gateway.warm_up()
+    for n in range(3):
+        await gateway.create_fa_issue(summary=f"Сбой {n}", description="d",
+                                      problem_level="Замедление работы сервиса",
+                                      time_start_problem="2025-01-10 09:30")
+
+    stats = gateway.metrics()
+    # serverInfo, createmeta для схемы полей (один раз) и три задачи
+    assert stats["requests"] == 5
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 4
+    assert fake.created[0]["fields"]["customfield_13117"] == {"value": "Замедление работы сервиса"}
+    assert fake.created[0]["fields"]["customfield_13119"] == "2025-01-10T09:30:00.000+0300"
+    assert 'jira_gateway_connections_reused_total{name="jira"} 4' in gateway.render_metrics()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_createmeta_misses_make_one_request(jira):
+    fake, gateway = jira
+    results = await asyncio.gather(*[gateway.get_createmeta("FA") for _ in range(5)])
+
+    assert fake.meta_requests == 1
+    assert all(r == {"projects": [{"key": "FA"}]} for r in results)
+
+
+@pytest.mark.asyncio
+async def test_call_retries_rate_limit_but_create_does_not(jira, monkeypatch):
+    fake, gateway = jira
+    monkeypatch.setattr(gateway, "_retry_delay", lambda attempt: 0)
+    fields = {"fields": {"project": {"key": "FA"}, "summary": "s"}}
+
+    fake.fail_next = 1
+    assert (await gateway.call(gateway.client.create_issue, fields))["key"] == "FA-1"
+
+    fake.fail_next = 1
+    with pytest.raises(JiraRateLimitError):
+        await gateway.create_fa_issue(summary="s", description="d")
+    assert len(fake.created) == 1
+
+
+@pytest.mark.asyncio
+async def test_bad_start_time_is_rejected_before_request(jira):
+    fake, gateway = jira
+    with pytest.raises(JiraValidationError):
+        await gateway.create_fa_issue(summary="s", description="d", time_start_problem="вчера")
+    assert fake.created == []
+
+
+@pytest.mark.asyncio
+async def test_retry_finds_issue_created_by_lost_attempt(jira):
+    fake, gateway = jira
+    first = await gateway.create_fa_issue(request_id="r1", summary="s", description="d")
+    assert fake.created[0]["fields"]["labels"] == ["bot-r1"]
+
+    # Ответ на первую попытку потерялся — повтор не создаёт вторую задачу
+    again = await gateway.create_fa_issue(request_id="r1", resume=True, summary="s", description="d")
+    assert again["key"] == first["key"]
+    assert len(fake.created) == 1
+
+    await gateway.create_fa_issue(request_id="r2", resume=True, summary="s", description="d")
+    assert len(fake.created) == 2
+
+
+@pytest.mark.asyncio
+async def test_untagged_create_is_not_retried_after_lost_connection(jira, monkeypatch):
+    fake, gateway = jira
+
+    async def timeout(issue_data):
+        raise JiraConnectionError("Ошибка подключения к JIRA: TimeoutError")
+
+    monkeypatch.setattr(gateway.client, "create_issue", timeout)
+    with pytest.raises(JiraConnectionError) as tagged:
+        await gateway.create_fa_issue(request_id="r1", summary="s", description="d")
+    assert not isinstance(tagged.value, JiraUncertainResultError)
+
+    # Поля labels нет на экране создания: найти задачу при повторе будет нечем
+    monkeypatch.setattr(gateway, "_tag", lambda *args: False)
+    with pytest.raises(JiraUncertainResultError):
+        await gateway.create_fa_issue(request_id="r1", summary="s", description="d")
@@ -0,0 +1,138 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from common.jira.client import JiraApiClient
+from common.jira.config import JiraConfig
+from common.jira.exceptions import JiraValidationError
+from common.jira.gateway import JiraGateway
+from common.jira.metadata import SNAPSHOT_VERSION, load_snapshot, refresh_snapshot, save_snapshot
+
+FA_FIELDS = {
+    "summary": {"name": "Тема", "required": True, "schema": {"type": "string", "system": "summary"},
+                "operations": ["set"], "key": "summary"},
+    "customfield_13117": {"name": "Уровень проблемы", "required": True,
+                          "schema": {"type": "option", "customId": 13117},
+                          "allowedValues": [{"self": "https://jira/rest/api/2/customFieldOption/1",
+                                             "id": "1", "value": "Замедление работы сервиса"}]},
+}
+
+
+class FakeJira:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.createmeta_keys = []
+
+    async def _slow(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+
+    async def projects(self, request):
+        await self._slow()
+        return web.json_response([{"id": "1", "key": "FA", "name": "Failures", "avatarUrls": {}}])
+
+    async def issue_types(self, request):
+        await self._slow()
+        return web.json_response([{"id": "11700", "name": "Failure", "iconUrl": "x"}])
+
+    async def createmeta(self, request):
+        await self._slow()
+        keys = request.query["projectKeys"].split(",")
+        self.createmeta_keys.append(keys)
+        return web.json_response({"projects": [
+            {"key": key, "self": "x", "issuetypes": [{"id": "11700", "name": "Failure", "fields": FA_FIELDS}]}
+            for key in keys
+        ]})
+
+
+@pytest_asyncio.fixture
+async def jira():
+    fake = FakeJira()
+    app = web.Application()
+    app.router.add_get("/rest/api/2/project", fake.projects)
+    app.router.add_get("/rest/api/2/issuetype", fake.issue_types)
+    app.router.add_get("/rest/api/2/issue/createmeta", fake.createmeta)
+    server = TestServer(app)
+    await server.start_server()
+    config = JiraConfig(JIRA_URL=str(server.make_url("")).rstrip("/"), JIRA_API_TOKEN="t",
+                        JIRA_DEFAULT_PROJECT="FA")
+    yield fake, config
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_fetched_concurrently_and_loaded_by_gateway(jira, tmp_path):
+    fake, config = jira
+    path = str(tmp_path / "meta.json")
+    projects = ["FA"] + [f"P{n}" for n in range(6)]
+    async with JiraApiClient(config) as client:
+        snapshot = await refresh_snapshot(client, projects, path)
+
+    # projects, issuetype и две пачки createmeta идут одновременно
+    assert fake.max_in_flight == 4
+    assert sorted(len(keys) for keys in fake.createmeta_keys) == [2, 5]
+    raw = open(path, encoding="utf-8").read()
+    assert "\n" not in raw and "self" not in raw and "avatarUrls" not in raw
+    assert json.loads(raw) == snapshot and snapshot["version"] == SNAPSHOT_VERSION
+
+    gateway = JiraGateway(config)
+    assert gateway.load_snapshot(path)
+    assert gateway.schemas.get("FA", "Failure") is not None
+    await gateway.close()
+
+
+def test_other_snapshot_version_is_ignored(tmp_path):
+    path = tmp_path / "meta.json"
+    path.write_text(json.dumps({"version": SNAPSHOT_VERSION + 1, "createmeta": {"projects": []}}))
+    assert load_snapshot(str(path)) is None
+    assert load_snapshot(str(tmp_path / "missing.json")) is None
+
+
+def test_stale_or_foreign_snapshot_is_ignored(tmp_path):
+    path = str(tmp_path / "meta.json")
+    snapshot = {"version": SNAPSHOT_VERSION, "jira_url": "https://jira.example", "createmeta": {"projects": []},
+                "fetched_at": (datetime.now() - timedelta(days=2)).isoformat(timespec="seconds")}
+    save_snapshot(snapshot, path)
+
+    assert load_snapshot(path, max_age=3 * 24 * 3600, jira_url="https://jira.example/login.jsp") is not None
+    assert load_snapshot(path, max_age=24 * 3600) is None
+    assert load_snapshot(path, max_age=None, jira_url="https://other.example") is None
+
+
+@pytest.mark.asyncio
+async def test_option_missing_from_snapshot_reloads_createmeta_once(jira, tmp_path):
+    fake, config = jira
+    path = str(tmp_path / "meta.json")
+    async with JiraApiClient(config) as client:
+        await refresh_snapshot(client, ["FA"], path)
+    fake.createmeta_keys.clear()
+
+    gateway = JiraGateway(config)
+    assert gateway.load_snapshot(path)
+    aliases = {"summary": "summary", "problem_level": "customfield_13117"}
+
+    def build(schema):
+        return schema.builder("fa", aliases).build(summary="Сбой", problem_level="Полная недоступность")
+
+    # Вариант добавили в JIRA после снимка
+    FA_FIELDS["customfield_13117"]["allowedValues"].append({"id": "2", "value": "Полная недоступность"})
+    try:
+        _, fields = await gateway._checked("FA", "Failure", build)
+        assert fields["customfield_13117"] == {"value": "Полная недоступность"}
+        assert fake.createmeta_keys == [["FA"]]
+
+        # Схема уже сверена с JIRA: ошибка в значении не грузит createmeta снова
+        with pytest.raises(JiraValidationError):
+            await gateway.create_fa_issue(summary="Сбой", problem_level="Нет такого")
+        assert fake.createmeta_keys == [["FA"]]
+    finally:
+        FA_FIELDS["customfield_13117"]["allowedValues"].pop()
+        await gateway.close()
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from common.jira.exceptions import JiraError, JiraValidationError
+from common.jira.outbox import JiraOutbox, is_permanent_error
+
+
+async def wait_for(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("условие не выполнилось")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_backfilled(tmp_path):
+    outbox = JiraOutbox(str(tmp_path / "outbox.db"), base_delay=0.01, poll_interval=0.05)
+    attempts, done = [], []
+
+    async def create(payload):
+        attempts.append(payload["alarm_id"])
+        if len(attempts) < 3:
+            raise RuntimeError("JIRA недоступна")
+        return {"key": "FA-1"}
+
+    async def on_done(payload, result):
+        done.append((payload["alarm_id"], result["key"]))
+
+    outbox.register("fa", create, on_done=on_done)
+    worker = asyncio.create_task(outbox.run())
+    await outbox.enqueue("fa", {"alarm_id": "ab12"})
+    await wait_for(lambda: done)
+    await outbox.stop()
+    worker.cancel()
+
+    assert attempts == ["ab12"] * 3
+    assert done == [("ab12", "FA-1")]
+    assert await outbox.stats() == {"done": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(tmp_path):
+    outbox = JiraOutbox(str(tmp_path / "outbox.db"), concurrency=2, poll_interval=0.05)
+    active, peak, finished = [0], [0], []
+
+    async def create(payload):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        finished.append(payload["n"])
+        return {}
+
+    outbox.register("job", create)
+    for n in range(6):
+        await outbox.enqueue("job", {"n": n})
+    worker = asyncio.create_task(outbox.run())
+    await wait_for(lambda: len(finished) == 6)
+    await outbox.stop()
+    worker.cancel()
+
+    assert peak[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_jobs_survive_restart_and_give_up_after_max_attempts(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    first = JiraOutbox(path)
+    first.register("job", lambda payload: None)
+    await first.enqueue("job", {"n": 1})
+
+    failures = []
+
+    async def broken(payload):
+        raise RuntimeError("400 Bad Request")
+
+    async def on_failed(payload, error):
+        failures.append((payload["n"], error))
+
+    second = JiraOutbox(path, max_attempts=2, base_delay=0.01, poll_interval=0.05)
+    second.register("job", broken, on_failed=on_failed)
+    worker = asyncio.create_task(second.run())
+    await wait_for(lambda: failures)
+    await second.stop()
+    worker.cancel()
+
+    assert failures == [(1, "400 Bad Request")]
+    assert await second.stats() == {"failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_fails_on_first_attempt(tmp_path):
+    outbox = JiraOutbox(str(tmp_path / "outbox.db"), base_delay=0.01, poll_interval=0.05)
+    attempts, failures = [], []
+
+    async def invalid(payload):
+        attempts.append(payload["n"])
+        raise JiraValidationError("Поле customfield_1 обязательно")
+
+    async def forbidden(payload):
+        attempts.append(payload["n"])
+        error = JiraError("Ошибка JIRA: 403")
+        error.status = 403
+        raise error
+
+    async def on_failed(payload, error):
+        failures.append(payload["n"])
+
+    outbox.register("invalid", invalid, on_failed=on_failed)
+    outbox.register("forbidden", forbidden, on_failed=on_failed)
+    worker = asyncio.create_task(outbox.run())
+    await outbox.enqueue("invalid", {"n": 1})
+    await outbox.enqueue("forbidden", {"n": 2})
+    await wait_for(lambda: len(failures) == 2)
+    await outbox.stop()
+    worker.cancel()
+
+    assert sorted(attempts) == [1, 2]
+    assert await outbox.stats() == {"failed": 2}
+
+
+def test_rate_limit_and_outage_are_retried():
+    limited = JiraError("429")
+    limited.status = 429
+    assert not is_permanent_error(limited)
+    assert not is_permanent_error(RuntimeError("JIRA недоступна"))
+
+
+@pytest.mark.asyncio
+async def test_handler_gets_request_id_and_attempt(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    first = JiraOutbox(path)
+    first.register("job", lambda payload: None)
+    await first.enqueue("job", {"n": 1})
+    # Бот остановился посреди попытки: запрос мог дойти до JIRA
+    first._claim(1)
+
+    seen = []
+
+    async def create(payload):
+        seen.append(payload)
+        return {}
+
+    second = JiraOutbox(path, poll_interval=0.05)
+    second.register("job", create)
+    worker = asyncio.create_task(second.run())
+    await wait_for(lambda: seen)
+    await second.stop()
+    worker.cancel()
+
+    assert seen[0]["attempt"] == 2
+    assert len(seen[0]["request_id"]) == 16
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from zoneinfo import ZoneInfo
+
+import utils.jira_sync as jira_sync
+from bot_state import bot_state
+from utils.jira_sync import JiraSyncWorker, build_sync_jql
+
+
+class FakeSearchClient:
+    """Отдаёт задачи страницами, как /rest/api/2/search"""
+
+    def __init__(self, issues, page_size, time_zone="Europe/Moscow"):
+        self.issues = issues
+        self.page_size = page_size
+        self.time_zone = time_zone
+        self.requests = []
+
+    async def get_myself(self):
+        return {"name": "bot", "timeZone": self.time_zone}
+
+    async def iter_search(self, jql, fields=None, page_size=100):
+        start_at = 0
+        while True:
+            self.requests.append((jql, tuple(fields), start_at))
+            page = self.issues[start_at:start_at + self.page_size]
+            for issue in page:
+                yield issue
+            start_at += len(page)
+            if not page or start_at >= len(self.issues):
+                return
+
+
+def issue(key, category, updated="2025-01-01T12:30:00.000+0300"):
+    return {"key": key, "fields": {"summary": "Почта", "status": {"statusCategory": {"key": category}},
+                                   "updated": updated}}
+
+
+@pytest.fixture
+def tracked(monkeypatch):
+    calls = []
+
+    async def no_save():
+        pass
+
+    monkeypatch.setattr(bot_state, "save_state", no_save)
+    monkeypatch.setattr(jira_sync.announcements, "schedule", lambda *args, **kwargs: calls.append(args[2:]))
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+    bot_state.active_alarms["FA-1"] = {
+        "issue": "Почта", "fix_time": datetime(2025, 1, 1, 13), "user_id": 1, "created_at": datetime(2025, 1, 1, 11)
+    }
+    yield calls
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+
+
+def test_build_sync_jql_keeps_overlap():
+    jql = build_sync_jql("FA", datetime(2025, 1, 1, 12, 0))
+    assert jql == 'project = FA AND updated >= "2025/01/01 11:58" ORDER BY updated ASC'
+
+
+def test_build_sync_jql_uses_jira_user_timezone():
+    watermark = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    jql = build_sync_jql("FA", watermark, ZoneInfo("Europe/Moscow"))
+    assert 'updated >= "2025/01/01 11:58"' in jql
+
+
+@pytest.mark.asyncio
+async def test_sync_pages_and_reconciles_only_tracked(tracked, tmp_path):
+    issues = [issue(f"FA-{n}", "indeterminate") for n in range(2, 7)] + [issue("FA-1", "done")]
+    client = FakeSearchClient(issues, page_size=2)
+    state_path = tmp_path / "sync.json"
+    worker = JiraSyncWorker(bot=None, client=client, state_path=str(state_path))
+    worker.watermark = datetime(2025, 1, 1, 12)
+
+    applied = await worker.sync_once()
+
+    assert applied == 1
+    assert "FA-1" in bot_state.closed_alarms
+    assert len(client.requests) == 3
+    assert client.requests[0][1] == tuple(jira_sync.SYNC_FIELDS)
+    assert state_path.exists()
+
+    # Отметка пережила перезапуск воркера
+    restarted = JiraSyncWorker(bot=None, client=client, state_path=str(state_path))
+    assert restarted._load_watermark() == worker.watermark
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_jira_without_tracked_alarms(tracked, tmp_path):
+    bot_state.active_alarms.clear()
+    client = FakeSearchClient([issue("FA-1", "done")], page_size=50)
+    worker = JiraSyncWorker(bot=None, client=client, state_path=str(tmp_path / "sync.json"))
+
+    assert await worker.sync_once() == 0
+    assert client.requests == []
+
+
+def test_sync_worker_talks_to_jira_root_not_login_page(monkeypatch):
+    import utils.jira_jobs as jira_jobs
+
+    monkeypatch.setattr(jira_jobs, "_gateway", None)
+    monkeypatch.setitem(jira_sync.CONFIG, "JIRA", {"LOGIN_URL": " https://jira.example.com/login.jsp ", "TOKEN": "t"})
+    monkeypatch.setitem(jira_sync.CONFIG, "JIRA_SYNC", {"ENABLED": True})
+    worker = jira_sync.create_sync_worker(bot=None)
+    assert worker._client.config.JIRA_URL == "https://jira.example.com"
+    assert jira_jobs.jira_issue_url("FA-1") == "https://jira.example.com/browse/FA-1"
+
+
+@pytest.mark.asyncio
+async def test_watermark_follows_jira_updated_not_bot_clock(tracked, tmp_path):
+    client = FakeSearchClient([
+        issue("FA-1", "indeterminate", "2025-01-01T12:30:00.000+0300"),
+        issue("FA-2", "indeterminate", "2025-01-01T12:45:00.000+0300"),
+    ], page_size=50, time_zone="Asia/Vladivostok")
+    worker = JiraSyncWorker(bot=None, client=client, state_path=str(tmp_path / "sync.json"))
+    worker.watermark = datetime(2025, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=3)))
+
+    await worker.sync_once()
+
+    # 09:00 МСК - 2 мин в поясе пользователя JIRA (UTC+10)
+    assert 'updated >= "2025/01/01 15:58"' in client.requests[0][0]
+    assert worker.watermark == datetime(2025, 1, 1, 12, 45, tzinfo=timezone(timedelta(hours=3)))
@@ -0,0 +1,61 @@
+import pytest
+
+from common.jira.exceptions import JiraTransitionError, JiraValidationError
+from common.jira.models import JiraTransition
+from common.jira.transitions import TransitionResolver
+
+
+def transition(id_, status, category):
+    return JiraTransition.from_raw_data({
+        "id": id_, "name": status, "to": {"name": status, "statusCategory": {"key": category}}
+    })
+
+
+class FakeClient:
+    def __init__(self, transitions):
+        self.transitions = transitions
+        self.calls = []
+        self.reject = set()
+
+    async def get_transitions(self, issue_key):
+        self.calls.append(("GET", issue_key))
+        return self.transitions
+
+    async def transition_issue(self, issue_key, transition_id, refetch=True):
+        self.calls.append(("POST", issue_key, transition_id, refetch))
+        if transition_id in self.reject:
+            raise JiraValidationError("transition is not valid")
+
+
+@pytest.mark.asyncio
+async def test_second_close_is_single_post():
+    client = FakeClient([transition("11", "В работе", "indeterminate"), transition("31", "Решена", "done")])
+    resolver = TransitionResolver(client)
+
+    first = await resolver.transition("FA-1", issue_type="Failure", status="Открыта")
+    assert (first.transition_id, first.to_status, first.cached) == ("31", "Решена", False)
+
+    client.calls.clear()
+    second = await resolver.transition("FA-2", issue_type="Failure", status="открыта")
+    assert second.cached
+    assert client.calls == [("POST", "FA-2", "31", False)]
+
+
+@pytest.mark.asyncio
+async def test_stale_transition_is_relearned():
+    client = FakeClient([transition("41", "Решена", "done")])
+    resolver = TransitionResolver(client)
+    resolver.learn("FA", "Failure", None, [transition("31", "Решена", "done")], "done")
+    client.reject.add("31")
+
+    result = await resolver.transition("FA-3", issue_type="Failure")
+
+    assert result.transition_id == "41"
+    assert resolver.cached("FA", "Failure", None, "done") == ("41", "Решена")
+
+
+@pytest.mark.asyncio
+async def test_missing_target_raises():
+    resolver = TransitionResolver(FakeClient([transition("11", "В работе", "indeterminate")]))
+    with pytest.raises(JiraTransitionError):
+        await resolver.transition("FA-4", target="Закрыта")
@@ -0,0 +1,125 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+import utils.jira_sync as jira_sync
+from bot_state import bot_state
+from utils.jira_sync import parse_jira_time
+from utils.jira_webhook import JiraWebhookServer
+
+SECRET = "s3cret"
+
+
+def issue_payload(key, category, summary, updated, timestamp=None):
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": timestamp,
+        "issue": {
+            "key": key,
+            "fields": {
+                "summary": summary,
+                "status": {"statusCategory": {"key": category}},
+                "updated": updated,
+            },
+        },
+    }
+
+
+def signed(payload):
+    body = json.dumps(payload).encode()
+    signature = "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return body, {"X-Hub-Signature": signature, "Content-Type": "application/json"}
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+
+    async def no_save():
+        pass
+
+    monkeypatch.setattr(bot_state, "save_state", no_save)
+    monkeypatch.setattr(jira_sync.announcements, "schedule", lambda *args, **kwargs: calls.append(args[2:]))
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+    bot_state.active_alarms["FA-1"] = {
+        "issue": "Почта", "fix_time": datetime(2025, 1, 1, 12), "user_id": 1, "created_at": datetime(2025, 1, 1, 11)
+    }
+    yield calls
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+
+
+@pytest_asyncio.fixture
+async def client():
+    server = JiraWebhookServer(bot=None, secret=SECRET)
+    async with TestClient(TestServer(server.app)) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_unsigned_request_is_rejected(client, scheduled):
+    response = await client.post("/jira/webhook", json=issue_payload("FA-1", "done", "Почта", None))
+    assert response.status == 401
+    assert "FA-1" in bot_state.active_alarms
+
+
+@pytest.mark.asyncio
+async def test_resolve_reopen_and_stale_events(client, scheduled):
+    body, headers = signed(issue_payload("FA-1", "done", "Почта", "2025-01-01T12:10:00.000+0300"))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "resolved"
+    assert "FA-1" in bot_state.closed_alarms
+
+    # Повтор той же доставки и устаревшее событие ничего не меняют
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "unchanged"
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта", "2025-01-01T12:05:00.000+0300"))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "unchanged"
+
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта и VPN", "2025-01-01T12:20:00.000+0300"))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "reopened"
+    assert bot_state.active_alarms["FA-1"]["issue"] == "Почта и VPN"
+    assert [call[0] for call in scheduled] == ["FA-1", "FA-1"]
+    assert scheduled[-1][2] == "reopened"
+
+
+def test_jira_time_keeps_milliseconds_and_offset():
+    moscow = parse_jira_time("2025-01-01T12:00:00.500+0300")
+    utc = parse_jira_time("2025-01-01T09:00:00.000+0000")
+    assert moscow.microsecond == 500000
+    assert utc < moscow
+    assert parse_jira_time("2025-01-01T12:00:00+03:00") == parse_jira_time("2025-01-01T12:00:00.000+0300")
+
+
+@pytest.mark.asyncio
+async def test_same_updated_time_uses_webhook_timestamp(client, scheduled):
+    updated = "2025-01-01T12:10:00.000+0300"
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта", updated, timestamp=1000))
+    await client.post("/jira/webhook", data=body, headers=headers)
+
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта и VPN", updated, timestamp=2000))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "summary"
+
+    # Более раннее событие с тем же updated пришло последним — не откатывает описание
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта", updated, timestamp=1500))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "unchanged"
+    assert bot_state.active_alarms["FA-1"]["issue"] == "Почта и VPN"
+
+
+@pytest.mark.asyncio
+async def test_change_in_same_second_is_not_dropped(client, scheduled):
+    body, headers = signed(issue_payload("FA-1", "indeterminate", "Почта", "2025-01-01T12:10:00.100+0300"))
+    await client.post("/jira/webhook", data=body, headers=headers)
+    body, headers = signed(issue_payload("FA-1", "done", "Почта", "2025-01-01T12:10:00.900+0300"))
+    response = await client.post("/jira/webhook", data=body, headers=headers)
+    assert (await response.json())["status"] == "resolved"
@@ -0,0 +1,80 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import handlers.manage_handlers as manage_handlers
+from bot_state import bot_state
+from utils.jira_jobs import rename_alarm
+
+
+class FakeState:
+    def __init__(self, **data):
+        self.data = data
+        self.cleared = False
+
+    async def get_data(self):
+        return dict(self.data)
+
+    async def clear(self):
+        self.cleared = True
+
+
+class FakeMessage:
+    def __init__(self):
+        self.texts = []
+
+    async def edit_text(self, text, **kwargs):
+        self.texts.append(text)
+
+    async def answer(self, text, **kwargs):
+        self.texts.append(text)
+
+
+def stop_call():
+    async def answer(*args, **kwargs):
+        pass
+
+    return SimpleNamespace(data="action_stop", from_user=SimpleNamespace(id=1), message=FakeMessage(),
+                           bot=None, answer=answer)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+
+    async def no_save():
+        pass
+
+    monkeypatch.setattr(bot_state, "save_state", no_save)
+    monkeypatch.setattr(manage_handlers.announcements, "schedule", lambda *args, **kwargs: calls.append(args[2]))
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+    yield calls
+    bot_state.active_alarms.clear()
+    bot_state.closed_alarms.clear()
+    bot_state.alarm_aliases.clear()
+
+
+@pytest.mark.asyncio
+async def test_stop_of_already_closed_alarm_answers_not_found(scheduled):
+    call, state = stop_call(), FakeState(data_type="alarm", item_id="ab12")
+
+    await manage_handlers.handle_action_callback(call, state)
+
+    assert call.message.texts[0] == "❌ Сбой не найден"
+    assert state.cleared
+    assert scheduled == []
+
+
+@pytest.mark.asyncio
+async def test_stop_finds_alarm_renamed_to_jira_key(scheduled):
+    bot_state.active_alarms["ab12"] = {"issue": "Почта", "fix_time": datetime(2025, 1, 1, 12), "user_id": 1,
+                                       "jira_pending": True}
+    rename_alarm("ab12", "FA-7")
+    call, state = stop_call(), FakeState(data_type="alarm", item_id="ab12")
+
+    await manage_handlers.handle_action_callback(call, state)
+
+    assert "FA-7" in bot_state.closed_alarms
+    assert scheduled == ["FA-7"]
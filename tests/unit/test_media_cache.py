@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile
+
+from utils.media_cache import MediaFileCache, answer_photo_cached, media_key
+
+
+class FakeMessage:
+    def __init__(self, reject_file_ids=False):
+        self.sent = []
+        self.uploads = 0
+        self.reject_file_ids = reject_file_ids
+
+    async def answer_photo(self, photo, **kwargs):
+        self.sent.append(photo)
+        if isinstance(photo, BufferedInputFile):
+            self.uploads += 1
+            return SimpleNamespace(photo=[SimpleNamespace(file_id="small"),
+                                          SimpleNamespace(file_id=f"big-{self.uploads}")])
+        if self.reject_file_ids:
+            raise TelegramBadRequest(method=None, message="wrong file identifier")
+        return SimpleNamespace(photo=[SimpleNamespace(file_id=photo)])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MediaFileCache(str(tmp_path / "media.db"))
+
+
+@pytest.mark.asyncio
+async def test_repeat_send_reuses_file_id(cache):
+    message = FakeMessage()
+    await answer_photo_cached(message, b"png-bytes", "a.png", cache=cache, caption="x")
+    await answer_photo_cached(message, b"png-bytes", "a.png", cache=cache, caption="x")
+    await answer_photo_cached(message, b"other", "b.png", cache=cache)
+    assert message.uploads == 2
+    assert message.sent[1] == "big-1"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_uploaded_again(cache):
+    message = FakeMessage()
+    await answer_photo_cached(message, b"png-bytes", "a.png", cache=cache)
+    cache.ttl = -1
+    await answer_photo_cached(message, b"png-bytes", "a.png", cache=cache)
+    assert message.uploads == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_file_id_is_forgotten(cache):
+    message = FakeMessage(reject_file_ids=True)
+    await cache.put(media_key(b"png-bytes"), "stale")
+    sent = await answer_photo_cached(message, b"png-bytes", "a.png", cache=cache)
+    assert sent.photo[-1].file_id == "big-1"
+    assert await cache.get(media_key(b"png-bytes")) == "big-1"
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "media.db")
+    MediaFileCache(path)._put("photo:abc", "file-1")
+    assert MediaFileCache(path)._get("photo:abc") == "file-1"
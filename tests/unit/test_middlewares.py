@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from aiogram.types import CallbackQuery, User
+
+from utils.middlewares import UserSerialMiddleware
+
+
+def callback(user_id, data, query_id="1"):
+    return CallbackQuery(id=query_id, from_user=User(id=user_id, is_bot=False, first_name="U"),
+                         chat_instance="c", data=data)
+
+
+@pytest.mark.asyncio
+async def test_double_tap_runs_handler_once():
+    middleware = UserSerialMiddleware()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.data)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    results = await asyncio.gather(
+        middleware(handler, callback(1, "confirm_send", "1"), {}),
+        middleware(handler, callback(1, "confirm_send", "2"), {}),
+    )
+
+    assert calls == ["confirm_send"]
+    assert results.count("ok") == 1 and results.count(None) == 1
+
+
+@pytest.mark.asyncio
+async def test_same_user_serialized_other_users_parallel():
+    middleware = UserSerialMiddleware()
+    running = {}
+    overlap = []
+
+    async def handler(event, data):
+        user = event.from_user.id
+        running[user] = running.get(user, 0) + 1
+        overlap.append(dict(running))
+        await asyncio.sleep(0.01)
+        running[user] -= 1
+
+    await asyncio.gather(
+        middleware(handler, callback(1, "a"), {}),
+        middleware(handler, callback(1, "b"), {}),
+        middleware(handler, callback(2, "a"), {}),
+    )
+
+    assert all(counts.get(1, 0) <= 1 for counts in overlap)
+    assert any(counts.get(1) == 1 and counts.get(2) == 1 for counts in overlap)
+
+
+@pytest.mark.asyncio
+async def test_queue_cap_drops_excess_updates():
+    middleware = UserSerialMiddleware(max_pending=2)
+    release = asyncio.Event()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.data)
+        await release.wait()
+
+    tasks = [asyncio.create_task(middleware(handler, callback(1, str(n)), {})) for n in range(4)]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert calls == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_quick_page_taps_pass_once_finished():
+    middleware = UserSerialMiddleware()
+    calls = []
+
+    async def handler(event, data):
+        calls.append(event.data)
+        return "ok"
+
+    for query_id in ("1", "2", "3"):
+        assert await middleware(handler, callback(1, "page_next", query_id), {}) == "ok"
+    # «Отправить» после выполнения остаётся заблокированной на duplicate_window
+    assert await middleware(handler, callback(1, "confirm_send", "4"), {}) == "ok"
+    assert await middleware(handler, callback(1, "confirm_send", "5"), {}) is None
+
+    assert calls == ["page_next"] * 3 + ["confirm_send"]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.image_encoding import EncodedImage
+from utils.prerender import PreRenderer, Render, in_working_hours
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.calls = 0
+        self.content = b"v1"
+
+    async def render(self, url):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return EncodedImage(self.content, "jpeg")
+
+
+@pytest.mark.asyncio
+async def test_unchanged_page_keeps_render_and_bumps_check_time():
+    browser = FakeBrowser()
+    prerenderer = PreRenderer([" https://wiki/cal "], render=browser.render)
+    first = await prerenderer.refresh("https://wiki/cal")
+    first.checked_at -= timedelta(minutes=5)
+    again = await prerenderer.refresh("https://wiki/cal")
+    assert again is first
+    assert again.age() == "только что"
+
+    browser.content = b"v2"
+    changed = await prerenderer.refresh("https://wiki/cal")
+    assert changed is not first
+    assert prerenderer.latest("https://wiki/cal").image.data == b"v2"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_render():
+    browser = FakeBrowser()
+    prerenderer = PreRenderer(["https://wiki/cal"], render=browser.render)
+    renders = await asyncio.gather(*(prerenderer.refresh("https://wiki/cal") for _ in range(4)))
+    assert browser.calls == 1
+    assert all(render is renders[0] for render in renders)
+
+
+@pytest.mark.asyncio
+async def test_failed_render_keeps_previous_snapshot():
+    browser = FakeBrowser()
+    prerenderer = PreRenderer(["https://wiki/cal"], render=browser.render)
+    first = await prerenderer.refresh("https://wiki/cal")
+
+    async def broken(url):
+        return None
+
+    prerenderer._render = broken
+    assert await prerenderer.refresh("https://wiki/cal") is first
+
+
+def test_working_hours_and_age():
+    monday_morning = datetime(2026, 10, 19, 9, 30)
+    assert in_working_hours(monday_morning)
+    assert not in_working_hours(monday_morning.replace(hour=22))
+    assert not in_working_hours(monday_morning + timedelta(days=5))
+
+    render = Render("u", EncodedImage(b"", "jpeg"), "d", checked_at=monday_morning, changed_at=monday_morning)
+    assert render.age(monday_morning + timedelta(minutes=7)) == "7 мин назад"
+    assert render.age(monday_morning + timedelta(minutes=130)) == "2 ч 10 мин назад"
+    assert render.caption(monday_morning + timedelta(hours=1)) == "🕒 Снимок от 09:30 (1 ч назад)"
@@ -0,0 +1,64 @@
+import pytest
+
+import utils.screenshot_worker as screenshot_worker
+from infrastructure.selenium.screenshot_service import PlaywrightBackend, SeleniumBackend, SiteLogin
+
+
+def site(name, base_url):
+    return SiteLogin(name, base_url, f"{base_url}/login.action", "bot", "secret",
+                     "#user", "#password", "#submit", selector="#main")
+
+
+def test_playwright_picks_site_by_url_prefix():
+    backend = PlaywrightBackend(
+        [site("confluence", "https://wiki.example.com"), site("jira", "https://jira.example.com")],
+        default_url=" https://wiki.example.com/calendar ", state_dir="/tmp/state"
+    )
+    assert backend.site_for("https://jira.example.com/browse/FA-1").name == "jira"
+    assert backend.site_for("https://other.example.com/page").name == "confluence"
+    assert backend.default_url == "https://wiki.example.com/calendar"
+    assert backend._state_path(backend.sites[1]) == "/tmp/state/jira.json"
+
+
+@pytest.mark.asyncio
+async def test_selenium_backend_delegates_to_runner():
+    calls = []
+
+    async def run(target, *args, timeout=None):
+        calls.append((target, args, timeout))
+        return b"png"
+
+    backend = SeleniumBackend(run)
+    await backend.start()
+    assert await backend.capture("https://jira.example.com/browse/FA-1", timeout=5) == b"png"
+    assert calls == [
+        ("selenium_utils:prelaunch_browser", (), None),
+        ("selenium_utils:capture_page_png", ("https://jira.example.com/browse/FA-1",), 5),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_backend_is_chosen_from_config(monkeypatch):
+    monkeypatch.setattr(screenshot_worker, "_backend", None)
+    monkeypatch.setattr(screenshot_worker, "_playwright_installed", lambda: True)
+    monkeypatch.setitem(screenshot_worker.CONFIG, "SCREENSHOT", {"BACKEND": "playwright", "PAGES": 2})
+    monkeypatch.setitem(screenshot_worker.CONFIG, "CONFLUENCE", {
+        "LOGIN_URL": "https://wiki.example.com/login.action", "TARGET_URL": "https://wiki.example.com/cal"
+    })
+    monkeypatch.setitem(screenshot_worker.CONFIG, "JIRA", {"LOGIN_URL": "https://jira.example.com/login.jsp"})
+    backend = screenshot_worker.get_screenshot_backend()
+    assert isinstance(backend, PlaywrightBackend)
+    assert [(s.name, s.base_url) for s in backend.sites] == [
+        ("confluence", "https://wiki.example.com"), ("jira", "https://jira.example.com")
+    ]
+    await screenshot_worker.close_screenshot_backend()
+    assert screenshot_worker._backend is None
+
+
+def test_playwright_backend_without_package_explains_how_to_install(monkeypatch):
+    monkeypatch.setattr(screenshot_worker, "_backend", None)
+    monkeypatch.setattr(screenshot_worker, "_playwright_installed", lambda: False)
+    monkeypatch.setitem(screenshot_worker.CONFIG, "SCREENSHOT", {"BACKEND": "playwright"})
+    with pytest.raises(RuntimeError, match="requirements-playwright.txt"):
+        screenshot_worker.get_screenshot_backend()
+    assert screenshot_worker._backend is None
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import time
+
+import pytest
+import pytest_asyncio
+
+from utils.screenshot_worker import ScreenshotWorkerError, ScreenshotWorkerPool
+
+MODULE = __name__
+
+
+def echo(value):
+    return value
+
+
+def hang(seconds):
+    time.sleep(seconds)
+    return "late"
+
+
+def crash():
+    os._exit(3)
+
+
+def fail():
+    raise ValueError("нет такой страницы")
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = ScreenshotWorkerPool(workers=1)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_child_process(pool):
+    assert await pool.submit(f"{MODULE}:echo", b"png", timeout=30) == b"png"
+    pid = await pool.submit("os:getpid", timeout=30)
+    assert pid != os.getpid()
+    with pytest.raises(ScreenshotWorkerError, match="ValueError"):
+        await pool.submit(f"{MODULE}:fail", timeout=30)
+
+
+@pytest.mark.asyncio
+async def test_deadline_kills_worker_and_next_job_runs(pool):
+    first_pid = await pool.submit("os:getpid", timeout=30)
+    with pytest.raises(asyncio.TimeoutError):
+        await pool.submit(f"{MODULE}:hang", 60, timeout=0.5)
+    assert await pool.submit("os:getpid", timeout=30) != first_pid
+    assert pool.stats()["timed_out"] == 1
+    assert pool.restarts == 1
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted(pool):
+    with pytest.raises(ScreenshotWorkerError, match="упал"):
+        await pool.submit(f"{MODULE}:crash", timeout=30)
+    assert await pool.submit(f"{MODULE}:echo", 1, timeout=30) == 1
+    assert pool.restarts == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_job_is_skipped(pool):
+    running = asyncio.create_task(pool.submit(f"{MODULE}:hang", 0.5, timeout=30))
+    await asyncio.sleep(0.1)
+    queued = asyncio.create_task(pool.submit(f"{MODULE}:echo", 2, timeout=30))
+    await asyncio.sleep(0.1)
+    queued.cancel()
+    assert await running == "late"
+    assert await pool.submit(f"{MODULE}:echo", 3, timeout=30) == 3
+    assert pool.stats()["cancelled"] == 1
+    assert pool.restarts == 0
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from aiogram.types import BotCommand
+
+import utils.startup as startup
+from utils.startup import StartupOrchestrator, StartupStep, commands_hash
+
+
+@pytest.mark.asyncio
+async def test_steps_in_stage_run_concurrently():
+    orchestrator = StartupOrchestrator()
+
+    async def slow():
+        await asyncio.sleep(0.2)
+
+    orchestrator.add_stage("init", [StartupStep("a", slow), StartupStep("b", slow), StartupStep("c", slow)])
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await orchestrator.run()
+
+    assert loop.time() - start < 0.5
+    assert orchestrator.ready.is_set()
+
+
+@pytest.mark.asyncio
+async def test_optional_step_failure_does_not_block_readiness():
+    orchestrator = StartupOrchestrator()
+
+    async def broken():
+        raise RuntimeError("jira down")
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    orchestrator.add_stage("init", [
+        StartupStep("warmup", broken),
+        StartupStep("browser", hangs, timeout=0.05),
+    ])
+    await orchestrator.run()
+
+    assert orchestrator.ready.is_set()
+    assert sorted(orchestrator.failed_steps) == ["browser", "warmup"]
+
+
+@pytest.mark.asyncio
+async def test_critical_step_failure_aborts_startup():
+    orchestrator = StartupOrchestrator()
+
+    async def broken():
+        raise RuntimeError("state corrupted")
+
+    orchestrator.add_stage("init", [StartupStep("state", broken, critical=True)])
+    with pytest.raises(RuntimeError):
+        await orchestrator.run()
+    assert not orchestrator.ready.is_set()
+
+
+@pytest.mark.asyncio
+async def test_readiness_waits_for_warmup_within_its_timeout():
+    orchestrator = StartupOrchestrator()
+    warmed = asyncio.Event()
+
+    async def warmup():
+        await asyncio.sleep(0.05)
+        warmed.set()
+
+    orchestrator.add_stage("init", [StartupStep("jira", warmup, timeout=1, background=True)])
+    await orchestrator.start()
+
+    assert orchestrator.ready.is_set()
+    assert warmed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_slow_warmup_continues_after_readiness():
+    orchestrator = StartupOrchestrator()
+    warmed = asyncio.Event()
+
+    async def quick():
+        pass
+
+    async def warmup():
+        await asyncio.sleep(0.2)
+        warmed.set()
+
+    orchestrator.add_stage("init", [
+        StartupStep("state", quick),
+        StartupStep("browser", warmup, timeout=0.05, background=True),
+    ])
+    task = await orchestrator.start()
+
+    assert orchestrator.ready.is_set()
+    assert not warmed.is_set()
+    await task
+    assert warmed.is_set()
+    assert orchestrator.failed_steps == []
+
+
+@pytest.mark.asyncio
+async def test_start_raises_critical_failure():
+    orchestrator = StartupOrchestrator()
+
+    async def broken():
+        raise RuntimeError("state corrupted")
+
+    async def warmup():
+        await asyncio.sleep(10)
+
+    orchestrator.add_stage("init", [
+        StartupStep("state", broken, critical=True),
+        StartupStep("browser", warmup, background=True),
+    ])
+    with pytest.raises(RuntimeError):
+        await orchestrator.start()
+    assert not orchestrator.ready.is_set()
+
+
+@pytest.mark.asyncio
+async def test_register_commands_skipped_when_hash_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr(startup, "COMMANDS_HASH_FILE", str(tmp_path / "commands.sha256"))
+    commands = [BotCommand(command="start", description="Запустить бота")]
+
+    class FakeBot:
+        calls = 0
+
+        async def set_my_commands(self, commands):
+            FakeBot.calls += 1
+
+    bot = FakeBot()
+    await startup.register_commands(bot, commands)
+    await startup.register_commands(bot, commands)
+    assert FakeBot.calls == 1
+
+    changed = commands + [BotCommand(command="help", description="Помощь")]
+    assert commands_hash(changed) != commands_hash(commands)
+    await startup.register_commands(bot, changed)
+    assert FakeBot.calls == 2
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from bot_state import BotState
+from config import CONFIG
+from utils.debounce import KeyedDebouncer
+from utils.status_board import StatusBoard, render_board
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.edited = []
+        self.pinned = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append(text)
+        return SimpleNamespace(message_id=100 + len(self.sent))
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.edited.append((message_id, text))
+
+    async def pin_chat_message(self, chat_id, message_id, **kwargs):
+        self.pinned.append(message_id)
+
+
+@pytest.fixture
+def state(monkeypatch):
+    monkeypatch.setitem(CONFIG["TELEGRAM"], "ALARM_CHANNEL_ID", "-100500")
+    state = BotState()
+
+    async def no_save():
+        pass
+
+    monkeypatch.setattr(state, "save_state", no_save)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_debouncer_coalesces_burst_into_last_action():
+    debouncer = KeyedDebouncer(0.05)
+    calls = []
+    for i in range(5):
+        debouncer.schedule("k", lambda i=i: asyncio.sleep(0, result=calls.append(i)))
+    await asyncio.sleep(0.1)
+    assert calls == [4]
+
+
+@pytest.mark.asyncio
+async def test_burst_of_changes_gives_one_publish_then_one_edit(state):
+    bot = FakeBot()
+    board = StatusBoard(state, debounce=0.05)
+    board.start(bot)
+    await asyncio.sleep(0.1)
+    assert len(bot.sent) == 1 and bot.pinned == [101]
+
+    for i in range(10):
+        state.active_alarms[f"FA-{i}"] = {"issue": "Проблема", "fix_time": datetime(2025, 1, 1, 12), "user_id": 1}
+        state.touch()
+    await asyncio.sleep(0.1)
+
+    assert len(bot.edited) == 1
+    assert "FA-9" in bot.edited[0][1]
+    assert state.status_board == {"chat_id": "-100500", "message_id": 101}
+
+    # Повторное обновление без изменений не трогает Telegram
+    await board.refresh()
+    assert len(bot.edited) == 1
+    board.stop()
+
+
+def test_render_board_handles_string_times(state):
+    state.active_alarms["FA-1"] = {"issue": "Почта", "fix_time": "2025-01-01T12:30:00", "user_id": 1}
+    assert "01.01.2025 12:30" in render_board(state)
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.user_cache import UserNameCache
+
+
+def tg_user(user_id, username=None, first_name=None, last_name=None):
+    return SimpleNamespace(id=user_id, username=username, first_name=first_name, last_name=last_name, is_bot=False)
+
+
+class SlowBot:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(user=tg_user(user_id, username=f"user{user_id}"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced():
+    bot = SlowBot()
+    cache = UserNameCache()
+    names = await asyncio.gather(*(cache.resolve(7, bot) for _ in range(5)))
+    assert names == ["@user7"] * 5
+    assert bot.calls == 1
+    assert await cache.resolve(7, bot) == "@user7"
+    assert bot.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_display_prefetches_in_background_and_bumps_version():
+    bot = SlowBot()
+    cache = UserNameCache()
+    cache.attach(bot)
+    version = cache.version
+    assert cache.display(3) == "[ID:3]"
+    await asyncio.sleep(0.1)
+    assert cache.display(3) == "@user3"
+    assert cache.version > version
+
+
+def test_remember_size_bound_and_ttl():
+    cache = UserNameCache(ttl=60, max_size=2)
+    cache.remember(tg_user(1, first_name="Иван", last_name="Петров"))
+    cache.remember(tg_user(2, username="anna"))
+    cache.remember(tg_user(3, username="oleg"))
+    assert cache.peek(1) is None
+    assert cache.peek(2) == "@anna"
+
+    expired = UserNameCache(ttl=-1)
+    expired.remember(tg_user(1, username="anna"))
+    assert expired.peek(1) is None
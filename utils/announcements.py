@@ -0,0 +1,148 @@
+"""
+Объявления о сбоях и работах в каналах.
+
+Исходное сообщение в канале сбоев правится при продлении и завершении,
+а в теме SCM появляется ответ на исходное сообщение. Несколько изменений
+одного события за короткое окно применяются одним обновлением.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from bot_state import safe_parse_time
+from config import CONFIG
+from utils.debounce import KeyedDebouncer
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = "%d.%m.%Y %H:%M"
+DEFAULT_DEBOUNCE = 2.0
+
+# Статусы события
+ACTIVE = "active"
+EXTENDED = "extended"
+RESOLVED = "resolved"
+# Изменения из JIRA: задача переоткрыта или изменено описание
+REOPENED = "reopened"
+UPDATED = "updated"
+
+
+def _fmt(value) -> str:
+    parsed = safe_parse_time(value)
+    return parsed.strftime(DATETIME_FORMAT) if parsed else "неизвестно"
+
+
+def alarm_channel_text(alarm: Dict[str, Any], status: str = ACTIVE) -> str:
+    """Текст объявления о сбое для канала"""
+    service = alarm.get("service")
+    service_line = f"• <b>Сервис:</b> {service}\n" if service else ""
+    if status == RESOLVED:
+        return (
+            f"✅ <b>Сбой завершён</b>\n"
+            f"• <b>Проблема:</b> {alarm['issue']}\n"
+            f"{service_line}"
+            f"• <i>Спасибо за ваше терпение и понимание!</i>"
+        )
+    extended_line = "• <b>Время восстановления продлено</b>\n" if status == EXTENDED else ""
+    return (
+        f"🚨 <b>Технический сбой</b>\n"
+        f"• <b>Проблема:</b> {alarm['issue']}\n"
+        f"{service_line}"
+        f"• <b>Исправим до:</b> {_fmt(alarm.get('fix_time'))}\n"
+        f"{extended_line}"
+        f"• <i>Мы уже работаем над устранением сбоя. Спасибо за ваше терпение и понимание!</i>"
+    )
+
+
+def alarm_thread_text(alarm: Dict[str, Any], status: str) -> Optional[str]:
+    """Короткий ответ в теме SCM; None — отвечать в теме не о чем"""
+    if status == RESOLVED:
+        return "✅ <b>Сбой завершён</b>"
+    if status == EXTENDED:
+        return f"🔄 <b>Сбой продлён</b>\n• <b>Новое время окончания:</b> {_fmt(alarm.get('fix_time'))}"
+    if status == REOPENED:
+        return f"🔁 <b>Сбой возобновлён</b>\n• <b>Исправим до:</b> {_fmt(alarm.get('fix_time'))}"
+    if status == UPDATED:
+        return f"✏️ <b>Описание сбоя изменено</b>\n• <b>Проблема:</b> {alarm['issue']}"
+    return None
+
+
+def maintenance_channel_text(work: Dict[str, Any], status: str = ACTIVE) -> str:
+    """Текст объявления о регламентных работах для канала"""
+    if status == RESOLVED:
+        return (
+            f"✅ <b>Работа завершена</b>\n"
+            f"• <b>Описание:</b> {work['description']}"
+        )
+    extended_line = "• <b>Работы продлены</b>\n" if status == EXTENDED else ""
+    return (
+        f"🔧 <b>Проводим плановые технические работы – станет ещё лучше!</b>\n"
+        f"• <b>Описание:</b> {work['description']}\n"
+        f"• <b>Начало:</b> {_fmt(work.get('start_time'))}\n"
+        f"• <b>Конец:</b> {_fmt(work.get('end_time'))}\n"
+        f"{extended_line}"
+        f"• <b>Недоступно:</b> {work.get('unavailable_services', 'не указано')}\n"
+        f"• <i>Спасибо за понимание! Эти изменения – важный шаг к тому, чтобы сервис стал ещё удобнее и надёжнее для вас 💙</i>\n"
+        f"• <i>Если возникнут вопросы – наша поддержка всегда на связи</i>\n"
+        f"• <i>С заботой, Ваша команда Петрович-ТЕХ</i>"
+    )
+
+
+class AnnouncementUpdater:
+    """Применяет изменения событий к уже опубликованным объявлениям."""
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE):
+        self._debouncer = KeyedDebouncer(debounce)
+
+    def schedule(self, bot: Bot, kind: str, item_id: str, item: Dict[str, Any], status: str,
+                 reply_in_thread: bool = True):
+        """
+        Планирует обновление объявления. kind — "alarm" или "maintenance".
+        Берётся снимок события: после завершения оно уже удалено из состояния.
+        reply_in_thread=False — только правка канала, без ответа в теме SCM.
+        """
+        snapshot = dict(item)
+        self._debouncer.schedule(
+            (kind, item_id), lambda: self._apply(bot, kind, item_id, snapshot, status, reply_in_thread)
+        )
+        logger.debug(f"Обновление объявления {kind} {item_id} запланировано: {status}")
+
+    async def flush(self):
+        await self._debouncer.flush()
+
+    async def _apply(self, bot: Bot, kind: str, item_id: str, item: Dict[str, Any], status: str,
+                     reply_in_thread: bool = True):
+        if kind == "alarm":
+            text = alarm_channel_text(item, status)
+        else:
+            text = maintenance_channel_text(item, status)
+        await self._update_channel(bot, item_id, item.get("channel_message_id"), text)
+
+        thread_text = alarm_thread_text(item, status) if kind == "alarm" and reply_in_thread else None
+        if thread_text and item.get("scm_chat_id") and item.get("scm_thread_id"):
+            await bot.send_message(
+                chat_id=item["scm_chat_id"],
+                message_thread_id=item["scm_thread_id"],
+                reply_to_message_id=item.get("scm_message_id"),
+                text=thread_text,
+                parse_mode="HTML"
+            )
+        logger.info(f"📣 Объявление {item_id} обновлено: {status}")
+
+    async def _update_channel(self, bot: Bot, item_id: str, message_id, text: str):
+        chat_id = CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"]
+        if message_id:
+            try:
+                await bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, parse_mode="HTML")
+                return
+            except TelegramBadRequest as e:
+                if "message is not modified" in str(e):
+                    return
+                logger.warning(f"⚠️ Не удалось отредактировать объявление {item_id}: {e}")
+        # Объявления без сохранённого id (созданные до обновления) публикуются заново
+        await bot.send_message(chat_id, text, parse_mode="HTML")
+
+
+announcements = AnnouncementUpdater(CONFIG.get("ANNOUNCEMENTS", {}).get("DEBOUNCE", DEFAULT_DEBOUNCE))
@@ -1,9 +1,14 @@
-import requests
+import asyncio
 import json
 import sys
 from config import CONFIG
 from datetime import datetime
-from urllib.parse import urljoin
+
+from common.jira.config import jira_base_url
+from common.jira.exceptions import JiraError, JiraValidationError
+from common.jira.fa_fields import build_failure_fields
+from common.jira.gateway import JiraGateway
+
 
 def check_config():
     """
@@ -49,89 +54,45 @@ def create_failure_issue(summary, description, problem_level=None, problem_servi
     Returns:
         dict: Информация о созданной задаче или None в случае ошибки
     """
+    values = dict(
+        summary=summary,
+        description=description,
+        problem_level=problem_level,
+        problem_service=problem_service,
+        naumen_failure_type=naumen_failure_type,
+        stream_1c=stream_1c,
+        time_start_problem=time_start_problem,
+        influence=influence
+    )
     try:
-        # Настройка сессии
-        session = requests.Session()
-        session.headers.update({
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {CONFIG["JIRA"]["TOKEN"]}'
-        })
-        
-        # Базовый URL для API
-        base_url = urljoin(CONFIG["JIRA"]["LOGIN_URL"].strip(), '/rest/api/2/')
-        
-        # Подготовка данных для создания задачи
-        issue_data = {
-            "fields": {
-                "project": {
-                    "key": "FA"
-                },
-                "summary": summary,
-                "description": description,
-                "issuetype": {
-                    "name": "Failure"
-                }
-            }
-        }
-        
-        # Добавление опциональных полей
-        if problem_level:
-            issue_data["fields"]["customfield_13117"] = {"value": problem_level}
-        if problem_service:
-            issue_data["fields"]["customfield_13937"] = {"value": problem_service}
-        if naumen_failure_type:
-            issue_data["fields"]["customfield_14074"] = {"value": naumen_failure_type}
-        if stream_1c:
-            issue_data["fields"]["customfield_17317"] = {"value": stream_1c}
-        if time_start_problem:
-            # Преобразование времени в формат ISO 8601 с часовым поясом
-            try:
-                dt = datetime.strptime(time_start_problem, "%Y-%m-%d %H:%M")
-                # Добавляем часовой пояс UTC+3 (Москва)
-                issue_data["fields"]["customfield_13119"] = dt.strftime("%Y-%m-%dT%H:%M:00.000+0300")
-            except ValueError:
-                print("Ошибка: Неверный формат времени")
-                return None
-        if influence:
-            issue_data["fields"]["customfield_17107"] = {"value": influence}
-        
-        # Вывод данных для отладки
-        print("\nОтправляемые данные:")
-        print(json.dumps(issue_data, ensure_ascii=False, indent=2))
-        
-        # Создание задачи
-        print("\nСоздание задачи...")
-        response = session.post(
-            urljoin(base_url, 'issue'),
-            json=issue_data
+        fields = build_failure_fields(**values)
+    except JiraValidationError as e:
+        print(f"Ошибка: {e}")
+        return None
+
+    # Вывод данных для отладки
+    print("\nОтправляемые данные:")
+    print(json.dumps({"fields": fields}, ensure_ascii=False, indent=2))
+
+    async def create():
+        gateway = JiraGateway.from_settings(
+            CONFIG["JIRA"]["LOGIN_URL"], CONFIG["JIRA"]["TOKEN"],
+            request_timeout=CONFIG["JIRA"].get("REQUEST_TIMEOUT", 15)
         )
-        response.raise_for_status()
-        
-        created_issue = response.json()
-        print(f"\nЗадача успешно создана: {created_issue['key']}")
-        print(f"URL: {CONFIG['JIRA']['LOGIN_URL']}/browse/{created_issue['key']}")
-        
-        return created_issue
-        
-    except requests.exceptions.RequestException as e:
+        async with gateway:
+            return await gateway.create_fa_issue(**values)
+
+    print("\nСоздание задачи...")
+    try:
+        created_issue = asyncio.run(create())
+    except JiraError as e:
         print(f"Ошибка при создании задачи: {str(e)}")
-        if e.response is not None:
-            if e.response.status_code == 401:
-                print("\nОшибка аутентификации. Проверьте правильность API токена")
-            elif e.response.status_code == 403:
-                print("\nОшибка доступа. Проверьте права доступа к проекту")
-            elif e.response.status_code == 400:
-                print("\nОшибка в данных задачи. Проверьте правильность заполнения полей")
-                try:
-                    error_details = e.response.json()
-                    print("\nДетали ошибки:")
-                    print(json.dumps(error_details, ensure_ascii=False, indent=2))
-                except:
-                    print("\nТекст ответа:")
-                    print(e.response.text)
         return None
 
+    print(f"\nЗадача успешно создана: {created_issue['key']}")
+    print(f"URL: {jira_base_url(CONFIG['JIRA']['LOGIN_URL'])}/browse/{created_issue['key']}")
+    return created_issue
+
 def get_input_with_options(prompt, options, allow_empty=False):
     """
     Получение ввода с выбором из списка опций
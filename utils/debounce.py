@@ -0,0 +1,59 @@
+"""
+Отложенное выполнение действий с объединением повторных вызовов по ключу.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+Action = Callable[[], Awaitable]
+
+
+class KeyedDebouncer:
+    """
+    Все вызовы schedule() с одним ключом в течение delay секунд схлопываются
+    в одно выполнение последнего переданного действия.
+    Действия с одним ключом никогда не выполняются параллельно.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self._actions: Dict[Hashable, Action] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def schedule(self, key: Hashable, action: Action):
+        """Планирует действие; если по ключу уже есть ожидающее — заменяет его."""
+        self._actions[key] = action
+        task = self._pending.get(key)
+        if task and not task.done():
+            return
+        self._pending[key] = asyncio.get_running_loop().create_task(self._run_later(key))
+
+    def is_pending(self, key: Hashable) -> bool:
+        task = self._pending.get(key)
+        return bool(task and not task.done())
+
+    async def _run_later(self, key: Hashable):
+        await asyncio.sleep(self.delay)
+        await self._run(key)
+
+    async def _run(self, key: Hashable):
+        # Изменения, пришедшие во время выполнения, запланируют новый запуск
+        self._pending.pop(key, None)
+        action = self._actions.pop(key, None)
+        if action is None:
+            return
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            try:
+                await action()
+            except Exception as e:
+                logger.error(f"❌ Ошибка отложенного действия {key}: {e}", exc_info=True)
+
+    async def flush(self):
+        """Немедленно выполняет все ожидающие действия (например, при остановке бота)."""
+        for key, task in list(self._pending.items()):
+            task.cancel()
+            await self._run(key)
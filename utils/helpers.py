@@ -44,13 +44,9 @@ def parse_duration(duration_str: str) -> Optional[timedelta]:
 
 
 async def get_user_name(user_id: int, bot: Bot) -> str:
-    try:
-        user = await bot.get_chat_member(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], user_id)
-        if user.user.username:
-            return f"@{user.user.username}"
-        return f"[ID:{user_id}]"
-    except Exception:
-        return f"[ID:{user_id}]"
+    # Имя берётся из кэша; к API обращаемся только за неизвестными пользователями
+    from utils.user_cache import user_cache
+    return await user_cache.resolve(user_id, bot)
 
 
 def is_admin(user_id: int) -> bool:
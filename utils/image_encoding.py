@@ -0,0 +1,68 @@
+"""
+Перекодирование скриншотов в WebP/JPEG с ограничением размера.
+
+Скриншот высокой страницы в PNG весит мегабайты; для отправки в Telegram
+он пережимается в памяти: сначала снижается качество, затем — ширина,
+пока картинка не уложится в бюджет.
+"""
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMAT = "jpeg"
+DEFAULT_MAX_BYTES = 1_000_000
+DEFAULT_MAX_WIDTH = 1600
+QUALITY_STEPS = (85, 75, 65, 55, 45)
+DOWNSCALE = 0.8
+MIN_WIDTH = 480
+
+EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "png": "png"}
+
+
+@dataclass
+class EncodedImage:
+    data: bytes
+    format: str
+    width: int = 0
+    height: int = 0
+
+    def filename(self, stem: str) -> str:
+        return f"{stem}.{EXTENSIONS.get(self.format, self.format)}"
+
+
+def encode_within_budget(png: bytes, fmt: Optional[str] = None, max_bytes: Optional[int] = None,
+                         max_width: Optional[int] = None) -> EncodedImage:
+    """
+    PNG → WebP/JPEG не больше max_bytes (если это достижимо без ширины меньше MIN_WIDTH).
+    Без Pillow возвращается исходный PNG.
+    """
+    settings = CONFIG.get("SCREENSHOT", {})
+    fmt = (fmt or settings.get("FORMAT", DEFAULT_FORMAT)).lower()
+    max_bytes = max_bytes or settings.get("MAX_BYTES", DEFAULT_MAX_BYTES)
+    max_width = max_width or settings.get("MAX_WIDTH", DEFAULT_MAX_WIDTH)
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning("⚠️ Pillow не установлен — скриншот отправляется в PNG без сжатия")
+        return EncodedImage(png, "png")
+
+    image = Image.open(io.BytesIO(png)).convert("RGB")
+    if image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+
+    while True:
+        for quality in QUALITY_STEPS:
+            buffer = io.BytesIO()
+            image.save(buffer, format=fmt.upper(), quality=quality, optimize=True)
+            if buffer.tell() <= max_bytes:
+                return EncodedImage(buffer.getvalue(), fmt, image.width, image.height)
+        width = int(image.width * DOWNSCALE)
+        if width < MIN_WIDTH:
+            logger.warning(f"⚠️ Скриншот не уложился в {max_bytes} байт: {buffer.tell()} байт")
+            return EncodedImage(buffer.getvalue(), fmt, image.width, image.height)
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
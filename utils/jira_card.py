@@ -0,0 +1,209 @@
+"""
+Карточка задачи JIRA без браузера.
+
+Задача читается через REST только с нужными полями (fields=...) и показывается
+HTML-сообщением или картинкой, нарисованной Pillow. Это десятки миллисекунд
+вместо входа в JIRA и скриншота страницы; браузер остаётся запасным путём.
+"""
+import html
+import io
+import logging
+import re
+import textwrap
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from common.jira.fa_fields import FA_OPTION_FIELDS, FA_TIME_START_FIELD
+from config import CONFIG
+from utils.jira_jobs import get_gateway
+
+logger = logging.getLogger(__name__)
+
+ISSUE_KEY_RE = re.compile(r"(?:/browse/|selectedIssue=)([A-Z][A-Z0-9_]+-\d+)")
+
+# Дополнительные поля карточки: id поля → подпись
+EXTRA_FIELDS = {
+    FA_OPTION_FIELDS["problem_level"]: "Уровень",
+    FA_OPTION_FIELDS["problem_service"]: "Сервис",
+    FA_OPTION_FIELDS["influence"]: "Влияние",
+    FA_TIME_START_FIELD: "Начало",
+}
+CARD_FIELDS = (
+    "summary", "status", "priority", "issuetype", "assignee", "reporter",
+    "created", "updated", "description", *EXTRA_FIELDS,
+)
+DESCRIPTION_LIMIT = 600
+
+# Вид карточки: image — картинка, html — сообщение, browser — старый скриншот
+CARD_IMAGE, CARD_HTML, CARD_BROWSER = "image", "html", "browser"
+
+# Цвета категорий статуса JIRA
+STATUS_COLORS = {"new": "#42526E", "indeterminate": "#0052CC", "done": "#00875A"}
+CARD_WIDTH = 900
+PADDING = 32
+
+
+@dataclass
+class IssueCard:
+    key: str
+    url: str
+    summary: str
+    status: str
+    status_category: str = ""
+    issue_type: str = ""
+    priority: str = ""
+    assignee: str = ""
+    reporter: str = ""
+    created: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    description: str = ""
+    extra: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def card_mode() -> str:
+    return CONFIG.get("JIRA", {}).get("ISSUE_CARD", CARD_IMAGE)
+
+
+def parse_issue_key(url: str) -> Optional[str]:
+    """Ключ задачи из ссылки вида .../browse/FA-123 или ...?selectedIssue=FA-123"""
+    match = ISSUE_KEY_RE.search(url)
+    return match.group(1) if match else None
+
+
+def _name(value) -> str:
+    if isinstance(value, dict):
+        return value.get("displayName") or value.get("value") or value.get("name") or ""
+    return str(value) if value else ""
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        return None
+
+
+def _format_time(value: Optional[datetime]) -> str:
+    return value.strftime("%d.%m.%Y %H:%M") if value else "—"
+
+
+def issue_card(raw: dict, url: str) -> IssueCard:
+    """Карточка из ответа GET /issue/{key}"""
+    fields = raw.get("fields", {})
+    status = fields.get("status") or {}
+    description = (fields.get("description") or "").strip()
+    if len(description) > DESCRIPTION_LIMIT:
+        description = description[:DESCRIPTION_LIMIT].rstrip() + "…"
+    extra = []
+    for field_id, label in EXTRA_FIELDS.items():
+        value = fields.get(field_id)
+        if field_id == FA_TIME_START_FIELD:
+            value = _format_time(_parse_time(value)) if value else ""
+        if _name(value):
+            extra.append((label, _name(value)))
+    return IssueCard(
+        key=raw["key"],
+        url=url,
+        summary=fields.get("summary", ""),
+        status=status.get("name", ""),
+        status_category=(status.get("statusCategory") or {}).get("key", ""),
+        issue_type=_name(fields.get("issuetype")),
+        priority=_name(fields.get("priority")),
+        assignee=_name(fields.get("assignee")),
+        reporter=_name(fields.get("reporter")),
+        created=_parse_time(fields.get("created")),
+        updated=_parse_time(fields.get("updated")),
+        description=description,
+        extra=extra,
+    )
+
+
+def render_card_html(card: IssueCard) -> str:
+    """Карточка как HTML-сообщение Telegram"""
+    e = html.escape
+    lines = [
+        f"<b><a href='{e(card.url, quote=True)}'>{e(card.key)}</a></b> · {e(card.issue_type)}",
+        f"<b>{e(card.summary)}</b>",
+        "",
+        f"• <b>Статус:</b> {e(card.status)}",
+    ]
+    if card.priority:
+        lines.append(f"• <b>Приоритет:</b> {e(card.priority)}")
+    lines.append(f"• <b>Исполнитель:</b> {e(card.assignee or 'не назначен')}")
+    if card.reporter:
+        lines.append(f"• <b>Автор:</b> {e(card.reporter)}")
+    lines += [f"• <b>{e(label)}:</b> {e(value)}" for label, value in card.extra]
+    lines.append(f"• <b>Создана:</b> {_format_time(card.created)}, <b>обновлена:</b> {_format_time(card.updated)}")
+    if card.description:
+        lines += ["", f"<blockquote>{e(card.description)}</blockquote>"]
+    return "\n".join(lines)
+
+
+def load_font(size: int, bold: bool = False):
+    """Шрифт карточек из JIRA.CARD_FONT (нужен шрифт с кириллицей)"""
+    from PIL import ImageFont
+    settings = CONFIG.get("JIRA", {})
+    path = settings.get("CARD_FONT_BOLD" if bold else "CARD_FONT",
+                        "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf")
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        # Шрифт по умолчанию может не содержать кириллицы — задайте JIRA.CARD_FONT
+        return ImageFont.load_default()
+
+
+def render_card_png(card: IssueCard) -> bytes:
+    """Карточка как PNG (Pillow импортируется только здесь)"""
+    from PIL import Image, ImageDraw
+
+    title_font, text_font, small_font = load_font(30, bold=True), load_font(22), load_font(18)
+    title = textwrap.wrap(card.summary, 60) or [""]
+    rows = [("Статус", card.status), ("Приоритет", card.priority),
+            ("Исполнитель", card.assignee or "не назначен"), ("Автор", card.reporter),
+            *card.extra,
+            ("Создана", _format_time(card.created)), ("Обновлена", _format_time(card.updated))]
+    rows = [(label, value) for label, value in rows if value]
+    description = []
+    for paragraph in card.description.splitlines():
+        description += textwrap.wrap(paragraph, 75) or [""]
+
+    height = PADDING * 2 + 36 + len(title) * 40 + 16 + len(rows) * 32
+    if description:
+        height += 20 + len(description) * 26
+    image = Image.new("RGB", (CARD_WIDTH, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 8, height), fill=STATUS_COLORS.get(card.status_category, "#6B778C"))
+
+    y = PADDING
+    draw.text((PADDING, y), f"{card.key} · {card.issue_type}", font=small_font, fill="#6B778C")
+    y += 36
+    for line in title:
+        draw.text((PADDING, y), line, font=title_font, fill="#172B4D")
+        y += 40
+    y += 16
+    for label, value in rows:
+        draw.text((PADDING, y), label, font=text_font, fill="#6B778C")
+        draw.text((PADDING + 200, y), value, font=text_font, fill="#172B4D")
+        y += 32
+    if description:
+        y += 20
+        for line in description:
+            draw.text((PADDING, y), line, font=small_font, fill="#42526E")
+            y += 26
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+async def fetch_issue_card(url: str) -> Optional[IssueCard]:
+    """Карточка задачи по ссылке; None, если в ссылке нет ключа или JIRA не настроена"""
+    key = parse_issue_key(url)
+    gateway = get_gateway()
+    if key is None or gateway is None:
+        return None
+    issue = await gateway.call(gateway.client.get_issue, key, CARD_FIELDS)
+    return issue_card(issue.raw_data, url)
@@ -0,0 +1,251 @@
+"""
+Задания очереди JIRA для бота дежурных.
+
+Сбой регистрируется с временным id сразу, а задача FA создаётся в фоне.
+Когда JIRA отвечает, настоящий ключ подставляется в состояние бота,
+в тему SCM и в сообщение пользователю. Остановка сбоя решает его задачу FA.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+
+from bot_state import bot_state
+from common.jira.config import jira_base_url
+from common.jira.fa_fields import FA_ISSUE_TYPE
+from common.jira.metadata import DEFAULT_MAX_AGE, DEFAULT_SNAPSHOT_PATH
+from common.jira.outbox import JiraOutbox
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+FA_ISSUE = "fa_issue"
+FA_RESOLVE = "fa_resolve"
+FA_ATTACH_SCREENSHOT = "fa_attach_screenshot"
+DEFAULT_DB_PATH = "data/jira_outbox.db"
+
+_outbox: Optional[JiraOutbox] = None
+_gateway = None
+
+
+def get_outbox() -> Optional[JiraOutbox]:
+    """Очередь JIRA, созданная при запуске бота (None, если не настроена)"""
+    return _outbox
+
+
+def jira_issue_url(key: str) -> str:
+    return f"{jira_base_url(CONFIG.get('JIRA', {}).get('LOGIN_URL', 'https://jira.petrovich.tech'))}/browse/{key}"
+
+
+def scm_alarm_text(alarm_id: str, data: Dict[str, Any], jira_key: Optional[str] = None) -> str:
+    """Текст сообщения о сбое в теме SCM"""
+    if jira_key:
+        jira_line = f"• <b>Задача в Jira:</b> <a href='{jira_issue_url(jira_key)}'>{jira_key}</a>\n"
+    else:
+        jira_line = f"• <b>Задача в Jira:</b> ⏳ создаётся (временный ID <code>{alarm_id}</code>)\n"
+    return (
+        f"🚨 <b>Технический сбой</b>\n"
+        f"{jira_line}"
+        f"• <b>Сервис:</b> {data['service']}\n"
+        f"• <b>Проблема:</b> {data['title']}\n"
+        f"• <b>Описание:</b> {data['description']}\n"
+        f"• <i>Ссылка в Ктолк: https://petrovich.ktalk.ru/emergencyteam  </i>\n"
+    )
+
+
+def jira_api_config(project: str = "FA"):
+    """JiraConfig асинхронного клиента из CONFIG["JIRA"]; None, если JIRA не настроена"""
+    gateway = get_gateway()
+    if gateway is None:
+        return None
+    return gateway.config.model_copy(update={"JIRA_DEFAULT_PROJECT": project})
+
+
+def get_gateway():
+    """Шлюз JIRA бота дежурных; None, если JIRA не настроена. Сессия открывается при первом запросе."""
+    global _gateway
+    if _gateway is None:
+        jira = CONFIG.get("JIRA", {})
+        if not jira.get("LOGIN_URL") or not jira.get("TOKEN"):
+            return None
+        from common.jira.gateway import JiraGateway
+        _gateway = JiraGateway.from_settings(
+            jira["LOGIN_URL"], jira["TOKEN"],
+            request_timeout=jira.get("REQUEST_TIMEOUT", 15),
+            pool_limit=jira.get("POOL_LIMIT", 10)
+        )
+        _gateway.load_snapshot(
+            jira.get("METADATA_SNAPSHOT", DEFAULT_SNAPSHOT_PATH),
+            max_age=jira.get("METADATA_MAX_AGE", DEFAULT_MAX_AGE)
+        )
+    return _gateway
+
+
+async def _started_gateway():
+    gateway = get_gateway()
+    if gateway is None:
+        raise RuntimeError("JIRA не настроена (JIRA.LOGIN_URL/TOKEN)")
+    return await gateway.start()
+
+
+async def get_api_client():
+    """Общий асинхронный клиент JIRA на сессии шлюза"""
+    return (await _started_gateway()).client
+
+
+async def get_transition_resolver():
+    """Кэш переходов шлюза JIRA"""
+    return (await _started_gateway()).transitions
+
+
+async def close_api_client():
+    global _gateway
+    if _gateway is not None:
+        await _gateway.close()
+    _gateway = None
+
+
+async def create_fa_issue(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Создаёт задачу FA через шлюз JIRA; повтор сначала ищет задачу, созданную прошлой попыткой"""
+    gateway = await _started_gateway()
+    response = await gateway.create_fa_issue(
+        request_id=payload.get("request_id"),
+        resume=payload.get("attempt", 1) > 1,
+        summary=payload["title"],
+        description=payload["description"],
+        problem_level=payload.get("problem_level"),
+        problem_service=payload.get("service"),
+        time_start_problem=payload.get("time_start_problem"),
+        influence=payload.get("influence")
+    )
+    return {"key": response["key"]}
+
+
+async def resolve_fa_issue(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Решает задачу FA: при известном переходе — один POST без повторного чтения задачи"""
+    resolver = await get_transition_resolver()
+    result = await resolver.transition(
+        payload["key"],
+        target=CONFIG.get("JIRA", {}).get("RESOLVE_STATUS", "done"),
+        issue_type=FA_ISSUE_TYPE,
+        status=payload.get("status")
+    )
+    return {"key": payload["key"], "status": result.to_status, "cached": result.cached}
+
+
+async def enqueue_fa_resolve(alarm_id: str, alarm: Optional[Dict[str, Any]]):
+    """Ставит решение задачи FA в очередь, если у сбоя уже есть ключ JIRA"""
+    if _outbox is None or not alarm or alarm.get("jira_pending") or not alarm_id.startswith("FA-"):
+        return
+    await _outbox.enqueue(FA_RESOLVE, {"key": alarm_id, "status": alarm.get("jira_status")})
+
+
+async def attach_calendar_screenshot(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Снимает календарь работ и прикладывает PNG к задаче FA прямо из памяти"""
+    from utils.screenshot_worker import render_confluence_png
+    png = await render_confluence_png()
+    if not png:
+        raise RuntimeError("Не удалось снять календарь работ")
+    client = await get_api_client()
+    attachments = await client.add_attachment(payload["key"], f"calendar_{payload['key']}.png", png)
+    return {"key": payload["key"], "attachments": [a.get("id") for a in attachments]}
+
+
+def attach_screenshot_enabled() -> bool:
+    return bool(CONFIG.get("JIRA", {}).get("ATTACH_CALENDAR_SCREENSHOT"))
+
+
+def rename_alarm(old_id: str, new_id: str) -> Optional[Dict[str, Any]]:
+    """Переносит сбой и связанные состояния пользователей на новый id"""
+    for alarms in (bot_state.active_alarms, bot_state.closed_alarms):
+        if old_id in alarms:
+            break
+    else:
+        return None
+    alarm = alarms.pop(old_id)
+    alarm["jira_pending"] = False
+    alarms[new_id] = alarm
+    bot_state.add_alarm_alias(old_id, new_id)
+    for user_state in bot_state.user_states.values():
+        if user_state.get("alarm_id") == old_id:
+            user_state["alarm_id"] = new_id
+    bot_state.touch()
+    return alarm
+
+
+def setup_outbox(bot: Bot) -> JiraOutbox:
+    """Создаёт очередь JIRA бота дежурных и регистрирует обработчики"""
+    global _outbox
+    settings = CONFIG.get("JIRA_OUTBOX", {})
+    outbox = JiraOutbox(
+        settings.get("DB_PATH", DEFAULT_DB_PATH),
+        concurrency=settings.get("CONCURRENCY", 2),
+        max_attempts=settings.get("MAX_ATTEMPTS", 8)
+    )
+
+    async def on_fa_created(payload: Dict[str, Any], result: Dict[str, Any]):
+        temp_id, key = payload["alarm_id"], result["key"]
+        alarm = rename_alarm(temp_id, key)
+        if alarm is not None:
+            await bot_state.save_state()
+            scm = alarm
+            if key in bot_state.closed_alarms:
+                # Сбой остановили, пока задача создавалась
+                await enqueue_fa_resolve(key, alarm)
+        else:
+            # Сбой уже завершён — обновляем только сообщения
+            scm = payload
+        logger.info(f"🔗 Сбой {temp_id} получил ключ JIRA {key}")
+
+        if scm.get("scm_chat_id") and scm.get("scm_message_id"):
+            try:
+                await bot.edit_message_text(
+                    scm_alarm_text(temp_id, payload, key),
+                    chat_id=scm["scm_chat_id"],
+                    message_id=scm["scm_message_id"],
+                    parse_mode="HTML"
+                )
+                await bot.edit_forum_topic(
+                    chat_id=scm["scm_chat_id"],
+                    message_thread_id=scm["scm_thread_id"],
+                    name=f"🔥{key} {payload['title'][:20]}..."
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось обновить тему SCM для {key}: {e}")
+
+        if payload.get("chat_id") and payload.get("message_id"):
+            try:
+                await bot.edit_message_text(
+                    f"✅ Сбой зарегистрирован! ID: <code>{key}</code>\n"
+                    f"🔗 <a href='{jira_issue_url(key)}'>Задача в Jira</a>",
+                    chat_id=payload["chat_id"],
+                    message_id=payload["message_id"],
+                    parse_mode="HTML"
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось обновить сообщение автору сбоя {key}: {e}")
+
+        if attach_screenshot_enabled():
+            # Скриншот снимается в фоне: сообщения выше его не ждут
+            await outbox.enqueue(FA_ATTACH_SCREENSHOT, {"key": key})
+
+    async def on_fa_failed(payload: Dict[str, Any], error: str):
+        if payload.get("chat_id"):
+            await bot.send_message(
+                payload["chat_id"],
+                f"❌ Не удалось создать задачу в Jira для сбоя <code>{payload['alarm_id']}</code>: {error}\n"
+                f"Сбой остаётся зарегистрированным под временным ID.",
+                parse_mode="HTML"
+            )
+
+    async def on_fa_resolved(payload: Dict[str, Any], result: Dict[str, Any]):
+        alarm = bot_state.closed_alarms.get(payload["key"])
+        if alarm is not None:
+            alarm["jira_status"] = result.get("status")
+            await bot_state.save_state()
+
+    outbox.register(FA_ISSUE, create_fa_issue, on_done=on_fa_created, on_failed=on_fa_failed)
+    outbox.register(FA_RESOLVE, resolve_fa_issue, on_done=on_fa_resolved)
+    outbox.register(FA_ATTACH_SCREENSHOT, attach_calendar_screenshot)
+    _outbox = outbox
+    return outbox
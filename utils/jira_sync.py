@@ -0,0 +1,310 @@
+"""
+Применение изменений задач FA из JIRA к состоянию бота.
+
+Используется приёмником вебхуков JIRA и фоновой синхронизацией по JQL
+(для установок, где вебхуки настроить нельзя): решение задачи завершает сбой,
+переоткрытие возвращает его в активные, смена summary обновляет описание.
+Изменения одной задачи применяются по очереди, устаревшие и повторные — пропускаются.
+"""
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from aiogram import Bot
+
+from bot_state import bot_state, safe_parse_time
+from config import CONFIG
+from utils.announcements import announcements, REOPENED, RESOLVED, UPDATED
+from utils.jira_jobs import get_gateway
+
+logger = logging.getLogger(__name__)
+
+# Категория статуса JIRA, означающая, что задача решена
+DONE_CATEGORY = "done"
+
+
+@dataclass
+class IssueUpdate:
+    """Снимок задачи FA, нужный боту"""
+    key: str
+    summary: Optional[str]
+    resolved: bool
+    updated: Optional[datetime]
+    status: Optional[str] = None
+    # timestamp вебхука (мс) — различает события с одинаковым updated
+    event_ts: Optional[int] = None
+
+    @classmethod
+    def from_issue(cls, issue: Dict[str, Any], event_ts: Optional[int] = None) -> "IssueUpdate":
+        """Собирает снимок из задачи в формате REST API (issue.fields...)"""
+        fields = issue.get("fields") or {}
+        status = fields.get("status") or {}
+        category = (status.get("statusCategory") or {}).get("key")
+        resolved = category == DONE_CATEGORY or bool(fields.get("resolution"))
+        return cls(
+            key=issue["key"],
+            summary=fields.get("summary"),
+            resolved=resolved,
+            updated=parse_jira_time(fields.get("updated")),
+            status=status.get("name"),
+            event_ts=event_ts
+        )
+
+
+JIRA_TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z")
+
+
+def _aware(value: datetime) -> datetime:
+    """Время без пояса (старые записи состояния) считается местным"""
+    return value if value.tzinfo else value.astimezone()
+
+
+def parse_jira_time(value) -> Optional[datetime]:
+    """Разбирает время JIRA вида 2025-01-01T12:00:00.000+0300 в datetime с поясом и миллисекундами"""
+    if not value:
+        return None
+    for fmt in JIRA_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    try:
+        return _aware(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        logger.warning(f"⚠️ Не удалось разобрать время JIRA: {value}")
+        return None
+
+
+_issue_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _lock_for(key: str) -> asyncio.Lock:
+    lock = _issue_locks.get(key)
+    if lock is None:
+        lock = _issue_locks[key] = asyncio.Lock()
+    return lock
+
+
+def _is_stale(alarm: Dict[str, Any], update: IssueUpdate) -> bool:
+    """
+    Изменение старше уже применённого — устарело. При равном updated
+    новее то, у которого больше timestamp вебхука; без него это повтор.
+    """
+    if update.updated is None:
+        return False
+    last = safe_parse_time(alarm.get("jira_updated"))
+    if last is None:
+        return False
+    updated, last = _aware(update.updated), _aware(last)
+    if updated != last:
+        return updated < last
+    last_ts = alarm.get("jira_event_ts")
+    return update.event_ts is None or last_ts is None or update.event_ts <= last_ts
+
+
+async def apply_issue_update(bot: Bot, update: IssueUpdate) -> Optional[str]:
+    """
+    Применяет изменение задачи к состоянию бота.
+    Возвращает описание сделанного ("resolved", "reopened", "summary") или None.
+    """
+    async with _lock_for(update.key):
+        active = bot_state.active_alarms.get(update.key)
+        closed = bot_state.closed_alarms.get(update.key)
+        alarm = active or closed
+        if alarm is None:
+            return None
+        if _is_stale(alarm, update):
+            logger.debug(f"Изменение {update.key} от {update.updated} уже применено")
+            return None
+        if update.updated:
+            alarm["jira_updated"] = update.updated.isoformat()
+        if update.event_ts is not None:
+            alarm["jira_event_ts"] = update.event_ts
+        if update.status:
+            # Текущий статус нужен кэшу переходов, чтобы закрыть задачу одним запросом
+            alarm["jira_status"] = update.status
+
+        action = None
+        if active and update.resolved:
+            bot_state.close_alarm(update.key)
+            action = "resolved"
+        elif closed and not update.resolved:
+            bot_state.reopen_alarm(update.key)
+            action = "reopened"
+
+        if update.summary and update.summary != alarm.get("issue"):
+            alarm["issue"] = update.summary
+            action = action or "summary"
+
+        if action is None:
+            return None
+
+        bot_state.touch()
+        now_closed = update.key in bot_state.closed_alarms
+        if now_closed:
+            status = RESOLVED
+        else:
+            status = REOPENED if action == "reopened" else UPDATED
+        # Новое описание завершённого сбоя правит только канал: тема SCM уже получила «завершён»
+        announcements.schedule(bot, "alarm", update.key, alarm, status,
+                               reply_in_thread=not (now_closed and action == "summary"))
+        await bot_state.save_state()
+        logger.info(f"🔄 Сбой {update.key} синхронизирован с JIRA: {action}")
+        return action
+
+
+# Поля, которых достаточно для IssueUpdate: остальное JIRA не присылает
+SYNC_FIELDS = ["summary", "status", "resolution", "updated"]
+DEFAULT_SYNC_STATE = "data/jira_sync.json"
+# Запас по времени: JQL сравнивает с точностью до минуты, а часы JIRA и бота могут расходиться
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+
+def build_sync_jql(project: str, watermark: datetime, tz: Optional[tzinfo] = None) -> str:
+    """
+    JQL для задач проекта, изменённых после отметки (с запасом WATERMARK_OVERLAP).
+    JIRA читает время в JQL в поясе пользователя API — tz; в нём и записывается отметка.
+    """
+    since = watermark - WATERMARK_OVERLAP
+    if tz is not None:
+        since = _aware(since).astimezone(tz)
+    return f'project = {project} AND updated >= "{since:%Y/%m/%d %H:%M}" ORDER BY updated ASC'
+
+
+class JiraSyncWorker:
+    """
+    Периодически запрашивает у JIRA задачи FA, изменённые с прошлого цикла.
+    Цикл — это несколько запросов поиска с проекцией полей, сколько бы задач ни было в проекте.
+    Отметка — наибольшее updated из ответа JIRA, так что часы бота на неё не влияют;
+    она хранится на диске и переживает перезапуск.
+    """
+
+    def __init__(self, bot: Bot, client, project: str = "FA", interval: float = 60.0,
+                 page_size: int = 100, state_path: str = DEFAULT_SYNC_STATE, timezone: Optional[str] = None):
+        self._bot = bot
+        self._client = client
+        self._project = project
+        # Пояс для JQL: из настроек, иначе из профиля пользователя API (/myself)
+        self._timezone = timezone
+        self._tz: Optional[tzinfo] = None
+        self.interval = interval
+        self.page_size = page_size
+        self._state_path = state_path
+        self.watermark: Optional[datetime] = None
+        self._stopping = asyncio.Event()
+
+    def _load_watermark(self) -> Optional[datetime]:
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                return safe_parse_time(json.load(f).get("watermark"))
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            logger.warning(f"⚠️ Не удалось прочитать отметку синхронизации JIRA: {e}")
+            return None
+
+    def _save_watermark(self, watermark: datetime):
+        directory = os.path.dirname(self._state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self._state_path, "w", encoding="utf-8") as f:
+            json.dump({"watermark": watermark.isoformat()}, f)
+
+    async def _jql_timezone(self) -> tzinfo:
+        if self._tz is None:
+            name = self._timezone
+            if not name:
+                try:
+                    name = (await self._client.get_myself()).get("timeZone")
+                except Exception as e:
+                    logger.warning(f"⚠️ Не удалось узнать часовой пояс пользователя JIRA: {e}")
+                    return datetime.now().astimezone().tzinfo
+            try:
+                self._tz = ZoneInfo(name) if name else datetime.now().astimezone().tzinfo
+            except (ZoneInfoNotFoundError, ValueError):
+                logger.warning(f"⚠️ Неизвестный часовой пояс JIRA «{name}», время в JQL — по часам бота")
+                self._tz = datetime.now().astimezone().tzinfo
+            logger.info(f"🕒 Время в JQL синхронизации — в поясе {self._tz}")
+        return self._tz
+
+    def _tracked_keys(self) -> List[str]:
+        prefix = f"{self._project}-"
+        keys = list(bot_state.active_alarms) + list(bot_state.closed_alarms)
+        return [key for key in keys if key.startswith(prefix)]
+
+    async def sync_once(self) -> int:
+        """Один цикл синхронизации. Возвращает число применённых изменений."""
+        started = datetime.now().astimezone()
+        if self.watermark is None:
+            self.watermark = await asyncio.to_thread(self._load_watermark) or started
+
+        applied = 0
+        # Без сбоев с задачами FA сверять нечего — JIRA не дёргаем
+        if not self._tracked_keys():
+            watermark = started
+        else:
+            watermark = _aware(self.watermark)
+            jql = build_sync_jql(self._project, watermark, await self._jql_timezone())
+            async for issue in self._client.iter_search(jql, fields=SYNC_FIELDS, page_size=self.page_size):
+                update = IssueUpdate.from_issue(issue)
+                if update.updated is not None:
+                    watermark = max(watermark, _aware(update.updated))
+                key = issue.get("key")
+                if key not in bot_state.active_alarms and key not in bot_state.closed_alarms:
+                    continue
+                if await apply_issue_update(self._bot, update):
+                    applied += 1
+
+        # Отметку сдвигаем только после полностью прочитанной выборки
+        self.watermark = watermark
+        await asyncio.to_thread(self._save_watermark, watermark)
+        return applied
+
+    async def run(self):
+        """Цикл синхронизации до вызова stop()"""
+        logger.info(f"🔁 Синхронизация с JIRA по JQL запущена (каждые {self.interval:.0f} с)")
+        # Клиент на сессии шлюза: соединения с JIRA переиспользуются между циклами
+        async with self._client:
+            while not self._stopping.is_set():
+                delay = self.interval
+                try:
+                    applied = await self.sync_once()
+                    if applied:
+                        logger.info(f"🔁 Синхронизация с JIRA: применено изменений — {applied}")
+                except Exception as e:
+                    retry_after = getattr(e, "retry_after", None)
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                    logger.warning(f"⚠️ Синхронизация с JIRA не удалась: {e}")
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+
+
+def create_sync_worker(bot: Bot) -> Optional[JiraSyncWorker]:
+    """Создаёт воркер по CONFIG["JIRA_SYNC"]; None — если синхронизация выключена"""
+    settings = CONFIG.get("JIRA_SYNC", {})
+    if not settings.get("ENABLED"):
+        return None
+    gateway = get_gateway()
+    if gateway is None:
+        logger.error("❌ Не заданы JIRA.LOGIN_URL/TOKEN — синхронизация с JIRA не запущена")
+        return None
+    return JiraSyncWorker(
+        bot,
+        gateway.client,
+        project=settings.get("PROJECT", "FA"),
+        interval=settings.get("INTERVAL", 60),
+        page_size=settings.get("PAGE_SIZE", 100),
+        state_path=settings.get("STATE_PATH", DEFAULT_SYNC_STATE),
+        timezone=settings.get("TIMEZONE")
+    )
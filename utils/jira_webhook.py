@@ -0,0 +1,135 @@
+"""
+HTTP-приёмник вебхуков JIRA.
+
+JIRA сама присылает изменения задач FA, поэтому опрашивать её не нужно.
+Запрос принимается, только если подписан секретом (заголовок X-Hub-Signature,
+HMAC-SHA256 тела) или содержит секрет в параметре ?secret=.
+Там же отдаются метрики выключателей JIRA (/metrics).
+"""
+import hashlib
+import hmac
+import json
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from aiogram import Bot
+from aiohttp import web
+
+from common.jira.circuit_breaker import render_metrics
+from config import CONFIG
+from utils.jira_jobs import get_gateway
+from utils.jira_sync import IssueUpdate, apply_issue_update
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "/jira/webhook"
+DEFAULT_PORT = 8081
+ISSUE_EVENTS = ("jira:issue_updated", "jira:issue_created")
+# Сколько id доставок помнить для отсева повторов
+SEEN_DELIVERIES_LIMIT = 1000
+
+
+def verify_request(secret: str, body: bytes, signature: Optional[str], query_secret: Optional[str]) -> bool:
+    """Проверяет подпись тела или секрет в адресе вебхука"""
+    if not secret:
+        return False
+    if signature:
+        algorithm, _, digest = signature.partition("=")
+        if algorithm != "sha256" or not digest:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, digest)
+    if query_secret:
+        return hmac.compare_digest(secret, query_secret)
+    return False
+
+
+class JiraWebhookServer:
+    """Небольшой aiohttp-сервер, принимающий вебхуки JIRA."""
+
+    def __init__(self, bot: Bot, secret: str, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 path: str = DEFAULT_PATH, project: str = "FA"):
+        self._bot = bot
+        self._secret = secret
+        self._host = host
+        self._port = port
+        self._project = project
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._runner: Optional[web.AppRunner] = None
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle_webhook)
+        self.app.router.add_get("/metrics", self.handle_metrics)
+
+    def _remember(self, delivery_id: Optional[str]):
+        if not delivery_id:
+            return
+        self._seen[delivery_id] = None
+        while len(self._seen) > SEEN_DELIVERIES_LIMIT:
+            self._seen.popitem(last=False)
+
+    async def handle_webhook(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        if not verify_request(self._secret, body, request.headers.get("X-Hub-Signature"),
+                              request.query.get("secret")):
+            logger.warning(f"🚫 Вебхук JIRA отклонён: неверная подпись ({request.remote})")
+            return web.json_response({"status": "forbidden"}, status=401)
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.json_response({"status": "bad request"}, status=400)
+
+        delivery_id = request.headers.get("X-Atlassian-Webhook-Identifier")
+        if delivery_id and delivery_id in self._seen:
+            return web.json_response({"status": "duplicate"})
+
+        event = payload.get("webhookEvent")
+        issue = payload.get("issue") or {}
+        key = issue.get("key", "")
+        if event not in ISSUE_EVENTS or not key.startswith(f"{self._project}-"):
+            return web.json_response({"status": "ignored"})
+
+        try:
+            action = await apply_issue_update(self._bot, IssueUpdate.from_issue(issue, payload.get("timestamp")))
+        except Exception as e:
+            logger.error(f"❌ Ошибка обработки вебхука JIRA для {key}: {e}", exc_info=True)
+            return web.json_response({"status": "error"}, status=500)
+        # Повторную доставку запоминаем только после успешной обработки, чтобы JIRA могла повторить
+        self._remember(delivery_id)
+        return web.json_response({"status": action or "unchanged"})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        text = render_metrics()
+        gateway = get_gateway()
+        if gateway is not None:
+            text += gateway.render_metrics()
+        return web.Response(text=text, content_type="text/plain")
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        logger.info(f"🌐 Приёмник вебхуков JIRA слушает {self._host}:{self._port}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def create_webhook_server(bot: Bot) -> Optional[JiraWebhookServer]:
+    """Создаёт сервер по CONFIG["JIRA_WEBHOOK"]; None — если приём вебхуков выключен"""
+    settings = CONFIG.get("JIRA_WEBHOOK", {})
+    if not settings.get("ENABLED"):
+        return None
+    if not settings.get("SECRET"):
+        logger.error("❌ JIRA_WEBHOOK.SECRET не задан — приём вебхуков не запущен")
+        return None
+    return JiraWebhookServer(
+        bot,
+        secret=settings["SECRET"],
+        host=settings.get("HOST", "0.0.0.0"),
+        port=settings.get("PORT", DEFAULT_PORT),
+        path=settings.get("PATH", DEFAULT_PATH)
+    )
@@ -0,0 +1,126 @@
+"""
+Календарь работ из Confluence без браузера.
+
+События недели читаются из Team Calendars через REST и показываются
+HTML-сообщением или картинкой, нарисованной на стороне бота.
+Скриншот страницы браузером остаётся запасным путём.
+"""
+import html
+import io
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import List, Optional
+
+from config import CONFIG
+from infrastructure.confluence.confluence_client import CalendarEvent, ConfluenceClient, page_id_from_url
+from utils.jira_card import load_font
+
+logger = logging.getLogger(__name__)
+
+# Вид календаря: text — сообщение, image — картинка, browser — старый скриншот
+VIEW_TEXT, VIEW_IMAGE, VIEW_BROWSER = "text", "image", "browser"
+WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+IMAGE_WIDTH = 900
+PADDING = 32
+
+_client: Optional[ConfluenceClient] = None
+
+
+def calendar_view() -> str:
+    return CONFIG.get("CONFLUENCE", {}).get("CALENDAR_VIEW", VIEW_TEXT)
+
+
+def get_confluence_client() -> Optional[ConfluenceClient]:
+    """Клиент Confluence бота; None, если не задан ни TOKEN, ни USERNAME"""
+    global _client
+    settings = CONFIG.get("CONFLUENCE", {})
+    if _client is None and settings.get("LOGIN_URL") and (settings.get("TOKEN") or settings.get("USERNAME")):
+        _client = ConfluenceClient.from_config(settings)
+    return _client
+
+
+async def close_confluence_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+    _client = None
+
+
+def _event_time(event: CalendarEvent) -> str:
+    if event.all_day:
+        return "весь день"
+    if event.start.date() == event.end.date():
+        return f"{event.start:%H:%M}–{event.end:%H:%M}"
+    return f"{event.start:%H:%M} — {event.end:%d.%m %H:%M}"
+
+
+def group_by_day(start: date, end: date, events: List[CalendarEvent]):
+    """[(день, события)] недели; многодневное событие попадает в каждый свой день"""
+    days = defaultdict(list)
+    for event in events:
+        first = max(event.start.date(), start)
+        # У событий на весь день Confluence отдаёт конец как начало следующего дня
+        last = event.end.date() - timedelta(days=1) if event.all_day else event.end.date()
+        day = first
+        while day <= min(last, end - timedelta(days=1)):
+            days[day].append(event)
+            day += timedelta(days=1)
+        if first > last and event.start.date() >= start:
+            # Событие на весь день с концом, равным началу
+            days[first].append(event)
+    return sorted(days.items())
+
+
+def render_week_html(start: date, end: date, events: List[CalendarEvent]) -> str:
+    e = html.escape
+    header = f"🗓️ <b>Работы на неделе {start:%d.%m} — {end - timedelta(days=1):%d.%m}</b>"
+    if not events:
+        return header + "\n\nЗапланированных работ нет ✅"
+    lines = [header]
+    for day, day_events in group_by_day(start, end, events):
+        lines += ["", f"<b>{WEEKDAYS[day.weekday()]} {day:%d.%m}</b>"]
+        for event in day_events:
+            calendar = f" <i>({e(event.calendar)})</i>" if event.calendar else ""
+            lines.append(f"• {_event_time(event)} — {e(event.title)}{calendar}")
+    return "\n".join(lines)
+
+
+def render_week_png(start: date, end: date, events: List[CalendarEvent]) -> bytes:
+    """Неделя работ картинкой (Pillow импортируется только здесь)"""
+    from PIL import Image, ImageDraw
+
+    title_font, day_font, text_font = load_font(28, bold=True), load_font(22, bold=True), load_font(20)
+    days = group_by_day(start, end, events)
+    height = PADDING * 2 + 44 + sum(40 + 30 * len(day_events) for _, day_events in days) + (0 if days else 30)
+    image = Image.new("RGB", (IMAGE_WIDTH, height), "white")
+    draw = ImageDraw.Draw(image)
+
+    y = PADDING
+    draw.text((PADDING, y), f"Работы на неделе {start:%d.%m} — {end - timedelta(days=1):%d.%m}",
+              font=title_font, fill="#172B4D")
+    y += 44
+    if not days:
+        draw.text((PADDING, y), "Запланированных работ нет", font=text_font, fill="#00875A")
+    for day, day_events in days:
+        y += 10
+        draw.text((PADDING, y), f"{WEEKDAYS[day.weekday()]} {day:%d.%m}", font=day_font, fill="#0052CC")
+        y += 30
+        for event in day_events:
+            draw.text((PADDING + 16, y), _event_time(event), font=text_font, fill="#6B778C")
+            draw.text((PADDING + 220, y), event.title[:60], font=text_font, fill="#172B4D")
+            y += 30
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+async def week_maintenance(day: Optional[date] = None):
+    """(начало, конец, события) недели; None, если Confluence не настроен"""
+    client = get_confluence_client()
+    if client is None:
+        return None
+    settings = CONFIG["CONFLUENCE"]
+    page_id = settings.get("PAGE_ID") or page_id_from_url(settings.get("TARGET_URL", ""))
+    return await client.maintenance_for_week(page_id, settings.get("CALENDAR_IDS", []), day)
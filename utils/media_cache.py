@@ -0,0 +1,131 @@
+"""
+Кэш file_id отправленных картинок.
+
+Telegram отдаёт file_id загруженного файла, и повторная отправка по нему не
+требует загрузки байтов. Ключ кэша — sha256 содержимого, поэтому одинаковый
+скриншот или карточка уходят одним коротким вызовом API. Записи хранятся в
+SQLite и живут TTL секунд; file_id, который Telegram больше не принимает,
+удаляется, и файл загружается заново.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, Message
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "data/media_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600
+
+_cache: Optional["MediaFileCache"] = None
+
+
+def media_key(data: bytes, kind: str = "photo") -> str:
+    """Ключ записи: file_id фото нельзя отправить документом, поэтому вид входит в ключ"""
+    return f"{kind}:{hashlib.sha256(data).hexdigest()}"
+
+
+class MediaFileCache:
+    """Хранилище «хэш содержимого → file_id» с TTL."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, ttl: float = DEFAULT_TTL):
+        self._db_path = db_path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path)
+
+    def _init_db(self):
+        directory = os.path.dirname(self._db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS media_file_ids (
+                    key TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("DELETE FROM media_file_ids WHERE created_at < ?", (time.time() - self.ttl,))
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT file_id FROM media_file_ids WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, file_id: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO media_file_ids (key, file_id, created_at) VALUES (?, ?, ?)",
+                (key, file_id, time.time())
+            )
+
+    def _forget(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM media_file_ids WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[str]:
+        file_id = await asyncio.to_thread(self._get, key)
+        if file_id:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return file_id
+
+    async def put(self, key: str, file_id: str):
+        await asyncio.to_thread(self._put, key, file_id)
+
+    async def forget(self, key: str):
+        await asyncio.to_thread(self._forget, key)
+
+
+async def get_media_cache() -> Optional[MediaFileCache]:
+    """Кэш бота; None, если MEDIA_CACHE.DB_PATH пуст"""
+    global _cache
+    settings = CONFIG.get("MEDIA_CACHE", {})
+    db_path = settings.get("DB_PATH", DEFAULT_DB_PATH)
+    if _cache is None and db_path:
+        _cache = await asyncio.to_thread(MediaFileCache, db_path, settings.get("TTL", DEFAULT_TTL))
+    return _cache
+
+
+async def answer_photo_cached(message: Message, data: bytes, filename: str,
+                              cache: Optional[MediaFileCache] = None, **kwargs) -> Message:
+    """
+    message.answer_photo с повторным использованием file_id.
+
+    Если такие же байты уже отправлялись, уходит только file_id; иначе файл
+    загружается, и file_id самого большого размера запоминается.
+    """
+    cache = cache or await get_media_cache()
+    if cache is None:
+        return await message.answer_photo(photo=BufferedInputFile(data, filename=filename), **kwargs)
+
+    key = media_key(data)
+    file_id = await cache.get(key)
+    if file_id:
+        try:
+            return await message.answer_photo(photo=file_id, **kwargs)
+        except TelegramBadRequest as e:
+            logger.warning(f"⚠️ Telegram не принял сохранённый file_id для {filename}, загружаю заново: {e}")
+            await cache.forget(key)
+
+    sent = await message.answer_photo(photo=BufferedInputFile(data, filename=filename), **kwargs)
+    if sent and sent.photo:
+        await cache.put(key, sent.photo[-1].file_id)
+    return sent
@@ -0,0 +1,131 @@
+"""
+Middleware диспетчера.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from utils.user_cache import UserNameCache, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Неидемпотентные кнопки: повтор сразу после выполнения создал бы второй пост или задачу
+ONCE_CALLBACKS = frozenset({"confirm_send", "action_stop", "reminder_stop"})
+
+
+class UserProfileMiddleware(BaseMiddleware):
+    """Запоминает имя отправителя каждого сообщения и нажатия кнопки в кэше имён."""
+
+    def __init__(self, cache: UserNameCache = user_cache):
+        self._cache = cache
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is not None and not user.is_bot:
+            if self._cache.remember(user):
+                logger.debug(f"👤 Имя пользователя {user.id} обновлено в кэше")
+        return await handler(event, data)
+
+
+@dataclass
+class _UserSlot:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Обновления пользователя: выполняемое и ожидающие своей очереди
+    pending: int = 0
+
+
+class UserSerialMiddleware(BaseMiddleware):
+    """
+    Обрабатывает обновления одного пользователя строго по очереди.
+
+    Повторное нажатие той же кнопки (тот же callback на том же сообщении),
+    пока первое обрабатывается, отбрасывается. Кнопки из once_callbacks
+    отбрасываются и в течение duplicate_window после выполнения — так двойной
+    тап по «Отправить» не создаёт две задачи и два поста, а листать страницы
+    можно сколько угодно быстро.
+    Очередь пользователя ограничена max_pending; разные пользователи
+    обрабатываются параллельно.
+    """
+
+    def __init__(self, max_pending: int = 5, duplicate_window: float = 3.0,
+                 once_callbacks: frozenset = ONCE_CALLBACKS):
+        self.max_pending = max_pending
+        self.duplicate_window = duplicate_window
+        self.once_callbacks = once_callbacks
+        self._slots: Dict[int, _UserSlot] = {}
+        # Ключ идемпотентности → время завершения (None — ещё выполняется)
+        self._keys: Dict[Hashable, Optional[float]] = {}
+
+    @staticmethod
+    def idempotency_key(event: TelegramObject) -> Optional[Hashable]:
+        if isinstance(event, CallbackQuery) and event.data is not None:
+            message_id = event.message.message_id if event.message else event.inline_message_id
+            return event.from_user.id, message_id, event.data
+        return None
+
+    def _is_duplicate(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        for old_key, finished in list(self._keys.items()):
+            if finished is not None and now - finished > self.duplicate_window:
+                del self._keys[old_key]
+        return key in self._keys
+
+    @property
+    def busy_users(self) -> int:
+        """Сколько пользователей сейчас обрабатывается"""
+        return sum(1 for slot in self._slots.values() if slot.lock.locked())
+
+    async def _reject(self, event: TelegramObject, text: str):
+        if isinstance(event, CallbackQuery):
+            try:
+                await event.answer(text)
+            except Exception as e:
+                logger.debug(f"Не удалось ответить на callback: {e}")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is None:
+            return await handler(event, data)
+
+        key = self.idempotency_key(event)
+        if key is not None and self._is_duplicate(key):
+            logger.info(f"[{user.id}] Повторное нажатие «{key[2]}» пропущено")
+            await self._reject(event, "⏳ Уже выполняется")
+            return None
+
+        slot = self._slots.setdefault(user.id, _UserSlot())
+        if slot.pending >= self.max_pending:
+            logger.warning(f"[{user.id}] Очередь обновлений переполнена ({slot.pending}), обновление отброшено")
+            await self._reject(event, "⏳ Слишком много действий подряд, подождите")
+            return None
+
+        if key is not None:
+            self._keys[key] = None
+        slot.pending += 1
+        try:
+            async with slot.lock:
+                return await handler(event, data)
+        finally:
+            slot.pending -= 1
+            if key is not None:
+                if key[2] in self.once_callbacks:
+                    self._keys[key] = time.monotonic()
+                else:
+                    self._keys.pop(key, None)
+            if slot.pending == 0:
+                self._slots.pop(user.id, None)
@@ -0,0 +1,156 @@
+"""
+Фоновая предотрисовка часто запрашиваемых страниц.
+
+В рабочие часы страницы из PRERENDER.URLS (по умолчанию — календарь работ
+CONFLUENCE.TARGET_URL) снимаются по расписанию, и пользователь сразу получает
+последний снимок с указанием его возраста. Изменилась ли страница, определяется
+по sha256 снимка; неизменившийся снимок не заменяется, поэтому повторная
+отправка идёт по сохранённому file_id. Обновление по запросу остаётся доступным.
+"""
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from config import CONFIG
+from utils.image_encoding import EncodedImage
+from utils.screenshot_worker import render_screenshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 600
+DEFAULT_WORK_HOURS = (9, 20)
+DEFAULT_WORK_DAYS = (0, 1, 2, 3, 4)
+# Пауза между страницами одного цикла: браузер поднимается на каждую страницу
+PAGE_PAUSE = 1.0
+
+Renderer = Callable[[str], Awaitable[Optional[EncodedImage]]]
+
+_prerenderer: Optional["PreRenderer"] = None
+
+
+@dataclass
+class Render:
+    """Последний снимок страницы"""
+    url: str
+    image: EncodedImage
+    digest: str
+    checked_at: datetime
+    changed_at: datetime
+
+    def age(self, now: Optional[datetime] = None) -> str:
+        """Возраст снимка для подписи: «только что», «5 мин назад», «2 ч 10 мин назад»"""
+        minutes = int(((now or datetime.now()) - self.checked_at).total_seconds() // 60)
+        if minutes < 1:
+            return "только что"
+        if minutes < 60:
+            return f"{minutes} мин назад"
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours} ч {minutes} мин назад" if minutes else f"{hours} ч назад"
+
+    def caption(self, now: Optional[datetime] = None) -> str:
+        return f"🕒 Снимок от {self.checked_at:%H:%M} ({self.age(now)})"
+
+
+async def capture_page(url: str) -> Optional[EncodedImage]:
+    """Снимок страницы браузером в процессе снимков"""
+    return await render_screenshot(url)
+
+
+def in_working_hours(now: datetime, hours: Sequence[int] = DEFAULT_WORK_HOURS,
+                     days: Sequence[int] = DEFAULT_WORK_DAYS) -> bool:
+    """Рабочее ли время: день недели из days (0 — понедельник), час в [начало, конец)"""
+    return now.weekday() in days and hours[0] <= now.hour < hours[1]
+
+
+class PreRenderer:
+    """Держит свежие снимки страниц и обновляет их по расписанию."""
+
+    def __init__(self, urls: Sequence[str], render: Renderer = capture_page,
+                 interval: float = DEFAULT_INTERVAL, work_hours: Sequence[int] = DEFAULT_WORK_HOURS,
+                 work_days: Sequence[int] = DEFAULT_WORK_DAYS, timeout: float = 60):
+        self.urls: List[str] = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        self.interval = interval
+        self.work_hours = tuple(work_hours)
+        self.work_days = tuple(work_days)
+        self.timeout = timeout
+        self._render = render
+        self._renders: Dict[str, Render] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def tracks(self, url: str) -> bool:
+        return url.strip() in self.urls
+
+    def latest(self, url: str) -> Optional[Render]:
+        return self._renders.get(url.strip())
+
+    async def _render_once(self, url: str) -> Optional[Render]:
+        image = await asyncio.wait_for(self._render(url), timeout=self.timeout)
+        if image is None:
+            return self._renders.get(url)
+        now = datetime.now()
+        digest = hashlib.sha256(image.data).hexdigest()
+        previous = self._renders.get(url)
+        if previous and previous.digest == digest:
+            # Страница не изменилась: те же байты — тот же file_id в кэше Telegram
+            previous.checked_at = now
+            return previous
+        if previous:
+            logger.info(f"🖼️ Страница изменилась с {previous.changed_at:%H:%M}: {url}")
+        self._renders[url] = Render(url, image, digest, checked_at=now, changed_at=now)
+        return self._renders[url]
+
+    async def refresh(self, url: str) -> Optional[Render]:
+        """
+        Снимает страницу сейчас. Одновременные обновления одной страницы
+        (расписание и запросы пользователей) объединяются в один снимок.
+        """
+        url = url.strip()
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._render_once(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def refresh_all(self):
+        for index, url in enumerate(self.urls):
+            if index:
+                await asyncio.sleep(PAGE_PAUSE)
+            try:
+                await self.refresh(url)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось предотрисовать {url}: {e}")
+
+    async def run(self):
+        """Цикл предотрисовки до вызова stop(); вне рабочих часов снимки не обновляются"""
+        logger.info(f"🖼️ Предотрисовка страниц запущена: {len(self.urls)} шт., каждые {self.interval:.0f} с")
+        while not self._stopping.is_set():
+            if in_working_hours(datetime.now(), self.work_hours, self.work_days):
+                await self.refresh_all()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._stopping.set()
+
+
+def get_prerenderer() -> Optional[PreRenderer]:
+    """Предотрисовщик по CONFIG["PRERENDER"]; None — если выключен"""
+    global _prerenderer
+    settings = CONFIG.get("PRERENDER", {})
+    if _prerenderer is None and settings.get("ENABLED"):
+        urls = settings.get("URLS") or [CONFIG.get("CONFLUENCE", {}).get("TARGET_URL", "")]
+        _prerenderer = PreRenderer(
+            urls,
+            interval=settings.get("INTERVAL", DEFAULT_INTERVAL),
+            work_hours=settings.get("WORK_HOURS", DEFAULT_WORK_HOURS),
+            work_days=settings.get("WORK_DAYS", DEFAULT_WORK_DAYS),
+            timeout=CONFIG.get("TASK_TIMEOUT", 30) * 2
+        )
+    return _prerenderer
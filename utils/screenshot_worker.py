@@ -0,0 +1,346 @@
+"""
+Снимки браузером в отдельных процессах.
+
+Selenium и Chrome работают в дочерних процессах, а не в потоках бота: зависший
+драйвер или всплеск памяти браузера не задевают цикл событий и RSS бота.
+Задания ждут в локальной очереди; у каждого есть срок. Если срок вышел или
+ожидающий отменил задание, процесс вместе с браузером завершается и поднимается
+заново. Упавший процесс тоже перезапускается.
+
+Какой браузер снимает страницы, задаёт SCREENSHOT.BACKEND: selenium (через эти
+процессы) или playwright (асинхронно, в цикле событий бота).
+"""
+import asyncio
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from common.jira.config import jira_base_url
+from config import CONFIG
+from infrastructure.selenium.screenshot_service import (
+    DEFAULT_PAGES, DEFAULT_STATE_DIR, PlaywrightBackend, ScreenshotBackend, SeleniumBackend, SiteLogin
+)
+from utils.image_encoding import EncodedImage, encode_within_budget
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 1
+STOP_GRACE = 5
+BACKEND_SELENIUM, BACKEND_PLAYWRIGHT = "selenium", "playwright"
+CONFLUENCE_SELECTOR = "#main-content"
+JIRA_SELECTOR = "#issue-content"
+
+_pool: Optional["ScreenshotWorkerPool"] = None
+_backend: Optional[ScreenshotBackend] = None
+
+
+class ScreenshotWorkerError(Exception):
+    """Процесс снимков упал или задание завершилось ошибкой"""
+
+
+def _call(target: str, args: tuple) -> Any:
+    module, name = target.split(":")
+    return getattr(importlib.import_module(module), name)(*args)
+
+
+def _serve(conn):
+    """Цикл дочернего процесса: ("модуль:функция", args) → (True, результат) или (False, ошибка)"""
+    if hasattr(os, "setpgrp"):
+        # Своя группа процессов: при остановке завершаются и chromedriver с Chrome
+        os.setpgrp()
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        target, args = job
+        try:
+            conn.send((True, _call(target, args)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+@dataclass
+class _Job:
+    target: str
+    args: tuple
+    deadline: float
+    future: asyncio.Future
+
+
+class _Worker:
+    """Один дочерний процесс и его канал."""
+
+    def __init__(self, index: int, context):
+        self.index = index
+        self._context = context
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+
+    def ensure_started(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        if self.process is not None:
+            self.restarts += 1
+            logger.warning(f"♻️ Процесс снимков #{self.index} перезапускается (код {self.process.exitcode})")
+        if self.conn is not None:
+            self.conn.close()
+        self.conn, child = self._context.Pipe()
+        self.process = self._context.Process(
+            target=_serve, args=(child,), name=f"screenshot-worker-{self.index}", daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        """Завершает процесс вместе с браузером, не дожидаясь текущего задания"""
+        if self.process is None:
+            return
+        if hasattr(os, "killpg"):
+            # Группа переживает упавший процесс, если в ней остались браузеры
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(STOP_GRACE)
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(STOP_GRACE)
+            self.kill()
+        if self.conn is not None:
+            self.conn.close()
+        self.process = self.conn = None
+
+
+class ScreenshotWorkerPool:
+    """Очередь заданий на снимки и процессы, которые их выполняют."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, start_method: str = "spawn"):
+        context = multiprocessing.get_context(start_method)
+        self._workers: List[_Worker] = [_Worker(i, context) for i in range(max(1, workers))]
+        # Потоки только ждут ответа из канала; убитый процесс освобождает поток сразу
+        self._executor = ThreadPoolExecutor(max_workers=len(self._workers), thread_name_prefix="screenshot-recv")
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+
+    @property
+    def restarts(self) -> int:
+        return sum(worker.restarts for worker in self._workers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "restarts": self.restarts,
+        }
+
+    async def start(self):
+        if self._dispatchers:
+            return
+        self._queue = asyncio.Queue()
+        for worker in self._workers:
+            worker.ensure_started()
+        self._dispatchers = [asyncio.create_task(self._dispatch(worker)) for worker in self._workers]
+        logger.info(f"📸 Процессы снимков запущены: {len(self._workers)} шт.")
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(ScreenshotWorkerError("Процессы снимков остановлены"))
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [worker.stop() for worker in self._workers]
+        )
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, target: str, *args, timeout: float) -> Any:
+        """
+        Выполняет «модуль:функция»(*args) в процессе снимков.
+        Срок timeout отсчитывается с постановки в очередь; по его истечении — asyncio.TimeoutError.
+        """
+        await self.start()
+        loop = asyncio.get_running_loop()
+        job = _Job(target, args, loop.time() + timeout, loop.create_future())
+        self._queue.put_nowait(job)
+        # Отмена ожидания (или срок) отменяет future — диспетчер увидит это и остановит задание
+        return await asyncio.wait_for(job.future, timeout=timeout)
+
+    async def _dispatch(self, worker: _Worker):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                # Просрочено или отменено, пока ждало в очереди
+                self.cancelled += 1
+                continue
+            worker.ensure_started()
+            try:
+                worker.conn.send((job.target, job.args))
+            except OSError as e:
+                worker.kill()
+                self.failed += 1
+                job.future.set_exception(ScreenshotWorkerError(f"Процесс снимков недоступен: {e}"))
+                continue
+
+            receive = loop.run_in_executor(self._executor, worker.conn.recv)
+            await asyncio.wait({receive, job.future}, timeout=max(0.0, job.deadline - loop.time()),
+                               return_when=asyncio.FIRST_COMPLETED)
+            if not receive.done():
+                if loop.time() < job.deadline:
+                    self.cancelled += 1
+                    logger.info(f"🛑 Задание снимка отменено, процесс #{worker.index} перезапускается")
+                else:
+                    self.timed_out += 1
+                    logger.warning(f"⏳ Задание снимка {job.target} не уложилось в срок, процесс #{worker.index} завершён")
+                if not job.future.done():
+                    job.future.set_exception(asyncio.TimeoutError())
+                worker.kill()
+                await asyncio.gather(receive, return_exceptions=True)
+                continue
+
+            try:
+                ok, payload = receive.result()
+            except (EOFError, OSError):
+                self.failed += 1
+                logger.error(f"💥 Процесс снимков #{worker.index} упал во время задания {job.target}")
+                worker.kill()
+                if not job.future.done():
+                    job.future.set_exception(ScreenshotWorkerError("Процесс снимков упал"))
+                continue
+            if job.future.done():
+                continue
+            if ok:
+                self.completed += 1
+                job.future.set_result(payload)
+            else:
+                self.failed += 1
+                job.future.set_exception(ScreenshotWorkerError(payload))
+
+
+def get_screenshot_pool() -> Optional[ScreenshotWorkerPool]:
+    """Пул процессов снимков; None при SCREENSHOT.WORKERS = 0 (снимки в потоке бота)"""
+    global _pool
+    workers = CONFIG.get("SCREENSHOT", {}).get("WORKERS", DEFAULT_WORKERS)
+    if _pool is None and workers:
+        _pool = ScreenshotWorkerPool(workers)
+    return _pool
+
+
+async def close_screenshot_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+    _pool = None
+
+
+async def run_isolated(target: str, *args, timeout: Optional[float] = None) -> Any:
+    """«модуль:функция»(*args) в процессе снимков, а если пул выключен — в потоке"""
+    timeout = timeout or CONFIG.get("TASK_TIMEOUT", 30)
+    pool = get_screenshot_pool()
+    if pool is None:
+        return await asyncio.wait_for(asyncio.to_thread(_call, target, args), timeout=timeout)
+    return await pool.submit(target, *args, timeout=timeout)
+
+
+def _site_logins() -> List[SiteLogin]:
+    """Сайты для Playwright из секций CONFLUENCE и JIRA (адрес сайта — LOGIN_URL до /login)"""
+    settings = CONFIG.get("SCREENSHOT", {})
+    sites = []
+    confluence = CONFIG.get("CONFLUENCE", {})
+    if confluence.get("LOGIN_URL"):
+        sites.append(SiteLogin(
+            "confluence", confluence["LOGIN_URL"].strip().split("/login")[0], confluence["LOGIN_URL"].strip(),
+            confluence.get("USERNAME", ""), confluence.get("PASSWORD", ""),
+            "#os_username", "#os_password", "#loginButton",
+            selector=settings.get("CONFLUENCE_SELECTOR", CONFLUENCE_SELECTOR)
+        ))
+    jira = CONFIG.get("JIRA", {})
+    if jira.get("LOGIN_URL"):
+        sites.append(SiteLogin(
+            "jira", jira_base_url(jira["LOGIN_URL"]), jira["LOGIN_URL"].strip(),
+            jira.get("USERNAME", ""), jira.get("PASSWORD", ""),
+            "#login-form-username", "#login-form-password", "#login-form-submit",
+            selector=settings.get("JIRA_SELECTOR", JIRA_SELECTOR)
+        ))
+    return sites
+
+
+def _playwright_installed() -> bool:
+    return importlib.util.find_spec("playwright") is not None
+
+
+def get_screenshot_backend() -> ScreenshotBackend:
+    """
+    Бэкенд снимков по SCREENSHOT.BACKEND (по умолчанию selenium).
+    Playwright — необязательная зависимость (requirements-playwright.txt).
+    """
+    global _backend
+    if _backend is None:
+        settings = CONFIG.get("SCREENSHOT", {})
+        if settings.get("BACKEND", BACKEND_SELENIUM) == BACKEND_PLAYWRIGHT:
+            if not _playwright_installed():
+                raise RuntimeError(
+                    "SCREENSHOT.BACKEND = playwright, но Playwright не установлен: "
+                    "pip install -r requirements-playwright.txt && playwright install chromium"
+                )
+            _backend = PlaywrightBackend(
+                _site_logins(),
+                CONFIG.get("CONFLUENCE", {}).get("TARGET_URL", ""),
+                pages=settings.get("PAGES", DEFAULT_PAGES),
+                state_dir=settings.get("AUTH_STATE_DIR", DEFAULT_STATE_DIR),
+                timeout=CONFIG.get("TASK_TIMEOUT", 30)
+            )
+        else:
+            _backend = SeleniumBackend(run_isolated)
+    return _backend
+
+
+async def close_screenshot_backend():
+    """Закрывает браузер бэкенда и процессы снимков"""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+    await close_screenshot_pool()
+
+
+async def render_screenshot(url: Optional[str] = None, timeout: Optional[float] = None) -> Optional[EncodedImage]:
+    """Снимок страницы для Telegram, пережатый в пределах бюджета (см. image_encoding)"""
+    png = await get_screenshot_backend().capture(url, timeout=timeout)
+    if not png:
+        return None
+    image = await asyncio.to_thread(encode_within_budget, png)
+    logger.info(f"🗜️ Скриншот пережат: {len(png)} → {len(image.data)} байт ({image.format})")
+    return image
+
+
+async def render_confluence_png(timeout: Optional[float] = None) -> Optional[bytes]:
+    """PNG календаря работ без пережатия — для вложений JIRA"""
+    return await get_screenshot_backend().capture(None, timeout=timeout)
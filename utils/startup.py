@@ -0,0 +1,181 @@
+"""
+Поэтапный запуск бота: независимые шаги инициализации выполняются параллельно.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from aiogram import Bot
+from aiogram.types import BotCommand
+
+from config import CONFIG
+from utils.startup_profiler import StartupProfiler
+
+logger = logging.getLogger(__name__)
+
+COMMANDS_HASH_FILE = "data/commands.sha256"
+DEFAULT_WARMUP_TIMEOUT = 15
+
+
+@dataclass
+class StartupStep:
+    """Шаг инициализации."""
+    name: str
+    run: Callable[[], Awaitable]
+    critical: bool = False  # Ошибка критичного шага прерывает запуск
+    timeout: Optional[float] = None
+    # Прогрев: готовность ждёт его не дольше timeout, после чего он продолжается в фоне
+    background: bool = False
+
+
+class StartupOrchestrator:
+    """
+    Выполняет этапы запуска по порядку, а шаги внутри этапа — параллельно.
+    Событие ready выставляется, когда завершены все шаги, а прогревы завершены
+    или исчерпали свой timeout: не успевший прогрев не отменяется и
+    досчитывается в фоне, пока бот уже обслуживает запросы.
+    """
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        self._stages: List[Tuple[str, List[StartupStep]]] = []
+        self._profiler = profiler
+        self.ready = asyncio.Event()
+        self.failed_steps: List[str] = []
+
+    def add_stage(self, name: str, steps: Sequence[StartupStep]):
+        self._stages.append((name, list(steps)))
+
+    async def _run_step(self, step: StartupStep):
+        start = time.perf_counter()
+        try:
+            if step.timeout and not step.background:
+                await asyncio.wait_for(step.run(), timeout=step.timeout)
+            else:
+                await step.run()
+            logger.info(f"✅ [STARTUP] {step.name}: {(time.perf_counter() - start) * 1000:.0f} мс")
+        except Exception as e:
+            self.failed_steps.append(step.name)
+            if step.critical:
+                logger.critical(f"❌ [STARTUP] Критичный шаг «{step.name}» завершился ошибкой: {e}", exc_info=True)
+                raise
+            if isinstance(e, asyncio.TimeoutError):
+                logger.warning(f"⏳ [STARTUP] {step.name}: превышено время ожидания ({step.timeout} с)")
+            else:
+                logger.warning(f"⚠️ [STARTUP] {step.name}: {e}")
+        finally:
+            if self._profiler:
+                self._profiler.record(step.name, time.perf_counter() - start)
+
+    async def run(self):
+        """Выполняет все этапы, выставляет признак готовности и дожидается фоновых шагов."""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        background: List[Tuple[StartupStep, asyncio.Task, float]] = []
+        try:
+            for stage_name, steps in self._stages:
+                logger.info(f"🔧 [STARTUP] Этап «{stage_name}»: {', '.join(s.name for s in steps)}")
+                background += [
+                    (step, asyncio.create_task(self._run_step(step)), loop.time() + (step.timeout or 0))
+                    for step in steps if step.background
+                ]
+                await asyncio.gather(*(self._run_step(step) for step in steps if not step.background))
+            for step, task, deadline in background:
+                timeout = max(0.0, deadline - loop.time()) if step.timeout else None
+                await asyncio.wait({task}, timeout=timeout)
+                if not task.done():
+                    logger.warning(f"⏳ [STARTUP] {step.name}: не уложился в {step.timeout} с, продолжается в фоне")
+        except BaseException:
+            for _, task, _ in background:
+                task.cancel()
+            raise
+        self.ready.set()
+        logger.info(f"🟢 [STARTUP] Бот готов к работе за {(time.perf_counter() - start) * 1000:.0f} мс")
+        pending = [task for _, task, _ in background if not task.done()]
+        if pending:
+            await asyncio.gather(*pending)
+            logger.info(f"🔥 [STARTUP] Прогрев завершён за {(time.perf_counter() - start) * 1000:.0f} мс")
+
+    async def start(self) -> asyncio.Task:
+        """
+        Запускает run() в фоне и возвращается, как только бот готов.
+        Ошибка критичного шага пробрасывается. Возвращает задачу run() — её можно дождаться.
+        """
+        task = asyncio.create_task(self.run())
+        ready = asyncio.create_task(self.ready.wait())
+        await asyncio.wait({task, ready}, return_when=asyncio.FIRST_COMPLETED)
+        if not self.ready.is_set():
+            ready.cancel()
+            await task
+        return task
+
+
+def commands_hash(commands: Sequence[BotCommand]) -> str:
+    payload = json.dumps([(c.command, c.description) for c in commands], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read_commands_hash() -> Optional[str]:
+    try:
+        with open(COMMANDS_HASH_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _write_commands_hash(value: str):
+    os.makedirs(os.path.dirname(COMMANDS_HASH_FILE), exist_ok=True)
+    with open(COMMANDS_HASH_FILE, "w", encoding="utf-8") as f:
+        f.write(value)
+
+
+async def register_commands(bot: Bot, commands: Sequence[BotCommand]):
+    """Устанавливает команды бота, если их набор изменился с прошлого запуска."""
+    new_hash = commands_hash(commands)
+    if await asyncio.to_thread(_read_commands_hash) == new_hash:
+        logger.info("⏭️ Набор команд не изменился — пропускаю set_my_commands")
+        return
+    await bot.set_my_commands(list(commands))
+    await asyncio.to_thread(_write_commands_hash, new_hash)
+    logger.info("✅ Команды установлены")
+
+
+async def warm_up_jira():
+    """Открывает шлюз Jira и прогревает его пул соединений."""
+    from utils.jira_jobs import get_gateway
+    gateway = get_gateway()
+    if gateway is not None:
+        await gateway.warm_up()
+
+
+async def prelaunch_browser():
+    """Заранее запускает браузер бэкенда скриншотов."""
+    from utils.screenshot_worker import get_screenshot_backend
+    await get_screenshot_backend().start()
+
+
+def warmup_steps() -> List[StartupStep]:
+    """Необязательные шаги прогрева, включаемые в CONFIG["STARTUP"]."""
+    settings = CONFIG.get("STARTUP", {})
+    timeout = settings.get("WARMUP_TIMEOUT", DEFAULT_WARMUP_TIMEOUT)
+    steps = []
+    if settings.get("WARMUP_JIRA", True) and CONFIG.get("JIRA", {}).get("TOKEN"):
+        steps.append(StartupStep("прогрев Jira", warm_up_jira, timeout=timeout, background=True))
+    if settings.get("PRELAUNCH_BROWSER", True):
+        steps.append(StartupStep("предзапуск браузера", prelaunch_browser, timeout=timeout, background=True))
+    return steps
+
+
+async def shutdown_warmed_resources():
+    """Закрывает то, что было поднято на этапе прогрева."""
+    if "selenium_utils" in sys.modules:
+        from selenium_utils import shutdown_browser
+        await asyncio.to_thread(shutdown_browser)
+    if "utils.screenshot_worker" in sys.modules:
+        from utils.screenshot_worker import close_screenshot_backend
+        await close_screenshot_backend()
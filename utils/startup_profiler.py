@@ -0,0 +1,71 @@
+"""
+Профилировщик холодного старта бота.
+
+Запуск: python main.py --profile-startup
+Печатает разбивку времени импорта модулей и шагов инициализации
+и завершает работу, не запуская polling.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+PROFILE_FLAG = "--profile-startup"
+
+# Модули, которые не должны загружаться до первого запроса пользователя
+HEAVY_MODULES = ("selenium", "webdriver_manager", "requests")
+
+
+class StartupProfiler:
+    """Собирает длительности этапов запуска."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._started = time.perf_counter()
+        self._stages: List[Tuple[str, str, float, int]] = []
+        self._heavy_after_imports: Optional[List[str]] = None
+
+    @contextmanager
+    def stage(self, name: str, kind: str = "init"):
+        """Замеряет длительность блока и число модулей, загруженных внутри него."""
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stages.append((kind, name, elapsed, len(sys.modules) - modules_before))
+
+    def record(self, name: str, elapsed: float, kind: str = "init"):
+        """Записывает длительность шага, замеренного снаружи (например, параллельного)."""
+        self._stages.append((kind, name, elapsed, 0))
+
+    def mark_imports_done(self):
+        """Фиксирует, какие тяжёлые модули загружены к концу импорта (до прогрева)."""
+        self._heavy_after_imports = self.loaded_heavy_modules()
+
+    @staticmethod
+    def loaded_heavy_modules() -> List[str]:
+        return [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def report(self) -> str:
+        total = time.perf_counter() - self._started
+        lines = ["⏱️ Профиль запуска бота:"]
+        for kind, name, elapsed, new_modules in self._stages:
+            label = "импорт" if kind == "import" else "инициализация"
+            lines.append(
+                f"  {elapsed * 1000:8.1f} мс | {label:<13} | {name} (+{new_modules} модулей)"
+            )
+        lines.append(f"  {total * 1000:8.1f} мс | всего")
+
+        heavy = self._heavy_after_imports
+        if heavy is None:
+            heavy = self.loaded_heavy_modules()
+        if heavy:
+            lines.append(f"⚠️ Тяжёлые модули загружены при импорте: {', '.join(heavy)}")
+        else:
+            lines.append("✅ Тяжёлые модули при импорте не загружались")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler(enabled=PROFILE_FLAG in sys.argv)
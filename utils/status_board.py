@@ -0,0 +1,151 @@
+"""
+Закреплённое сообщение-сводка в канале сбоев.
+
+Показывает все активные сбои и работы и обновляется правкой одного и того же
+сообщения. Изменения состояния за короткое окно схлопываются в одну правку.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from bot_state import BotState, bot_state, safe_parse_time
+from config import CONFIG
+from utils.debounce import KeyedDebouncer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 3.0
+MAX_MESSAGE_LENGTH = 4096
+DATETIME_FORMAT = "%d.%m.%Y %H:%M"
+BOARD_KEY = "status_board"
+
+
+def _fmt(value) -> str:
+    parsed = safe_parse_time(value)
+    return parsed.strftime(DATETIME_FORMAT) if parsed else "неизвестно"
+
+
+def render_board(state: BotState) -> str:
+    """Формирует текст сводки (без строки с временем обновления)"""
+    lines = ["📋 <b>Текущая ситуация</b>", ""]
+
+    alarms = list(state.active_alarms.items())
+    if alarms:
+        lines.append(f"<b>🚨 Активные сбои ({len(alarms)}):</b>")
+        for alarm_id, alarm in alarms:
+            lines.append(f"• <code>{alarm_id}</code> — {alarm.get('issue', '')} (до {_fmt(alarm.get('fix_time'))})")
+    else:
+        lines.append("✅ Активных сбоев нет")
+    lines.append("")
+
+    maintenances = list(state.active_maintenances.items())
+    if maintenances:
+        lines.append(f"<b>🔧 Регламентные работы ({len(maintenances)}):</b>")
+        for work_id, work in maintenances:
+            lines.append(
+                f"• <code>{work_id}</code> — {work.get('description', '')} "
+                f"({_fmt(work.get('start_time'))} — {_fmt(work.get('end_time'))})"
+            )
+    else:
+        lines.append("✅ Регламентных работ нет")
+
+    text = "\n".join(lines)
+    # Запас под строку «Обновлено» и многоточие
+    limit = MAX_MESSAGE_LENGTH - 64
+    if len(text) > limit:
+        text = text[:text.rfind("\n", 0, limit)] + "\n…"
+    return text
+
+
+class StatusBoard:
+    """Поддерживает актуальность закреплённой сводки в канале."""
+
+    def __init__(self, state: BotState, debounce: float = DEFAULT_DEBOUNCE):
+        self._state = state
+        self._debouncer = KeyedDebouncer(debounce)
+        self._bot: Optional[Bot] = None
+        self._last_text: Optional[str] = None
+
+    @property
+    def chat_id(self):
+        return CONFIG["TELEGRAM"].get("ALARM_CHANNEL_ID")
+
+    def start(self, bot: Bot):
+        """Подписывается на изменения состояния и планирует первичную синхронизацию"""
+        self._bot = bot
+        self._state.add_listener(self._on_change)
+        self.schedule_update()
+
+    def stop(self):
+        self._state.remove_listener(self._on_change)
+
+    def _on_change(self, version: int):
+        try:
+            self.schedule_update()
+        except RuntimeError:
+            # Изменение вне цикла событий (например, при загрузке состояния в тестах)
+            logger.debug(f"Сводка не запланирована для версии {version}: нет цикла событий")
+
+    def schedule_update(self):
+        if self._bot and self.chat_id:
+            self._debouncer.schedule(BOARD_KEY, self.refresh)
+
+    async def flush(self):
+        """Применяет отложенное обновление немедленно"""
+        await self._debouncer.flush()
+
+    async def refresh(self):
+        """Приводит сообщение-сводку в соответствие с текущим состоянием"""
+        chat_id = self.chat_id
+        text = render_board(self._state)
+        board = self._state.status_board
+        if board.get("message_id") and str(board.get("chat_id")) == str(chat_id) and text == self._last_text:
+            logger.debug("Сводка не изменилась — правка не нужна")
+            return
+
+        full_text = f"{text}\n\n<i>Обновлено: {datetime.now().strftime(DATETIME_FORMAT)}</i>"
+        try:
+            if board.get("message_id") and str(board.get("chat_id")) == str(chat_id):
+                await self._edit(chat_id, board["message_id"], full_text)
+            else:
+                await self._publish(chat_id, full_text)
+            self._last_text = text
+        except TelegramRetryAfter as e:
+            logger.warning(f"⏳ Telegram просит подождать {e.retry_after} с перед обновлением сводки")
+            await asyncio.sleep(e.retry_after)
+            self.schedule_update()
+
+    async def _edit(self, chat_id, message_id: int, text: str):
+        try:
+            await self._bot.edit_message_text(text, chat_id=chat_id, message_id=message_id, parse_mode="HTML")
+            logger.info("📋 Сводка в канале обновлена")
+        except TelegramBadRequest as e:
+            if "message is not modified" in str(e):
+                return
+            logger.warning(f"⚠️ Не удалось отредактировать сводку ({e}), публикую заново")
+            await self._publish(chat_id, text)
+
+    async def _publish(self, chat_id, text: str):
+        message = await self._bot.send_message(chat_id, text, parse_mode="HTML", disable_notification=True)
+        try:
+            await self._bot.pin_chat_message(chat_id, message.message_id, disable_notification=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось закрепить сводку: {e}")
+        self._state.status_board = {"chat_id": chat_id, "message_id": message.message_id}
+        await self._state.save_state()
+        logger.info(f"📌 Сводка опубликована: {message.message_id}")
+
+
+def _settings() -> dict:
+    return CONFIG.get("STATUS_BOARD", {})
+
+
+status_board = StatusBoard(bot_state, debounce=_settings().get("DEBOUNCE", DEFAULT_DEBOUNCE))
+
+
+def status_board_enabled() -> bool:
+    return bool(_settings().get("ENABLED", True) and CONFIG["TELEGRAM"].get("ALARM_CHANNEL_ID"))
@@ -0,0 +1,206 @@
+"""
+Кэш отображаемых имён пользователей.
+
+Заполняется из входящих обновлений (message.from_user) и из SQLiteUserRepository.
+Отсутствующие имена дозапрашиваются в фоне через get_chat_member; одновременные
+запросы одного и того же id объединяются в один вызов API.
+"""
+import asyncio
+import html
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from aiogram import Bot
+
+from config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_SIZE = 1000
+DEFAULT_DB_PATH = "data/users.db"
+# Повторно спрашиваем Telegram о неизвестном пользователе не чаще, чем раз в это время
+NEGATIVE_TTL = 600
+
+
+def display_name(username: Optional[str], first_name: Optional[str] = None,
+                 last_name: Optional[str] = None, user_id: Optional[int] = None) -> str:
+    """Имя для показа в сообщениях: @username, иначе имя и фамилия, иначе [ID:...]"""
+    if username:
+        return f"@{username}"
+    full_name = " ".join(part for part in (first_name, last_name) if part)
+    if full_name:
+        return html.escape(full_name)
+    return f"[ID:{user_id}]"
+
+
+class UserNameCache:
+    """LRU-кэш имён с TTL и фоновым дозапросом недостающих записей."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE, repository=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._repository = repository
+        self._entries: "OrderedDict[int, Tuple[Optional[str], float]]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self._bot: Optional[Bot] = None
+        # Растёт при каждом изменении известных имён — используется кэшами отрисовки
+        self.version = 0
+
+    def set_repository(self, repository):
+        self._repository = repository
+
+    def attach(self, bot: Bot):
+        """Запоминает бота, через которого дозапрашиваются имена"""
+        self._bot = bot
+
+    def _store(self, user_id: int, name: Optional[str], ttl: Optional[float] = None):
+        previous = self._entries.get(user_id)
+        self._entries[user_id] = (name, time.monotonic() + (ttl or self.ttl))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        if not previous or previous[0] != name:
+            self.version += 1
+
+    def peek(self, user_id: int) -> Optional[str]:
+        """Имя из кэша без обращений к API; None — если имени нет или оно устарело"""
+        entry = self._entries.get(user_id)
+        if not entry or entry[1] < time.monotonic():
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[0]
+
+    def display(self, user_id: int) -> str:
+        """Имя для показа прямо сейчас; недостающее будет дозапрошено в фоне"""
+        name = self.peek(user_id)
+        if name:
+            return name
+        self.prefetch([user_id])
+        return f"[ID:{user_id}]"
+
+    def remember(self, user) -> bool:
+        """
+        Сохраняет имя пользователя из обновления Telegram.
+        Возвращает True, если имя новое или изменилось.
+        """
+        name = display_name(user.username, user.first_name, user.last_name, user.id)
+        entry = self._entries.get(user.id)
+        changed = not entry or entry[0] != name
+        self._store(user.id, name)
+        if changed and self._repository is not None:
+            self._spawn(self._persist(user))
+        return changed
+
+    def prefetch(self, user_ids: Iterable[int]):
+        """Запускает фоновый дозапрос имён, которых нет в кэше"""
+        if self._bot is None:
+            return
+        for user_id in user_ids:
+            if user_id in self._inflight or self.peek(user_id) or self._is_known_missing(user_id):
+                continue
+            self._spawn(self.resolve(user_id))
+
+    def _is_known_missing(self, user_id: int) -> bool:
+        entry = self._entries.get(user_id)
+        return bool(entry and entry[0] is None and entry[1] >= time.monotonic())
+
+    async def resolve(self, user_id: int, bot: Optional[Bot] = None) -> str:
+        """Возвращает имя, при необходимости запрашивая его; параллельные запросы объединяются"""
+        name = self.peek(user_id)
+        if name:
+            return name
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(user_id, bot or self._bot))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        name = await asyncio.shield(task)
+        return name or f"[ID:{user_id}]"
+
+    async def _fetch(self, user_id: int, bot: Optional[Bot]) -> Optional[str]:
+        if self._repository is not None:
+            try:
+                user = await self._repository.get(user_id)
+                if user:
+                    name = display_name(user.username, user.first_name, user.last_name, user_id)
+                    self._store(user_id, name)
+                    return name
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось прочитать пользователя {user_id} из БД: {e}")
+
+        if bot is None:
+            return None
+        try:
+            member = await bot.get_chat_member(CONFIG["TELEGRAM"]["ALARM_CHANNEL_ID"], user_id)
+            user = member.user
+            name = display_name(user.username, user.first_name, user.last_name, user_id)
+            self._store(user_id, name)
+            return name
+        except Exception as e:
+            logger.debug(f"Не удалось получить имя пользователя {user_id}: {e}")
+            self._store(user_id, None, ttl=NEGATIVE_TTL)
+            return None
+
+    async def _persist(self, user):
+        from domain.entities.user import User
+        now = datetime.now()
+        try:
+            existing = await self._repository.get(user.id)
+            if existing:
+                existing.username = user.username
+                existing.first_name = user.first_name
+                existing.last_name = user.last_name
+                existing.last_activity = now
+                await self._repository.update(existing)
+            else:
+                await self._repository.add(User(
+                    user_id=user.id,
+                    username=user.username,
+                    first_name=user.first_name,
+                    last_name=user.last_name,
+                    created_at=now,
+                    last_activity=now
+                ))
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить пользователя {user.id}: {e}")
+
+    async def load_from_repository(self):
+        """Заполняет кэш известными пользователями из БД (не больше max_size)"""
+        if self._repository is None:
+            return
+        users = await self._repository.get_all()
+        users.sort(key=lambda u: u.last_activity)
+        for user in users[-self.max_size:]:
+            self._store(user.user_id, display_name(user.username, user.first_name, user.last_name, user.user_id))
+        logger.info(f"👥 Загружено имён пользователей: {min(len(users), self.max_size)}")
+
+    @staticmethod
+    def _spawn(coro):
+        try:
+            asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()
+
+
+def _settings() -> dict:
+    return CONFIG.get("USER_CACHE", {})
+
+
+user_cache = UserNameCache(
+    ttl=_settings().get("TTL", DEFAULT_TTL),
+    max_size=_settings().get("MAX_SIZE", DEFAULT_MAX_SIZE)
+)
+
+
+async def init_user_repository():
+    """Подключает SQLite-хранилище пользователей и прогревает из него кэш (шаг запуска)"""
+    db_path = _settings().get("DB_PATH", DEFAULT_DB_PATH)
+    if not db_path:
+        return
+    from infrastructure.database.user_repository import SQLiteUserRepository
+    user_cache.set_repository(await asyncio.to_thread(SQLiteUserRepository, db_path))
+    await user_cache.load_from_repository()